@@ -26,106 +26,258 @@
 #
 
 
+import threading
+
 import bpy
 
 import appleseed as asr
+from ..properties import nodes
 from ..properties.nodes import AppleseedOSLScriptNode
+from ..logger import get_logger
 from ..utils import path_util, osl_utils, util
 
+logger = get_logger()
+
 
 class ASMAT_OT_compile_script(bpy.types.Operator):
+    """
+    Compiles the script of the active OSL Script node and rebuilds the node from its parameters.
+    When invoked from the UI the compilation runs in a worker thread, a newer compile of the
+    same node supersedes a running one.
+    """
+
     bl_idname = "appleseed.compile_osl_script"
     bl_label = "Compile OSL Script Node Parameters"
 
+    _timer = None
+    _thread = None
+    _result = None
+    _key = None
+    _material_name = None
+    _generation = 0
+
     def execute(self, context):
+        material = context.object.active_material
+        node = material.node_tree.nodes.active
+
+        if node.script is None:
+            self.report({'ERROR'}, "appleseed - No OSL script selected!")
+            return {'CANCELLED'}
+
+        timer = util.Timer()
+        osl_bytecode = osl_utils.compile_osl_bytecode(None, node.script)
+        timer.stop()
+
+        self.__finish_compile(context, material.node_tree, node, osl_bytecode, timer.elapsed())
+
+        return {'FINISHED'}
+
+    def invoke(self, context, event):
+        material = context.object.active_material
+        node = material.node_tree.nodes.active
+
+        if node.script is None:
+            self.report({'ERROR'}, "appleseed - No OSL script selected!")
+            return {'CANCELLED'}
+
+        source_code = osl_utils.get_script_source(node.script)
+
+        self._key = (material.node_tree.as_pointer(), node.name)
+        self._material_name = material.name_full
+
+        status = nodes.script_compile_status.get(self._key, {'generation': 0})
+        self._generation = status['generation'] + 1
+        nodes.script_compile_status[self._key] = {'generation': self._generation, 'compile_time': None}
+
+        osl_bytecode = osl_utils.get_cached_bytecode(source_code)
+        if osl_bytecode is not None:
+            self.__finish_compile(context, material.node_tree, node, osl_bytecode, 0.0)
+            return {'FINISHED'}
+
+        self._result = dict()
+        self._thread = threading.Thread(target=self.__compile,
+                                        args=(path_util.get_stdosl_paths(), source_code, self._result))
+        self._thread.start()
+
+        wm = context.window_manager
+        self._timer = wm.event_timer_add(0.1, window=context.window)
+        wm.modal_handler_add(self)
+
+        self.__redraw_node_editors(context)
+
+        return {'RUNNING_MODAL'}
+
+    def modal(self, context, event):
+        if event.type != 'TIMER' or self._thread.is_alive():
+            return {'PASS_THROUGH'}
+
+        context.window_manager.event_timer_remove(self._timer)
+
+        status = nodes.script_compile_status.get(self._key)
+        if status is None or status['generation'] != self._generation:
+            # A newer compile of this node was started, its result replaces this one.
+            return {'CANCELLED'}
+
+        if 'error' in self._result:
+            self.__fail_compile(context, f"appleseed - OSL script compilation failed: {self._result['error']}")
+            return {'CANCELLED'}
+
+        osl_bytecode = self._result.get('bytecode')
+        if osl_bytecode is not None:
+            osl_utils.store_cached_bytecode(self._result['source_code'], osl_bytecode)
+
+        material = bpy.data.materials.get(self._material_name)
+        node = None
+        if material is not None and material.node_tree is not None and material.node_tree.as_pointer() == self._key[0]:
+            node = material.node_tree.nodes.get(self._key[1])
+
+        if node is None:
+            del nodes.script_compile_status[self._key]
+            self.report({'ERROR'}, "appleseed - OSL script node was removed during compilation!")
+            return {'CANCELLED'}
+
+        try:
+            self.__finish_compile(context, material.node_tree, node, osl_bytecode, self._result['compile_time'])
+        except Exception as e:
+            self.__fail_compile(context, f"appleseed - Could not create OSL script node parameters: {e}")
+            return {'CANCELLED'}
+
+        return {'FINISHED'}
+
+    @staticmethod
+    def __compile(stdosl_path, source_code, result):
+        # Errors are reported by modal() on the main thread.
+        try:
+            timer = util.Timer()
+            compiler = asr.ShaderCompiler(stdosl_path)
+            osl_bytecode = compiler.compile_buffer(source_code)
+            timer.stop()
+
+            result['source_code'] = source_code
+            result['bytecode'] = osl_bytecode
+            result['compile_time'] = timer.elapsed()
+        except Exception as e:
+            result['error'] = str(e)
+
+    def __fail_compile(self, context, message):
+        nodes.script_compile_status.pop(self._key, None)
+        self.report({'ERROR'}, message)
+        self.__redraw_node_editors(context)
+
+    def __finish_compile(self, context, node_tree, node, osl_bytecode, compile_time):
+        key = (node_tree.as_pointer(), node.name)
+
+        if osl_bytecode is not None:
+            self.__swap_node(node_tree, node, osl_bytecode)
+
+            status = nodes.script_compile_status.get(key, {'generation': 0})
+            status['compile_time'] = compile_time
+            nodes.script_compile_status[key] = status
+
+            logger.debug(f"appleseed: Compiled OSL script {node.name} in {compile_time:.3f} seconds")
+        else:
+            nodes.script_compile_status.pop(key, None)
+            self.report({'ERROR'}, "appleseed - OSL script did not compile!")
+
+        self.__redraw_node_editors(context)
+
+    @staticmethod
+    def __swap_node(node_tree, node, osl_bytecode):
         temp_values = dict()
         input_connections = dict()
         output_connections = dict()
 
-        material = context.object.active_material
-        node_tree = material.node_tree
-        node = node_tree.nodes.active
+        name = node.name
         location = node.location
         width = node.width
-        script = node.script
-
-        if node.script is not None:
-            # Save existing connections and parameters
-            for key, value in node.items():
-                temp_values[key] = value
-            for input_iter in node.inputs:
-                if input_iter.is_linked:
-                    input_connections[input_iter.bl_idname] = input_iter.links[0].from_socket
-            for output in node.outputs:
-                if output.is_linked:
-                    outputs = []
-                    for link in output.links:
-                        outputs.append(link.to_socket)
-                    output_connections[output.bl_idname] = outputs
-
-            stdosl_path = path_util.get_stdosl_paths()
-            compiler = asr.ShaderCompiler(stdosl_path)
-            osl_bytecode = osl_utils.compile_osl_bytecode(compiler,
-                                                          script)
-
-            if osl_bytecode is not None:
-                q = asr.ShaderQuery()
-                q.open_bytecode(osl_bytecode)
-
-                node_data = osl_utils.parse_shader(q)
-
-                node_name, node_category, node_classes = osl_utils.generate_node(node_data,
-                                                                                 AppleseedOSLScriptNode)
-
-                for cls in reversed(node.classes):
-                    util.safe_unregister_class(cls)
-
-                for cls in node_classes:
-                    util.safe_register_class(cls)
-
-                node_tree.nodes.remove(node)
-                new_node = node_tree.nodes.new(node_name)
-                new_node.location = location
-                new_node.width = width
-                new_node.classes.extend(node_classes)
-                setattr(new_node, "node_type", "osl_script")
-
-                # Copy variables to new node
-                for variable, value in temp_values.items():
-                    if variable in dir(new_node):
-                        setattr(new_node, variable, value)
-
-                # Recreate node connections
-                for connection, sockets in output_connections.items():
-                    for output in new_node.outputs:
-                        if output.bl_idname == connection:
-                            output_socket_class = output
-                    if output_socket_class:
-                        for output_connection in sockets:
-                            node_tree.links.new(output_socket_class,
-                                                output_connection)
-                for connection, sockets in input_connections.items():
-                    for in_socket in new_node.inputs:
-                        if in_socket.bl_idname == connection:
-                            input_socket_class = in_socket
-                    if input_socket_class:
-                        for input_connection in sockets:
-                            node_tree.links.new(input_socket_class,
-                                                input_connection)
-
-            else:
-                self.report(
-                    {'ERROR'}, "appleseed - OSL script did not compile!")
 
-        else:
-            self.report({'ERROR'}, "appleseed - No OSL script selected!")
+        # Save existing connections and parameters
+        for key, value in node.items():
+            temp_values[key] = value
+        for input_iter in node.inputs:
+            if input_iter.is_linked:
+                input_connections[input_iter.bl_idname] = input_iter.links[0].from_socket
+        for output in node.outputs:
+            if output.is_linked:
+                outputs = []
+                for link in output.links:
+                    outputs.append(link.to_socket)
+                output_connections[output.bl_idname] = outputs
 
-        return {'FINISHED'}
+        q = asr.ShaderQuery()
+        q.open_bytecode(osl_bytecode)
+
+        node_data = osl_utils.parse_shader(q)
+
+        node_name, node_category, node_classes = osl_utils.generate_node(node_data,
+                                                                         AppleseedOSLScriptNode)
+
+        for cls in reversed(node.classes):
+            util.safe_unregister_class(cls)
+
+        for cls in node_classes:
+            util.safe_register_class(cls)
+
+        node_tree.nodes.remove(node)
+        new_node = node_tree.nodes.new(node_name)
+        new_node.name = name
+        new_node.location = location
+        new_node.width = width
+        new_node.classes.extend(node_classes)
+        setattr(new_node, "node_type", "osl_script")
+
+        # Copy variables to new node
+        for variable, value in temp_values.items():
+            if variable in dir(new_node):
+                setattr(new_node, variable, value)
+
+        # Recreate node connections
+        for connection, sockets in output_connections.items():
+            for output in new_node.outputs:
+                if output.bl_idname == connection:
+                    output_socket_class = output
+            if output_socket_class:
+                for output_connection in sockets:
+                    node_tree.links.new(output_socket_class,
+                                        output_connection)
+        for connection, sockets in input_connections.items():
+            for in_socket in new_node.inputs:
+                if in_socket.bl_idname == connection:
+                    input_socket_class = in_socket
+            if input_socket_class:
+                for input_connection in sockets:
+                    node_tree.links.new(input_socket_class,
+                                        input_connection)
+
+    @staticmethod
+    def __redraw_node_editors(context):
+        for area in context.screen.areas:
+            if area.type == 'NODE_EDITOR':
+                area.tag_redraw()
+
+
+class ASMAT_OT_add_osl_node(bpy.types.Operator):
+    """
+    Registers a deferred OSL shader node and adds it to the active node tree
+    """
+
+    bl_idname = "appleseed.add_osl_node"
+    bl_label = "Add OSL Node"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    node_type: bpy.props.StringProperty()
+
+    def invoke(self, context, event):
+        nodes.register_osl_node(self.node_type)
+
+        return bpy.ops.node.add_node('INVOKE_DEFAULT', type=self.node_type, use_transform=True)
 
 
 def register():
     util.safe_register_class(ASMAT_OT_compile_script)
+    util.safe_register_class(ASMAT_OT_add_osl_node)
 
 
 def unregister():
+    util.safe_unregister_class(ASMAT_OT_add_osl_node)
     util.safe_unregister_class(ASMAT_OT_compile_script)
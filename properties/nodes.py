@@ -27,6 +27,7 @@
 
 import bpy
 import nodeitems_utils
+from bpy.app.handlers import persistent
 from nodeitems_builtins import ShaderNodeCategory
 
 from ..logger import get_logger
@@ -135,6 +136,21 @@ class AppleseedOSLNode(bpy.types.Node):
                 self.outputs.new(socket[0], socket[1])
 
 
+# State of the latest compile of each OSL Script node, keyed by node tree pointer and node name.
+script_compile_status = dict()
+
+
+def draw_compile_status(node, layout):
+    status = script_compile_status.get((node.id_data.as_pointer(), node.name))
+    if status is None:
+        return
+
+    if status['compile_time'] is None:
+        layout.label(text="Compiling...", icon='TIME')
+    else:
+        layout.label(text=f"Compiled in {status['compile_time']:.2f} seconds")
+
+
 class AppleseedOSLScriptNode(AppleseedOSLNode):
     bl_idname = "AppleseedOSLScriptNode"
     bl_label = "OSL Script"
@@ -148,6 +164,7 @@ class AppleseedOSLScriptNode(AppleseedOSLNode):
     def draw_buttons(self, context, layout):
         layout.prop(self, "script", text="")
         layout.operator('appleseed.compile_osl_script', text="Reload Parameters")
+        draw_compile_status(self, layout)
         socket_number = 0
         param_section = ""
         if hasattr(self, "input_params"):
@@ -225,6 +242,7 @@ class AppleseedOSLScriptBaseNode(AppleseedOSLScriptNode):
     def draw_buttons(self, context, layout):
         layout.prop(self, "script", text="")
         layout.operator('appleseed.compile_osl_script', text="Create Parameters")
+        draw_compile_status(self, layout)
 
 
 class AppleseedOSLNodeCategory(nodeitems_utils.NodeCategory):
@@ -235,7 +253,25 @@ class AppleseedOSLNodeCategory(nodeitems_utils.NodeCategory):
     @classmethod
     def poll(cls, context):
         renderer = context.scene.render.engine
-        return renderer == 'APPLESEED_RENDER' and context.space_data.tree_type == 'ShaderNodeTree'
+        if renderer == 'APPLESEED_RENDER' and context.space_data.tree_type == 'ShaderNodeTree':
+            # The shader editor is in use, make the deferred nodes available to the search
+            # operator.  Classes are not registered while the UI is drawing.
+            if pending_osl_nodes and not bpy.app.timers.is_registered(register_pending_osl_nodes):
+                bpy.app.timers.register(register_pending_osl_nodes)
+            return True
+
+        return False
+
+
+class AppleseedOSLNodeItem(nodeitems_utils.NodeItem):
+    """
+    Node item for OSL shader nodes whose classes may not be registered yet
+    """
+
+    @staticmethod
+    def draw(self, layout, context):
+        props = layout.operator("appleseed.add_osl_node", text=self.label)
+        props.node_type = self.nodetype
 
 
 def node_categories(osl_nodes):
@@ -252,7 +288,7 @@ def node_categories(osl_nodes):
     cyc_nodes = [nodeitems_utils.NodeItem(key) for key in cycles_nodes.keys()]
 
     for node in osl_nodes:
-        node_item = nodeitems_utils.NodeItem(node[0])
+        node_item = AppleseedOSLNodeItem(node[0], label=node[2])
         node_category = node[1]
         if node_category == 'shader':
             osl_shaders.append(node_item)
@@ -285,6 +321,9 @@ def node_categories(osl_nodes):
 
 osl_node_names = list()
 
+# Metadata of OSL shader nodes whose classes have not been generated yet, keyed by node bl_idname.
+pending_osl_nodes = dict()
+
 classes = [AppleseedOSLScriptBaseNode]
 
 preview_collections = dict()
@@ -299,6 +338,124 @@ def hide_non_appleseed_nodes(method):
 old_shader_node_category_poll = None
 
 
+def register_osl_node(node_idname):
+    """
+    Generates and registers the node and socket classes of a deferred OSL shader node
+    """
+
+    node = pending_osl_nodes.pop(node_idname, None)
+    if node is None:
+        return
+
+    _, _, node_classes = osl_utils.generate_node(node, AppleseedOSLNode)
+
+    for cls in node_classes:
+        util.safe_register_class(cls)
+
+    classes.extend(node_classes)
+
+
+def register_pending_osl_nodes():
+    if not pending_osl_nodes:
+        return None
+
+    timer = util.Timer()
+    num_classes = len(classes)
+    num_nodes = len(pending_osl_nodes)
+
+    for node_idname in list(pending_osl_nodes.keys()):
+        register_osl_node(node_idname)
+
+    timer.stop()
+    logger.debug("[appleseed] Registered {0} deferred OSL nodes ({1} classes) in {2:.3f} seconds".format(num_nodes,
+                                                                                                          len(classes) - num_classes,
+                                                                                                          timer.elapsed()))
+
+    return None
+
+
+def find_undefined_osl_nodes(node_tree):
+    """
+    Returns the bl_idnames of the deferred OSL nodes matching the undefined nodes of a node tree.
+
+    Nodes whose class is not registered yet have the NodeUndefined type.  Blender keeps their
+    type name and restores them once the class is registered, but only the type names of their
+    sockets are exposed to Python, so nodes are matched on those.
+    """
+
+    node_idnames = set()
+
+    for node in node_tree.nodes:
+        if node.bl_idname != 'NodeUndefined':
+            continue
+
+        socket_idnames = set(socket.bl_idname for socket in node.inputs)
+        socket_idnames.update(socket.bl_idname for socket in node.outputs)
+        if not socket_idnames:
+            continue
+
+        for node_idname, node_data in pending_osl_nodes.items():
+            if socket_idnames <= osl_utils.get_socket_idnames(node_data):
+                node_idnames.add(node_idname)
+
+    return node_idnames
+
+
+def register_undefined_osl_nodes():
+    """
+    Registers the deferred OSL nodes used by undefined nodes of any node tree.  Changes the type
+    registry, so it must run on the main thread.
+    """
+
+    if not pending_osl_nodes:
+        return
+
+    node_idnames = set()
+    for node_tree in util.get_node_trees():
+        node_idnames.update(find_undefined_osl_nodes(node_tree))
+
+    if not node_idnames:
+        return
+
+    timer = util.Timer()
+    for node_idname in node_idnames:
+        register_osl_node(node_idname)
+    timer.stop()
+
+    logger.debug("[appleseed] Registered {0} OSL nodes used by undefined nodes in {1:.3f} seconds".format(len(node_idnames),
+                                                                                                            timer.elapsed()))
+
+
+@persistent
+def register_loaded_osl_nodes(_):
+    """
+    Registers the deferred OSL nodes used by a loaded file.
+    """
+
+    register_undefined_osl_nodes()
+
+
+# Number of data-blocks that can hold node trees, to notice appended and linked data.
+__num_node_tree_owners = None
+
+
+@persistent
+def register_appended_osl_nodes(*_):
+    """
+    Registers the deferred OSL nodes used by appended or linked data, which do not trigger load_post.
+    """
+
+    global __num_node_tree_owners
+
+    if not pending_osl_nodes:
+        return
+
+    num_owners = len(bpy.data.materials) + len(bpy.data.lights) + len(bpy.data.worlds) + len(bpy.data.node_groups)
+    if num_owners != __num_node_tree_owners:
+        __num_node_tree_owners = num_owners
+        register_undefined_osl_nodes()
+
+
 def register():
     import bpy.utils.previews
     import os
@@ -310,11 +467,15 @@ def register():
 
     preview_collections["main"] = pcoll
 
+    timer = util.Timer()
+
+    # Only the metadata of the OSL shaders is needed to populate the node categories.  Their
+    # classes are generated when a node is added or a file using them is loaded.
     node_list = osl_utils.read_osl_shaders()
     for node in node_list:
-        node_name, node_category, node_classes = osl_utils.generate_node(node, AppleseedOSLNode)
-        classes.extend(node_classes)
-        osl_node_names.append([node_name, node_category])
+        node_idname = osl_utils.get_node_idname(node)
+        pending_osl_nodes[node_idname] = node
+        osl_node_names.append([node_idname, node['category'], node['name']])
 
     global old_shader_node_category_poll
     old_shader_node_category_poll = ShaderNodeCategory.poll
@@ -325,8 +486,25 @@ def register():
 
     nodeitems_utils.register_node_categories("APPLESEED", node_categories(osl_node_names))
 
+    # The Cycles replacement surface shader is created by the node tree translator.
+    register_osl_node('AppleseedasClosure2SurfaceNode')
+
+    bpy.app.handlers.load_post.append(register_loaded_osl_nodes)
+    bpy.app.handlers.depsgraph_update_post.append(register_appended_osl_nodes)
+
+    timer.stop()
+    logger.debug("[appleseed] Registered {0} node classes in {1:.3f} seconds, {2} OSL nodes deferred".format(len(classes),
+                                                                                                          timer.elapsed(),
+                                                                                                          len(pending_osl_nodes)))
+
 
 def unregister():
+    bpy.app.handlers.depsgraph_update_post.remove(register_appended_osl_nodes)
+    bpy.app.handlers.load_post.remove(register_loaded_osl_nodes)
+
+    if bpy.app.timers.is_registered(register_pending_osl_nodes):
+        bpy.app.timers.unregister(register_pending_osl_nodes)
+
     for pcoll in preview_collections.values():
         bpy.utils.previews.remove(pcoll)
     preview_collections.clear()
@@ -337,3 +515,7 @@ def unregister():
 
     for cls in reversed(classes):
         util.safe_unregister_class(cls)
+
+    pending_osl_nodes.clear()
+    osl_node_names.clear()
+    script_compile_status.clear()
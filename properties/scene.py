@@ -241,6 +241,14 @@ class AppleseedRenderSettings(bpy.types.PropertyGroup):
                                              ('fatal', "Fatal", "")],
                                       default='warning')
 
+    write_profile: bpy.props.BoolProperty(name="write_profile",
+                                          description="Write a JSON timing report of the scene translation next to the render output or exported project",
+                                          default=False)
+
+    checkpoint_tiles: bpy.props.BoolProperty(name="checkpoint_tiles",
+                                             description="Save completed tiles of final renders next to the render output, so that an interrupted render of the same saved file resumes where it stopped",
+                                             default=False)
+
     tex_cache: bpy.props.IntProperty(name="tex_cache",
                                      description="Size of the texture cache in MB",
                                      default=1024)
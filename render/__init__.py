@@ -25,19 +25,22 @@
 # THE SOFTWARE.
 #
 
+import os
 import sys
 import threading
+import time
 
 import bpy
 
 import appleseed as asr
 from .final_tilecallback import FinalTileCallback
 from .renderercontroller import FinalRendererController, InteractiveRendererController
+from .tile_checkpoint import TileCheckpoint
 from ..logger import get_logger
 from ..translators.preview import PreviewRenderer
 from ..translators.scene import SceneTranslator
 from ..utils.path_util import get_stdosl_render_paths
-from ..utils.util import safe_register_class, safe_unregister_class
+from ..utils.util import get_render_resolution, safe_register_class, safe_unregister_class
 
 logger = get_logger()
 
@@ -90,6 +93,9 @@ class RenderAppleseed(bpy.types.RenderEngine):
         self.__tile_callback = None
         self.__render_thread = None
 
+        # Timings of the final renders, reported in the translation profile.
+        self.__render_timings = []
+
         # Interactive rendering.
         self.__interactive_scene_translator = None
 
@@ -223,10 +229,14 @@ class RenderAppleseed(bpy.types.RenderEngine):
         Export and render the scene.
         """
 
+        self.__render_timings = []
+
         if depsgraph.scene.appleseed.scene_export_mode == 'export_only':
             if depsgraph.scene.appleseed.export_path != "":
                 scene_translator = SceneTranslator.create_project_export_translator(depsgraph)
                 scene_translator.translate_scene(self, depsgraph)
+                self.__report_translation_profile(scene_translator)
+                self.__write_translation_profile(depsgraph.scene, scene_translator, depsgraph.scene.appleseed.export_path)
                 scene_translator.write_project(depsgraph.scene.appleseed.export_path)
             else:
                 self.error_set("appleseed: Export path not set!")
@@ -238,6 +248,7 @@ class RenderAppleseed(bpy.types.RenderEngine):
                 self.active_view_set(depsgraph.scene.render.views[0].name)
 
                 scene_translator.translate_scene(self, depsgraph)
+                self.__report_translation_profile(scene_translator)
                 self.__start_final_render(depsgraph.scene, scene_translator.as_project)
 
                 for view in depsgraph.scene.render.views[1:]:
@@ -246,8 +257,30 @@ class RenderAppleseed(bpy.types.RenderEngine):
                     self.__start_final_render(depsgraph.scene, scene_translator.as_project)
             else:
                 scene_translator.translate_scene(self, depsgraph)
+                self.__report_translation_profile(scene_translator)
                 self.__start_final_render(depsgraph.scene, scene_translator.as_project)
 
+            self.__write_translation_profile(depsgraph.scene, scene_translator, depsgraph.scene.render.frame_path())
+
+    def __report_translation_profile(self, scene_translator):
+        """
+        Show a summary of the translation profile.
+        """
+
+        self.update_stats("appleseed Rendering: Scene translated", scene_translator.profiler.summary())
+
+    def __write_translation_profile(self, scene, scene_translator, output_path):
+        """
+        Optionally write the full translation profile and the render timings next to the output.
+        """
+
+        if scene.appleseed.write_profile:
+            profile_path = f"{os.path.splitext(bpy.path.abspath(output_path))[0]}.profile.json"
+            try:
+                scene_translator.write_profile(profile_path, self.__render_timings)
+            except OSError as e:
+                self.report({'WARNING'}, f"appleseed: Could not write translation profile: {e}")
+
     def __start_final_render(self, scene, project):
         """
         Start a final render.
@@ -259,7 +292,23 @@ class RenderAppleseed(bpy.types.RenderEngine):
         assert (self.__tile_callback is None)
         assert (self.__render_thread is None)
 
-        self.__tile_callback = FinalTileCallback(self, scene)
+        checkpoint = self.__open_tile_checkpoint(scene) if not self.is_preview else None
+
+        # Nobody watches the render result of background renders, so it is only updated at the end.
+        headless = bpy.app.background and not self.is_preview
+
+        self.__tile_callback = FinalTileCallback(self, scene, checkpoint, headless)
+
+        if checkpoint is not None:
+            crop_window = self.__tile_callback.restore_checkpoint()
+            if crop_window is None:
+                logger.debug("appleseed: All tiles restored from checkpoint, skipping render")
+                self.__tile_callback.upload_render_buffer()
+                self.__tile_callback.finish_checkpoint()
+                self.__tile_callback = None
+                return
+
+            project.get_frame().set_crop_window(crop_window)
 
         self.__renderer_controller = FinalRendererController(self, self.__tile_callback)
 
@@ -276,16 +325,67 @@ class RenderAppleseed(bpy.types.RenderEngine):
         asr.global_logger().add_target(log_target)
 
         # Start render thread and wait for it to finish.
+        render_start = time.perf_counter()
         self.__render_thread.start()
 
         while self.__render_thread.isAlive():
             self.__render_thread.join(0.5)  # seconds
+            if self.test_break():
+                self.__renderer_controller.cancel()
+
+        self.__render_timings.append({'view': self.active_view_get(),
+                                      'time': time.perf_counter() - render_start,
+                                      'tile_callback_time': self.__tile_callback.tile_callback_time,
+                                      'tile_count': self.__tile_callback.tile_count,
+                                      'stats': self.__tile_callback.stats.as_dict()})
+
+        self.__tile_callback.upload_render_buffer()
+
+        if checkpoint is not None:
+            self.__tile_callback.finish_checkpoint()
+            project.get_frame().set_crop_window(self.__tile_callback.render_window)
 
         # Cleanup.
         asr.global_logger().remove_target(log_target)
 
         self.__stop_rendering()
 
+    def __open_tile_checkpoint(self, scene):
+        """
+        Open the tile checkpoint of the current frame and view, if enabled.
+        """
+
+        if not scene.appleseed.checkpoint_tiles:
+            return None
+
+        render_view = self.active_view_get()
+
+        output_path = os.path.splitext(bpy.path.abspath(scene.render.frame_path()))[0]
+        directory = f"{output_path}.{render_view}.checkpoint" if render_view else f"{output_path}.checkpoint"
+
+        # Resuming is only valid for the same saved file and render settings.
+        blend_path = bpy.data.filepath
+        blend_mtime = os.path.getmtime(blend_path) if os.path.isfile(blend_path) else None
+
+        (width, height) = get_render_resolution(scene)
+        render = scene.render
+        border = [render.border_min_x, render.border_min_y, render.border_max_x, render.border_max_y] if render.use_border else None
+
+        signature = TileCheckpoint.compute_signature(blend_path=blend_path,
+                                                     blend_mtime=blend_mtime,
+                                                     frame=scene.frame_current,
+                                                     view=render_view,
+                                                     resolution=[width, height],
+                                                     border=border,
+                                                     tile_size=scene.appleseed.tile_size,
+                                                     renderer_passes=scene.appleseed.renderer_passes)
+
+        if render.use_border:
+            width = int(render.border_max_x * width) - int(render.border_min_x * width)
+            height = int(render.border_max_y * height) - int(render.border_min_y * height)
+
+        return TileCheckpoint(directory, signature, width, height)
+
     def __start_interactive_render(self, context, depsgraph):
         """
         Start an interactive rendering session.
@@ -26,9 +26,12 @@
 #
 
 import time
-from math import ceil
+
+import numpy as np
 
 import appleseed as asr
+from .render_buffer import RenderBuffer
+from .render_stats import RenderStats
 from ..logger import get_logger
 from ..utils import util
 
@@ -40,14 +43,17 @@ class FinalTileCallback(asr.ITileCallback):
     The TileCallback is responsible for sending the results of the render back to Blender
     """
 
-    def __init__(self, engine, scene):
+    def __init__(self, engine, scene, checkpoint=None, headless=False):
         super().__init__()
 
         self.__engine = engine
         self.__scene = scene
 
+        # Optional on-disk copy of the completed tiles, see TileCheckpoint.
+        self.__checkpoint = checkpoint
+        self.__restored_tiles = frozenset()
+
         self.__pass_incremented = False
-        self.__render_stats = ["Starting", ""]
 
         # Compute render resolution.
         (width, height) = util.get_render_resolution(self.__scene)
@@ -64,37 +70,129 @@ class FinalTileCallback(asr.ITileCallback):
             self.__max_x = width - 1
             self.__max_y = height - 1
 
-        # Compute number of tiles.
-        vertical_tiles = int(ceil((self.__max_y - self.__min_y + 1) / self.__scene.appleseed.tile_size))
-        horizontal_tiles = int(ceil((self.__max_x - self.__min_x + 1) / self.__scene.appleseed.tile_size))
-        self.__total_tiles = vertical_tiles * horizontal_tiles
+        # Headless renders collect the tiles and upload them to Blender once, see upload_render_buffer.
+        if headless:
+            self.__render_buffer = RenderBuffer(self.__max_x - self.__min_x + 1, self.__max_y - self.__min_y + 1)
+        else:
+            self.__render_buffer = None
 
-        # Compute total pixel count.
+        # Throughput and remaining time, read by the renderer controller.
         self.__total_passes = scene.appleseed.renderer_passes
-        self.__total_pixels = (self.__max_x - self.__min_x + 1) * (self.__max_y - self.__min_y + 1) * self.__total_passes
+        self.__stats = RenderStats((self.__max_x - self.__min_x + 1) * (self.__max_y - self.__min_y + 1),
+                                   len(self.__get_window_tiles()),
+                                   self.__total_passes)
 
-        self.__time_start = time.time()
+        self.__pass_number = 1
 
-        self.__rendered_pixels = 0
+        # Time spent in on_tile_end, reported in the translation profile.
+        self.__tile_callback_time = 0.0
+        self.__tile_count = 0
 
-        self.__pass_number = 1
+    @property
+    def render_window(self):
+        return [self.__min_x, self.__min_y, self.__max_x, self.__max_y]
 
-        self.__rendered_tiles = 0
+    @property
+    def stats(self):
+        return self.__stats
 
     @property
-    def render_stats(self):
-        return self.__render_stats
+    def tile_callback_time(self):
+        return self.__tile_callback_time
+
+    @property
+    def tile_count(self):
+        return self.__tile_count
+
+    def restore_checkpoint(self):
+        """
+        Upload the tiles completed by an interrupted render to Blender.
+
+        Returns the crop window covering the tiles left to render, or None when all
+        tiles were restored.
+        """
+
+        tile_size = self.__scene.appleseed.tile_size
+        render_view = self.__engine.active_view_get()
+
+        completed_tiles = self.__checkpoint.completed_tiles
+        restored_tiles = set()
+        remaining_tiles = []
+
+        for tile_x, tile_y in self.__get_window_tiles():
+            if (tile_x, tile_y) not in completed_tiles:
+                remaining_tiles.append((tile_x, tile_y))
+                continue
+
+            x0, y0, take_x, take_y = self.__get_tile_window(tile_x * tile_size,
+                                                            tile_y * tile_size,
+                                                            tile_size,
+                                                            tile_size)[:4]
+
+            if self.__render_buffer is not None:
+                for pass_name in self.__checkpoint.passes:
+                    pixels = self.__checkpoint.read_pixels(pass_name, x0, y0, take_x, take_y)
+                    self.__render_buffer.write_pixels(pass_name, x0, y0, take_x, take_y, pixels)
+            else:
+                result = self.__engine.begin_result(x0, y0, take_x, take_y, view=render_view)
+                for pass_name in self.__checkpoint.passes:
+                    layer = result.layers[0].passes.find_by_name(pass_name, render_view)
+                    if layer is not None:
+                        layer.rect = self.__checkpoint.read_pixels(pass_name, x0, y0, take_x, take_y)
+                        self.__engine.update_result(result)
+                self.__engine.end_result(result)
+
+            restored_tiles.add((tile_x, tile_y))
+
+            # Restored tiles are not part of the remaining work.
+            self.__stats.exclude(take_x * take_y, 1)
+
+        self.__restored_tiles = frozenset(restored_tiles)
+
+        logger.debug("appleseed: Restored %i tiles from checkpoint, %i left to render", len(restored_tiles), len(remaining_tiles))
+
+        if not remaining_tiles:
+            return None
+
+        # Bounding box of the remaining tiles, clipped to the render window.
+        return [max(min(x for x, _ in remaining_tiles) * tile_size, self.__min_x),
+                max(min(y for _, y in remaining_tiles) * tile_size, self.__min_y),
+                min((max(x for x, _ in remaining_tiles) + 1) * tile_size - 1, self.__max_x),
+                min((max(y for _, y in remaining_tiles) + 1) * tile_size - 1, self.__max_y)]
+
+    def upload_render_buffer(self):
+        """
+        Send the tiles collected by a headless render to Blender.
+        """
+
+        if self.__render_buffer is not None:
+            self.__render_buffer.upload(self.__engine, self.__engine.active_view_get())
+
+    def finish_checkpoint(self):
+        """
+        Remove the checkpoint if the render completed, otherwise write it back to disk.
+        """
+
+        if self.__checkpoint is None:
+            return
+
+        completed_tiles = self.__checkpoint.completed_tiles
+        if all(tile in completed_tiles for tile in self.__get_window_tiles()):
+            logger.debug("appleseed: Render completed, removing tile checkpoint")
+            self.__checkpoint.remove()
+        else:
+            self.__checkpoint.close()
 
     def on_tiled_frame_begin(self, frame):
         self.__pass_incremented = False
         if self.__pass_number == 1:
-            self.__render_stats = ["appleseed Rendering", "Time Remaining: Unknown"]
+            self.__stats.begin_render()
 
     def on_tiled_frame_end(self, frame):
         if not self.__pass_incremented:
             self.__pass_number += 1
             self.__pass_incremented = True
-        self.__rendered_tiles = 0
+            self.__stats.end_pass()
 
     def on_tile_begin(self, frame, tile_x, tile_y, thread_index, thread_count):
         pass
@@ -104,6 +202,14 @@ class FinalTileCallback(asr.ITileCallback):
         Processes the tile data as it finished
         """
 
+        start_time = time.perf_counter()
+        self.__update_tile(frame, tile_x, tile_y)
+        callback_time = time.perf_counter() - start_time
+        self.__tile_callback_time += callback_time
+        self.__tile_count += 1
+        self.__stats.add_callback_time(callback_time)
+
+    def __update_tile(self, frame, tile_x, tile_y):
         logger.debug("Finished tile %s %s", tile_x, tile_y)
 
         image = frame.image()
@@ -128,23 +234,44 @@ class FinalTileCallback(asr.ITileCallback):
             logger.debug("Skipping invisible tile")
             return True
 
-        # Image-space coordinates of the intersection between the tile and the render window.
-        ix0 = max(x, self.__min_x)
-        iy0 = max(y, self.__min_y)
-        ix1 = min(x + tile_w - 1, self.__max_x)
-        iy1 = min(y + tile_h - 1, self.__max_y)
-
-        # Number of rows and columns to skip in the input tile.
-        skip_x = ix0 - x
-        skip_y = iy0 - y
-        take_x = ix1 - ix0 + 1
-        take_y = iy1 - iy0 + 1
+        # Tiles restored from the checkpoint are already in the render result.
+        if (tile_x, tile_y) in self.__restored_tiles:
+            logger.debug("Skipping restored tile")
+            return True
 
-        # Window-space coordinates of the intersection between the tile and the render window.
-        x0 = ix0 - self.__min_x  # left
-        y0 = self.__max_y - iy1  # bottom
+        x0, y0, take_x, take_y, skip_x, skip_y = self.__get_tile_window(x, y, tile_w, tile_h)
 
         # Update image.
+        if self.__render_buffer is not None:
+            self.__buffer_tile(frame, image, tile_x, tile_y, x0, y0, take_x, take_y, skip_x, skip_y)
+        else:
+            self.__upload_tile(frame, image, tile_x, tile_y, x0, y0, take_x, take_y, skip_x, skip_y)
+
+        # Only tiles of the last pass are final.
+        if self.__checkpoint is not None and self.__pass_number >= self.__total_passes:
+            self.__checkpoint.mark_completed(tile_x, tile_y)
+
+        # Update stats and progress bar.
+        sample_count = self.__get_sample_count(frame, tile_x, tile_y, take_x, take_y, skip_x, skip_y)
+        self.__stats.record_tile(take_x * take_y, sample_count)
+        self.__engine.update_progress(self.__stats.progress)
+
+    def __get_sample_count(self, frame, tile_x, tile_y, take_x, take_y, skip_x, skip_y):
+        """
+        Sum of the sample counts of the tile pixels, when the pixel sample count AOV is enabled.
+        """
+
+        if not self.__scene.appleseed.pixel_sample_count_aov:
+            return None
+
+        for aov in frame.aovs():
+            if aov.get_name() == 'pixel_sample_count':
+                pixels = self.__get_pixel_array(aov.get_image(), tile_x, tile_y, take_x, take_y, skip_x, skip_y)
+                return float(pixels[..., 0].sum())
+
+        return None
+
+    def __upload_tile(self, frame, image, tile_x, tile_y, x0, y0, take_x, take_y, skip_x, skip_y):
         render_view = self.__engine.active_view_get()
         result = self.__engine.begin_result(x0,
                                             y0,
@@ -160,6 +287,7 @@ class FinalTileCallback(asr.ITileCallback):
                                 skip_x,
                                 skip_y)
         layer.rect = pix
+        self.__checkpoint_pixels("Combined", x0, y0, take_x, take_y, pix)
         if len(frame.aovs()) > 0:
             self.__engine.update_result(result)
             for aov in frame.aovs():
@@ -175,6 +303,7 @@ class FinalTileCallback(asr.ITileCallback):
                                                      skip_y)
                     layer = result.layers[0].passes.find_by_name(self.__map_aovs(aov.get_name()), render_view)
                     layer.rect = pixel_buffer
+                    self.__checkpoint_pixels(layer.name, x0, y0, take_x, take_y, pixel_buffer)
                     self.__engine.update_result(result)
                 else:
                     image = aov.get_cryptomatte_image()
@@ -190,24 +319,69 @@ class FinalTileCallback(asr.ITileCallback):
                     for i, pixels in enumerate(crypto_pixels):
                         layer = result.layers[0].passes.find_by_name(f"{self.__map_aovs(model)}0{i}", render_view)
                         layer.rect = pixels
+                        self.__checkpoint_pixels(layer.name, x0, y0, take_x, take_y, pixels)
                         self.__engine.update_result(result)
 
         self.__engine.end_result(result)
 
-        # Update progress bar.
-        self.__rendered_pixels += take_x * take_y
-        self.__engine.update_progress(self.__rendered_pixels / self.__total_pixels)
-
-        # Update stats.
-        seconds_per_pixel = (time.time() - self.__time_start) / self.__rendered_pixels
-        remaining_seconds = (self.__total_pixels - self.__rendered_pixels) * seconds_per_pixel
-        self.__rendered_tiles += 1
-        self.__render_stats = ["appleseed Rendering: Pass %i of %i, Tile %i of %i completed" %
-                               (self.__pass_number,
-                                self.__total_passes,
-                                self.__rendered_tiles,
-                                self.__total_tiles),
-                               "Time Remaining: {0}".format(self.__format_seconds_to_hhmmss(remaining_seconds))]
+    def __buffer_tile(self, frame, image, tile_x, tile_y, x0, y0, take_x, take_y, skip_x, skip_y):
+        """
+        Copy the passes of a tile to the render buffer, without going through Python lists.
+        """
+
+        passes = [("Combined", self.__get_pixel_array(image, tile_x, tile_y, take_x, take_y, skip_x, skip_y))]
+
+        for aov in frame.aovs():
+            model = aov.get_model()
+            if model not in ("cryptomatte_object_aov", "cryptomatte_material_aov"):
+                pixels = self.__get_pixel_array(aov.get_image(), tile_x, tile_y, take_x, take_y, skip_x, skip_y)
+                passes.append((self.__map_aovs(aov.get_name()), pixels))
+            else:
+                pixels = self.__get_pixel_array(aov.get_cryptomatte_image(), tile_x, tile_y, take_x, take_y, skip_x, skip_y)
+                passes.extend((f"{self.__map_aovs(model)}0{i}", pixels[..., start:end])
+                              for i, (start, end) in enumerate(((3, 7), (7, 11), (11, None))))
+
+        for pass_name, pixels in passes:
+            self.__render_buffer.write_pixels(pass_name, x0, y0, take_x, take_y, pixels)
+            self.__checkpoint_pixels(pass_name, x0, y0, take_x, take_y, pixels)
+
+    def __get_window_tiles(self):
+        """
+        Indices of the tiles overlapping the render window.
+        """
+
+        tile_size = self.__scene.appleseed.tile_size
+
+        return [(tile_x, tile_y)
+                for tile_y in range(self.__min_y // tile_size, self.__max_y // tile_size + 1)
+                for tile_x in range(self.__min_x // tile_size, self.__max_x // tile_size + 1)]
+
+    def __get_tile_window(self, x, y, tile_w, tile_h):
+        """
+        Intersect a tile, given by its image-space origin and size, with the render window.
+        """
+
+        # Image-space coordinates of the intersection between the tile and the render window.
+        ix0 = max(x, self.__min_x)
+        iy0 = max(y, self.__min_y)
+        ix1 = min(x + tile_w - 1, self.__max_x)
+        iy1 = min(y + tile_h - 1, self.__max_y)
+
+        # Number of rows and columns to skip in the input tile.
+        skip_x = ix0 - x
+        skip_y = iy0 - y
+        take_x = ix1 - ix0 + 1
+        take_y = iy1 - iy0 + 1
+
+        # Window-space coordinates of the intersection between the tile and the render window.
+        x0 = ix0 - self.__min_x  # left
+        y0 = self.__max_y - iy1  # bottom
+
+        return x0, y0, take_x, take_y, skip_x, skip_y
+
+    def __checkpoint_pixels(self, pass_name, x0, y0, take_x, take_y, pixels):
+        if self.__checkpoint is not None:
+            self.__checkpoint.write_pixels(pass_name, x0, y0, take_x, take_y, pixels)
 
     @staticmethod
     def __get_pixels(image, tile_x, tile_y, take_x, take_y, skip_x, skip_y):
@@ -225,6 +399,25 @@ class FinalTileCallback(asr.ITileCallback):
 
         return pixel_buffer
 
+    @staticmethod
+    def __get_pixel_array(image, tile_x, tile_y, take_x, take_y, skip_x, skip_y):
+        """
+        Same as __get_pixels, as a (take_y, take_x, channels) NumPy array.
+        """
+
+        tile = image.tile(tile_x, tile_y)
+        storage = tile.get_storage()
+
+        if isinstance(storage, memoryview):
+            floats = np.frombuffer(storage, dtype=np.float32)
+        else:
+            floats = np.asarray(storage, dtype=np.float32)
+
+        pixels = floats.reshape(tile.get_height(), tile.get_width(), tile.get_channel_count())
+
+        # Rows from bottom to top, like Blender render results.
+        return pixels[skip_y:skip_y + take_y, skip_x:skip_x + take_x][::-1]
+
     @staticmethod
     def __process_crypto_pixels(pixel_buffer):
         layer_1_pixels = list()
@@ -238,14 +431,6 @@ class FinalTileCallback(asr.ITileCallback):
 
         return [layer_1_pixels, layer_2_pixels, layer_3_pixels]
 
-    @staticmethod
-    def __format_seconds_to_hhmmss(seconds):
-        hours = seconds // (60 * 60)
-        seconds %= (60 * 60)
-        minutes = seconds // 60
-        seconds %= 60
-        return "%02i:%02i:%02i" % (hours, minutes, seconds)
-
     @staticmethod
     def __map_aovs(aov_name):
 
@@ -0,0 +1,90 @@
+#
+# This source file is part of appleseed.
+# Visit http://appleseedhq.net/ for additional information and resources.
+#
+# This software is released under the MIT license.
+#
+# Copyright (c) 2019 The appleseedhq Organization.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+
+
+import tempfile
+import threading
+
+import numpy as np
+
+from ..logger import get_logger
+
+logger = get_logger()
+
+
+class RenderBuffer(object):
+    """
+    Collects the passes of a final render in memory-mapped float32 buffers in window space
+    (rows from bottom to top, like Blender render results) and uploads them to Blender at once.
+
+    Used for background renders, where nobody watches the render result update tile by tile.
+    """
+
+    def __init__(self, width, height):
+        self.__width = width
+        self.__height = height
+
+        self.__lock = threading.Lock()
+        self.__buffers = dict()
+
+    def write_pixels(self, pass_name, x0, y0, width, height, pixels):
+        pixels = np.asarray(pixels, dtype=np.float32)
+        buffer = self.__buffers.get(pass_name)
+
+        if buffer is None:
+            # Tiles are written by several render threads.
+            with self.__lock:
+                buffer = self.__buffers.get(pass_name)
+                if buffer is None:
+                    # Backed by an anonymous temporary file, so the OS can page out finished tiles.
+                    buffer = np.memmap(tempfile.TemporaryFile(prefix="appleseed_"),
+                                       dtype=np.float32,
+                                       mode='w+',
+                                       shape=(self.__height, self.__width, pixels.shape[-1]))
+                    self.__buffers[pass_name] = buffer
+
+        buffer[y0:y0 + height, x0:x0 + width] = pixels.reshape(height, width, -1)
+
+    def upload(self, engine, render_view):
+        """
+        Copy all passes to the render result of the engine and release the buffers.
+        """
+
+        if not self.__buffers:
+            return
+
+        logger.debug("appleseed: Uploading %i render passes", len(self.__buffers))
+
+        result = engine.begin_result(0, 0, self.__width, self.__height, view=render_view)
+        for pass_name, buffer in self.__buffers.items():
+            layer = result.layers[0].passes.find_by_name(pass_name, render_view)
+            if layer is not None:
+                layer.rect = buffer.reshape(-1, buffer.shape[-1])
+                engine.update_result(result)
+        engine.end_result(result)
+
+        self.__buffers.clear()
@@ -0,0 +1,227 @@
+#
+# This source file is part of appleseed.
+# Visit http://appleseedhq.net/ for additional information and resources.
+#
+# This software is released under the MIT license.
+#
+# Copyright (c) 2019 The appleseedhq Organization.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+
+
+import threading
+import time
+
+from ..logger import get_logger
+
+logger = get_logger()
+
+
+class RenderStats(object):
+    """
+    Throughput model of a final render, updated by the tile callback and read by the renderer controller.
+
+    Time per pixel and per tile are exponentially weighted moving averages of the wall-clock
+    intervals between completed tiles, so the estimates follow the cost of the current pass
+    and region instead of averaging over the whole render.
+    """
+
+    # Weight of the newest tile in the moving averages.
+    smoothing = 0.1
+
+    def __init__(self, pass_pixels, pass_tiles, total_passes):
+        self.__lock = threading.Lock()
+
+        self.__pass_pixels = pass_pixels
+        self.__pass_tiles = pass_tiles
+        self.__total_passes = total_passes
+
+        self.__pass_number = 1
+        self.__rendered_pixels = 0
+        self.__rendered_tiles = 0
+
+        self.__start_time = None
+        self.__last_tile_time = None
+        self.__seconds_per_pixel = None
+        self.__seconds_per_tile = None
+
+        self.__sample_count = 0
+        self.__sampled_pixels = 0
+        self.__callback_time = 0.0
+
+        self.__status = ("Starting", "")
+        self.__status_dirty = False
+
+    def exclude(self, pixels, tiles):
+        """
+        Remove work that does not need to be rendered, e.g. tiles restored from a checkpoint.
+        """
+
+        with self.__lock:
+            self.__pass_pixels -= pixels
+            self.__pass_tiles -= tiles
+
+    def begin_render(self):
+        with self.__lock:
+            if self.__start_time is None:
+                self.__start_time = time.time()
+                self.__last_tile_time = self.__start_time
+                self.__status = ("appleseed Rendering", "Time Remaining: Unknown")
+
+    def end_pass(self):
+        with self.__lock:
+            self.__pass_number += 1
+            self.__rendered_pixels = 0
+            self.__rendered_tiles = 0
+
+    def record_tile(self, pixels, sample_count=None):
+        """
+        Account for a completed tile, and the sum of its pixel sample counts if known.
+        """
+
+        now = time.time()
+
+        with self.__lock:
+            if self.__last_tile_time is None:
+                self.__start_time = self.__last_tile_time = now
+
+            interval = now - self.__last_tile_time
+            self.__last_tile_time = now
+
+            self.__seconds_per_pixel = self.__smooth(self.__seconds_per_pixel, interval / max(pixels, 1))
+            self.__seconds_per_tile = self.__smooth(self.__seconds_per_tile, interval)
+
+            self.__rendered_pixels += pixels
+            self.__rendered_tiles += 1
+
+            if sample_count is not None:
+                self.__sample_count += sample_count
+                self.__sampled_pixels += pixels
+
+            self.__status_dirty = True
+
+    def add_callback_time(self, seconds):
+        self.__callback_time += seconds
+
+    @property
+    def pass_number(self):
+        return min(self.__pass_number, self.__total_passes)
+
+    @property
+    def progress(self):
+        total_pixels = self.__pass_pixels * self.__total_passes
+        if total_pixels <= 0:
+            return 1.0
+
+        done_pixels = (self.__pass_number - 1) * self.__pass_pixels + self.__rendered_pixels
+        return min(done_pixels / total_pixels, 1.0)
+
+    @property
+    def remaining_seconds(self):
+        if self.__seconds_per_pixel is None:
+            return None
+
+        remaining_passes = max(self.__total_passes - self.__pass_number, 0)
+        remaining_pixels = remaining_passes * self.__pass_pixels + max(self.__pass_pixels - self.__rendered_pixels, 0)
+        return remaining_pixels * self.__seconds_per_pixel
+
+    @property
+    def tiles_per_second(self):
+        return 1.0 / self.__seconds_per_tile if self.__seconds_per_tile else 0.0
+
+    @property
+    def megapixels_per_second(self):
+        return 1.0e-6 / self.__seconds_per_pixel if self.__seconds_per_pixel else 0.0
+
+    @property
+    def samples_per_second(self):
+        """
+        Average samples per second, only known when the pixel sample count AOV is enabled.
+        """
+
+        if self.__sampled_pixels == 0 or not self.__seconds_per_pixel:
+            return None
+        return self.__sample_count / self.__sampled_pixels / self.__seconds_per_pixel
+
+    @property
+    def callback_overhead(self):
+        """
+        Percentage of the elapsed render time spent in the tile callback.
+        """
+
+        if self.__start_time is None:
+            return 0.0
+
+        elapsed = time.time() - self.__start_time
+        return 100.0 * self.__callback_time / elapsed if elapsed > 0.0 else 0.0
+
+    @property
+    def status(self):
+        """
+        Title and details for RenderEngine.update_stats(), only formatted after new tiles completed.
+        """
+
+        if self.__status_dirty:
+            self.__status_dirty = False
+            self.__status = self.__format_status()
+
+        return self.__status
+
+    def as_dict(self):
+        return {'pass_number': self.pass_number,
+                'total_passes': self.__total_passes,
+                'progress': self.progress,
+                'remaining_seconds': self.remaining_seconds,
+                'tiles_per_second': self.tiles_per_second,
+                'megapixels_per_second': self.megapixels_per_second,
+                'samples_per_second': self.samples_per_second,
+                'callback_overhead': self.callback_overhead}
+
+    def __smooth(self, average, value):
+        if average is None:
+            return value
+        return average + self.smoothing * (value - average)
+
+    def __format_status(self):
+        title = "appleseed Rendering: Pass %i of %i, Tile %i of %i completed" % (self.pass_number,
+                                                                                 self.__total_passes,
+                                                                                 self.__rendered_tiles,
+                                                                                 self.__pass_tiles)
+
+        details = ["Time Remaining: {0}".format(self.__format_seconds_to_hhmmss(self.remaining_seconds)),
+                   "%.1f tiles/s" % self.tiles_per_second,
+                   "%.2f Mpix/s" % self.megapixels_per_second]
+
+        samples_per_second = self.samples_per_second
+        if samples_per_second is not None:
+            details.append("%.2f Msamples/s" % (samples_per_second * 1.0e-6))
+
+        return title, ", ".join(details)
+
+    @staticmethod
+    def __format_seconds_to_hhmmss(seconds):
+        if seconds is None:
+            return "Unknown"
+
+        hours = seconds // (60 * 60)
+        seconds %= (60 * 60)
+        minutes = seconds // 60
+        seconds %= 60
+        return "%02i:%02i:%02i" % (hours, minutes, seconds)
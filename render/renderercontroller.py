@@ -25,6 +25,8 @@
 # THE SOFTWARE.
 #
 
+import time
+
 import appleseed as asr
 
 from ..logger import get_logger
@@ -60,17 +62,46 @@ class BaseRendererController(asr.IRendererController):
 
 
 class FinalRendererController(BaseRendererController):
+    """
+    appleseed calls get_status very often from the render threads, so the engine,
+    which goes through RNA, is only polled every poll_interval seconds.
+    """
+
+    poll_interval = 0.1  # seconds
+
     def __init__(self, engine, tile_callback):
         super(FinalRendererController, self).__init__()
         self.__engine = engine
         self.__tile_callback = tile_callback
 
+        # Set from the thread waiting for the render, read without locking by the render threads.
+        self.__cancelled = False
+
+        self.__last_poll = 0.0
+        self.__last_stats = None
+
+    def cancel(self):
+        self.__cancelled = True
+
     def get_status(self):
+        if self.__cancelled:
+            return asr.IRenderControllerStatus.AbortRendering
+
+        now = time.perf_counter()
+        if now - self.__last_poll < self.poll_interval:
+            return self._status
+        self.__last_poll = now
+
         if self.__engine.test_break():
+            self.__cancelled = True
             return asr.IRenderControllerStatus.AbortRendering
 
-        render_stats = self.__tile_callback.render_stats
-        self.__engine.update_stats(render_stats[0], render_stats[1])
+        # The stats object only formats a new status after tiles completed.
+        stats = self.__tile_callback.stats.status
+        if stats is not self.__last_stats:
+            self.__last_stats = stats
+            self.__engine.update_stats(stats[0], stats[1])
+
         return self._status
 
     def on_rendering_begin(self):
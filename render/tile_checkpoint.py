@@ -0,0 +1,221 @@
+#
+# This source file is part of appleseed.
+# Visit http://appleseedhq.net/ for additional information and resources.
+#
+# This software is released under the MIT license.
+#
+# Copyright (c) 2019 The appleseedhq Organization.
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+from ..logger import get_logger
+
+logger = get_logger()
+
+
+class TileCheckpoint(object):
+    """
+    Keeps a copy of the completed tiles of a final render on disk so that an
+    interrupted render can be resumed without rendering them again.
+
+    Every render pass is stored as a raw, memory-mapped float32 buffer in window space
+    (rows from bottom to top, like Blender render results), next to a JSON manifest
+    listing the passes and the completed tiles.
+    """
+
+    manifest_filename = "manifest.json"
+
+    # Minimum time between two manifest updates, in seconds.
+    flush_interval = 2.0
+
+    def __init__(self, directory, signature, width, height):
+        self.__directory = directory
+        self.__signature = signature
+        self.__width = width
+        self.__height = height
+
+        self.__lock = threading.Lock()
+        self.__passes = dict()
+        self.__buffers = dict()
+        self.__completed_tiles = set()
+        self.__last_flush = time.time()
+        self.__dirty = False
+
+        self.__load()
+
+    @staticmethod
+    def compute_signature(**settings):
+        """
+        Hash the settings a checkpoint is only valid for.
+        """
+
+        return hashlib.sha1(json.dumps(settings, sort_keys=True).encode()).hexdigest()
+
+    @property
+    def completed_tiles(self):
+        return frozenset(self.__completed_tiles)
+
+    @property
+    def passes(self):
+        return list(self.__passes)
+
+    def write_pixels(self, pass_name, x0, y0, width, height, pixels):
+        """
+        Store a block of pixels, given in the layout of a Blender render result rect.
+        """
+
+        pixels = np.asarray(pixels, dtype=np.float32)
+        buffer = self.__get_buffer(pass_name, pixels.shape[-1])
+        buffer[y0:y0 + height, x0:x0 + width] = pixels.reshape(height, width, -1)
+
+    def read_pixels(self, pass_name, x0, y0, width, height):
+        buffer = self.__get_buffer(pass_name, self.__passes[pass_name]['channels'])
+        return buffer[y0:y0 + height, x0:x0 + width].reshape(-1, buffer.shape[-1]).tolist()
+
+    def mark_completed(self, tile_x, tile_y):
+        """
+        Record a tile once all its passes were written.
+        """
+
+        with self.__lock:
+            self.__completed_tiles.add((tile_x, tile_y))
+            self.__dirty = True
+            flush = time.time() - self.__last_flush > self.flush_interval
+
+        if flush:
+            self.flush()
+
+    def flush(self):
+        """
+        Write the buffers back to disk, then the manifest listing the tiles they hold.
+        """
+
+        with self.__lock:
+            if not self.__dirty:
+                return
+            completed_tiles = sorted(self.__completed_tiles)
+            passes = dict(self.__passes)
+            self.__dirty = False
+            self.__last_flush = time.time()
+
+        for buffer in list(self.__buffers.values()):
+            buffer.flush()
+
+        manifest = {'signature': self.__signature,
+                    'width': self.__width,
+                    'height': self.__height,
+                    'passes': passes,
+                    'tiles': completed_tiles}
+
+        manifest_path = os.path.join(self.__directory, self.manifest_filename)
+        try:
+            with open(f"{manifest_path}.tmp", 'w') as f:
+                json.dump(manifest, f)
+            os.replace(f"{manifest_path}.tmp", manifest_path)
+        except OSError as e:
+            logger.error("appleseed: Could not write tile checkpoint manifest: %s", e)
+
+    def close(self):
+        self.flush()
+        self.__buffers.clear()
+
+    def remove(self):
+        """
+        Delete the checkpoint once the render it belongs to completed.
+        """
+
+        self.__buffers.clear()
+        self.__delete_files()
+
+        try:
+            os.rmdir(self.__directory)
+        except OSError:
+            pass
+
+    def __load(self):
+        manifest_path = os.path.join(self.__directory, self.manifest_filename)
+
+        try:
+            with open(manifest_path, 'r') as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            manifest = None
+
+        if manifest is not None and manifest.get('signature') == self.__signature:
+            try:
+                for pass_name, pass_info in manifest['passes'].items():
+                    self.__passes[pass_name] = pass_info
+                    self.__open_buffer(pass_name, 'r+')
+            except (OSError, ValueError) as e:
+                logger.warning("appleseed: Discarding unreadable tile checkpoint in %s: %s", self.__directory, e)
+            else:
+                self.__completed_tiles = set(tuple(tile) for tile in manifest['tiles'])
+                logger.debug("appleseed: Resuming from tile checkpoint with %i completed tiles", len(self.__completed_tiles))
+                return
+
+        self.__passes.clear()
+        self.__buffers.clear()
+        self.__delete_files()
+
+    def __delete_files(self):
+        filenames = [self.manifest_filename, f"{self.manifest_filename}.tmp"]
+        filenames.extend(pass_info['file'] for pass_info in self.__passes.values())
+
+        if os.path.isdir(self.__directory):
+            filenames.extend(f for f in os.listdir(self.__directory) if f.endswith(".raw"))
+
+        for filename in set(filenames):
+            try:
+                os.remove(os.path.join(self.__directory, filename))
+            except OSError:
+                pass
+
+    def __get_buffer(self, pass_name, channels):
+        buffer = self.__buffers.get(pass_name)
+
+        if buffer is None:
+            with self.__lock:
+                buffer = self.__buffers.get(pass_name)
+                if buffer is None:
+                    os.makedirs(self.__directory, exist_ok=True)
+                    self.__passes[pass_name] = {'channels': channels,
+                                                'file': f"pass_{len(self.__passes):02d}.raw"}
+                    buffer = self.__open_buffer(pass_name, 'w+')
+
+        return buffer
+
+    def __open_buffer(self, pass_name, mode):
+        pass_info = self.__passes[pass_name]
+        buffer = np.memmap(os.path.join(self.__directory, pass_info['file']),
+                           dtype=np.float32,
+                           mode=mode,
+                           shape=(self.__height, self.__width, pass_info['channels']))
+        self.__buffers[pass_name] = buffer
+
+        return buffer
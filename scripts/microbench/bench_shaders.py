@@ -0,0 +1,103 @@
+#
+# This source file is part of appleseed.
+# Visit https://appleseedhq.net/ for additional information and resources.
+#
+# This software is released under the MIT license.
+#
+# Copyright (c) 2019 The appleseedhq Organization
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+import pytest
+
+import shim
+from shim import fake_appleseed as asr, rna
+
+cycles_shaders = shim.import_addon_module("translators.cycles_shaders")
+osl_utils = shim.import_addon_module("utils.osl_utils")
+nodes = shim.import_addon_module("properties.nodes")
+
+
+def make_ramp(interpolation, stop_count=8):
+    stops = [(i / (stop_count - 1), (i / stop_count, 1.0 - i / stop_count, 0.5, 1.0)) for i in range(stop_count)]
+    return rna.ColorRamp(stops, interpolation=interpolation)
+
+
+def make_shader(param_count):
+    """Describes a shader with a mix of parameter types and metadata, like the appleseed shaders"""
+    params = list()
+    defaults = {'color': [0.5, 0.5, 0.5], 'float': 0.5, 'int': 0, 'string': "", 'normal': [0.0, 0.0, 1.0]}
+
+    for i in range(param_count):
+        param_type = ('color', 'float', 'int', 'string', 'normal')[i % 5]
+        metadata = {'label': {'value': f"Parameter {i}"},
+                    'page': {'value': f"Section {i // 8}"},
+                    'help': {'value': "Help text."}}
+        if param_type in ('float', 'int'):
+            metadata.update({'min': {'value': 0}, 'max': {'value': 10}, 'softmin': {'value': 0}, 'softmax': {'value': 1}})
+        if param_type == 'int' and i % 2 == 0:
+            metadata['widget'] = {'value': 'checkBox'}
+        if param_type == 'string':
+            metadata.update({'widget': {'value': 'popup'}, 'options': {'value': "string options = \"a|b|c\""}})
+
+        params.append({'name': f"in_param{i}",
+                       'type': param_type,
+                       'validdefault': True,
+                       'default': defaults[param_type],
+                       'isoutput': False,
+                       'metadata': metadata})
+
+    params.append({'name': "out_outColor", 'type': 'color', 'validdefault': True, 'isoutput': True, 'metadata': {}})
+
+    return {'name': "as_benchmark",
+            'metadata': {'as_node_name': {'value': "asBenchmark"},
+                         'as_category': {'value': "shader"},
+                         'URL': {'value': "https://appleseed.readthedocs.io/"}},
+            'params': params}
+
+
+@pytest.mark.parametrize('interpolation', ['LINEAR', 'EASE', 'CONSTANT', 'B_SPLINE'])
+def bench_ramp_to_array(benchmark, interpolation):
+    ramp = make_ramp(interpolation)
+
+    rgb_array, alpha_array = benchmark(cycles_shaders.ramp_to_array, ramp)
+
+    assert len(rgb_array) == 3 * len(alpha_array)
+
+
+def bench_format_float_array(benchmark):
+    rgb_array, _ = cycles_shaders.ramp_to_array(make_ramp('LINEAR'))
+
+    benchmark(cycles_shaders.format_float_array, rgb_array)
+
+
+@pytest.mark.parametrize('param_count', [10, 60])
+def bench_parse_shader(benchmark, param_count):
+    query = asr.ShaderQuery(make_shader(param_count))
+
+    node = benchmark(osl_utils.parse_shader, query, filename="as_benchmark.oso")
+
+    assert len(node['inputs']) == param_count
+
+
+@pytest.mark.parametrize('param_count', [10, 60])
+def bench_generate_node(benchmark, param_count):
+    node = osl_utils.parse_shader(asr.ShaderQuery(make_shader(param_count)), filename="as_benchmark.oso")
+
+    benchmark(osl_utils.generate_node, node, nodes.AppleseedOSLNode)
@@ -0,0 +1,70 @@
+#
+# This source file is part of appleseed.
+# Visit https://appleseedhq.net/ for additional information and resources.
+#
+# This software is released under the MIT license.
+#
+# Copyright (c) 2019 The appleseedhq Organization
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+import pytest
+
+import shim
+from shim import fake_appleseed as asr
+
+final_tilecallback = shim.import_addon_module("render.final_tilecallback")
+
+get_pixels = final_tilecallback.FinalTileCallback._FinalTileCallback__get_pixels
+
+
+def make_image(tile_size, channel_count):
+    storage = [float(i % 256) / 255.0 for i in range(tile_size * tile_size * channel_count)]
+    return asr.Image(asr.Tile(tile_size, tile_size, channel_count, storage))
+
+
+@pytest.mark.parametrize('channel_count', [4, 16])
+@pytest.mark.parametrize('tile_size', [32, 64])
+def bench_get_pixels(benchmark, tile_size, channel_count):
+    image = make_image(tile_size, channel_count)
+
+    pixels = benchmark(get_pixels, image, 0, 0, tile_size, tile_size, 0, 0)
+
+    assert len(pixels) == tile_size * tile_size
+    assert len(pixels[0]) == channel_count
+
+
+def bench_get_pixels_cropped(benchmark):
+    image = make_image(64, 4)
+
+    pixels = benchmark(get_pixels, image, 0, 0, 40, 24, 8, 16)
+
+    assert len(pixels) == 40 * 24
+
+
+get_pixel_array = final_tilecallback.FinalTileCallback._FinalTileCallback__get_pixel_array
+
+
+@pytest.mark.parametrize('channel_count', [4, 16])
+def bench_get_pixel_array(benchmark, channel_count):
+    image = make_image(64, channel_count)
+
+    pixels = benchmark(get_pixel_array, image, 0, 0, 64, 64, 0, 0)
+
+    assert pixels.shape == (64, 64, channel_count)
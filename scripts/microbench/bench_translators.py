@@ -0,0 +1,101 @@
+#
+# This source file is part of appleseed.
+# Visit https://appleseedhq.net/ for additional information and resources.
+#
+# This software is released under the MIT license.
+#
+# Copyright (c) 2019 The appleseedhq Organization
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+import random
+
+import pytest
+
+import shim
+from shim import rna
+
+util = shim.import_addon_module("utils.util")
+translator = shim.import_addon_module("translators.translator")
+scene = shim.import_addon_module("translators.scene")
+mesh = shim.import_addon_module("translators.objects.mesh")
+utilites = shim.import_addon_module("translators.utilites")
+
+get_instance_data = scene.SceneTranslator._SceneTranslator__get_instance_data
+
+
+def make_instances(count, particles):
+    """Returns depsgraph instances of a few objects, generated by a particle system or not"""
+    objects = [rna.Object(f"Object{i}") for i in range(8)]
+    emitter = rna.Object("Emitter") if particles else None
+
+    return [rna.ObjectInstance(objects[i % len(objects)],
+                               i,
+                               parent=emitter,
+                               matrix_world=rna.Matrix.Translation((i, 0.0, 0.0)))
+            for i in range(count)]
+
+
+@pytest.mark.parametrize('duplicate_ratio', [0.0, 0.5])
+def bench_filter_params(benchmark, duplicate_ratio):
+    rng = random.Random(0)
+    unique_count = int(2000 * (1.0 - duplicate_ratio))
+    params = [f"param{i}" for i in range(unique_count)]
+    params += [rng.choice(params) for _ in range(2000 - unique_count)]
+
+    filtered = benchmark(util.filter_params, params)
+
+    assert len(filtered) == unique_count
+
+
+def bench_convert_matrix(benchmark):
+    m = rna.Matrix.Translation((1.0, 2.0, 3.0))
+
+    converted = benchmark(translator.Translator._convert_matrix, m)
+
+    assert converted[3] == 1.0 and converted[7] == 3.0 and converted[11] == -2.0
+
+
+@pytest.mark.parametrize('particles', [False, True])
+def bench_get_instance_data(benchmark, particles):
+    instances = make_instances(10000, particles)
+
+    def get_all_instance_data():
+        return [get_instance_data(inst) for inst in instances]
+
+    results = benchmark(get_all_instance_data)
+
+    assert len(set(inst_id for _, inst_id in results)) == len(instances)
+
+
+def bench_add_instance_steps(benchmark):
+    instances = make_instances(10000, True)
+
+    def add_instance_steps():
+        translators = dict()
+        for inst in instances:
+            obj, inst_id = get_instance_data(inst)
+            if obj not in translators:
+                translators[obj] = mesh.MeshTranslator(obj, utilites.ProjectExportMode.FINAL_RENDER, None)
+            translators[obj].add_instance_step(0.0, inst_id, inst.matrix_world)
+        return translators
+
+    translators = benchmark(add_instance_steps)
+
+    assert sum(trans.instances_size for trans in translators.values()) == len(instances)
@@ -0,0 +1,71 @@
+#
+# This source file is part of appleseed.
+# Visit https://appleseedhq.net/ for additional information and resources.
+#
+# This software is released under the MIT license.
+#
+# Copyright (c) 2019 The appleseedhq Organization
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""
+Stand-ins for the modules Blender and appleseed provide, so that the add-on can be imported and
+its hot paths benchmarked by a plain Python interpreter.
+"""
+
+import importlib
+import os
+import sys
+import types
+
+from . import fake_appleseed, fake_bpy
+
+ADDON_NAME = "blenderseed"
+
+# The add-on is the repository root, three levels up from this package.
+ADDON_DIRECTORY = os.path.realpath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+
+
+def install():
+    """Registers the fake bpy, appleseed and Blender utility modules, unless the real ones are loaded"""
+    for name, module in fake_bpy.create_modules().items():
+        sys.modules.setdefault(name, module)
+
+    sys.modules.setdefault('appleseed', fake_appleseed)
+
+
+def import_addon_module(name):
+    """
+    Imports a module of the add-on, e.g. 'translators.scene'.
+    The add-on package is created without running its __init__.py, which registers it with Blender.
+    """
+
+    install()
+
+    if ADDON_NAME not in sys.modules:
+        package = types.ModuleType(ADDON_NAME)
+        package.__path__ = [ADDON_DIRECTORY]
+        sys.modules[ADDON_NAME] = package
+
+        # Same order as the add-on's register(), which the circular imports between utils and
+        # properties rely on.
+        importlib.import_module(f"{ADDON_NAME}.preferences")
+        importlib.import_module(f"{ADDON_NAME}.properties")
+
+    return importlib.import_module(f"{ADDON_NAME}.{name}")
@@ -0,0 +1,186 @@
+#
+# This source file is part of appleseed.
+# Visit https://appleseedhq.net/ for additional information and resources.
+#
+# This software is released under the MIT license.
+#
+# Copyright (c) 2019 The appleseedhq Organization
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""
+Stand-in for the appleseed Python bindings.
+
+The classes the benchmarked code paths use keep just enough state to behave like their native
+counterparts.  Any other name resolves to a stub class.
+"""
+
+from .stub import Stub, StubMeta
+
+
+def __getattr__(name):
+    if name.startswith('__'):
+        raise AttributeError(name)
+
+    stub_class = StubMeta(name, (Stub,), {'__module__': __name__})
+    globals()[name] = stub_class
+
+    return stub_class
+
+
+class Tile:
+    def __init__(self, width, height, channel_count, storage=None):
+        self.__width = width
+        self.__height = height
+        self.__channel_count = channel_count
+        self.__storage = storage if storage is not None else [0.0] * (width * height * channel_count)
+
+    def get_width(self):
+        return self.__width
+
+    def get_height(self):
+        return self.__height
+
+    def get_channel_count(self):
+        return self.__channel_count
+
+    def get_storage(self):
+        return self.__storage
+
+
+class ImageProperties:
+    def __init__(self, tile_width, tile_height, channel_count):
+        self.m_tile_width = tile_width
+        self.m_tile_height = tile_height
+        self.m_channel_count = channel_count
+
+
+class Image:
+    """Image made of identical tiles"""
+
+    def __init__(self, tile):
+        self.__tile = tile
+
+    def tile(self, tile_x, tile_y):
+        return self.__tile
+
+    def properties(self):
+        return ImageProperties(self.__tile.get_width(), self.__tile.get_height(), self.__tile.get_channel_count())
+
+
+class MeshObject:
+    def __init__(self, name, params):
+        self.__name = name
+        self.__params = dict(params)
+        self.material_slots = list()
+
+    def get_name(self):
+        return self.__name
+
+    def get_parameters(self):
+        return self.__params
+
+    def set_parameters(self, params):
+        self.__params = dict(params)
+
+    def reserve_material_slots(self, count):
+        pass
+
+    def push_material_slot(self, name):
+        self.material_slots.append(name)
+        return len(self.material_slots) - 1
+
+
+class ShaderGroup:
+    def __init__(self, name, params=None):
+        self.__name = name
+        self.shaders = list()
+        self.connections = list()
+
+    def get_name(self):
+        return self.__name
+
+    def add_shader(self, shader_type, shader_name, layer_name, params):
+        self.shaders.append((shader_type, shader_name, layer_name, dict(params)))
+
+    def add_source_shader(self, shader_type, shader_name, layer_name, source, params):
+        self.shaders.append((shader_type, shader_name, layer_name, dict(params)))
+
+    def add_connection(self, src_layer, src_param, dst_layer, dst_param):
+        self.connections.append((src_layer, src_param, dst_layer, dst_param))
+
+    def clear(self):
+        self.shaders.clear()
+        self.connections.clear()
+
+
+class BlTransformLibrary:
+    """Collects the transform steps of the instances of an object"""
+
+    def __init__(self):
+        self.__xforms = dict()
+
+    def __len__(self):
+        return len(self.__xforms)
+
+    def size(self):
+        return len(self.__xforms)
+
+    def add_xform_step(self, time, instance_id, matrix):
+        self.__xforms.setdefault(instance_id, list()).append((time, matrix))
+
+    def optimize_xforms(self):
+        pass
+
+    def needs_assembly(self):
+        return len(self.__xforms) > 1
+
+    def get_single_transform(self):
+        return next(iter(self.__xforms.values()))[0][1]
+
+    def clear_instances(self, as_assembly):
+        self.__xforms.clear()
+
+    def flush_instances(self, as_assembly, assembly_name=None):
+        pass
+
+
+class ShaderQuery:
+    """
+    Answers queries about a single shader, described by a dictionary with the 'name', 'metadata'
+    and 'params' entries a real query would return.
+    """
+
+    def __init__(self, shader=None):
+        self.__shader = shader
+
+    def open(self, filename):
+        return self.__shader is not None
+
+    def get_shader_name(self):
+        return self.__shader['name']
+
+    def get_metadata(self):
+        return self.__shader['metadata']
+
+    def get_num_params(self):
+        return len(self.__shader['params'])
+
+    def get_param_info(self, index):
+        return self.__shader['params'][index]
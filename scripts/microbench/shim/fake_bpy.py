@@ -0,0 +1,94 @@
+#
+# This source file is part of appleseed.
+# Visit https://appleseedhq.net/ for additional information and resources.
+#
+# This software is released under the MIT license.
+#
+# Copyright (c) 2019 The appleseedhq Organization
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""
+Stand-ins for bpy and the Blender utility modules the add-on imports.
+"""
+
+import os
+import sys
+import types
+
+from .stub import Stub, StubModule
+from . import rna
+
+
+class AddonPreferences:
+    curve_resolution = 256
+    log_level = 'error'
+
+
+class Context(Stub):
+    def __init__(self):
+        super().__init__()
+        self.preferences = types.SimpleNamespace(addons={'blenderseed': types.SimpleNamespace(preferences=AddonPreferences())})
+
+
+def persistent(function):
+    return function
+
+
+def create_modules():
+    """Returns the fake modules, keyed by their import names"""
+
+    modules = {name: StubModule(name) for name in ('bpy',
+                                                   'bpy.types',
+                                                   'bpy.props',
+                                                   'bpy.utils',
+                                                   'bpy.utils.previews',
+                                                   'bpy.app',
+                                                   'bpy.app.handlers',
+                                                   'bpy.app.timers',
+                                                   'bpy.path',
+                                                   'bpy_extras',
+                                                   'mathutils',
+                                                   'nodeitems_utils',
+                                                   'nodeitems_builtins')}
+
+    bpy = modules['bpy']
+    bpy.types = modules['bpy.types']
+    bpy.props = modules['bpy.props']
+    bpy.utils = modules['bpy.utils']
+    bpy.utils.previews = modules['bpy.utils.previews']
+    bpy.app = modules['bpy.app']
+    bpy.app.handlers = modules['bpy.app.handlers']
+    bpy.app.timers = modules['bpy.app.timers']
+    bpy.path = modules['bpy.path']
+    bpy.context = Context()
+    bpy.data = Stub()
+    bpy.ops = Stub()
+
+    bpy.app.version = (2, 83, 0)
+    bpy.app.version_string = "2.83.0"
+    bpy.app.background = True
+    bpy.app.binary_path_python = sys.executable
+    bpy.app.handlers.persistent = persistent
+
+    bpy.path.abspath = os.path.abspath
+
+    modules['mathutils'].Matrix = rna.Matrix
+
+    return modules
@@ -0,0 +1,102 @@
+#
+# This source file is part of appleseed.
+# Visit https://appleseedhq.net/ for additional information and resources.
+#
+# This software is released under the MIT license.
+#
+# Copyright (c) 2019 The appleseedhq Organization
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+"""
+Minimal Blender data (RNA) objects, built in Python for the benchmarks.
+"""
+
+import types
+
+
+class Matrix:
+    """4x4 matrix indexed as m[row][column]"""
+
+    def __init__(self, rows=None):
+        self.__rows = [list(row) for row in rows] if rows is not None else [[float(i == j) for j in range(4)] for i in range(4)]
+
+    def __getitem__(self, index):
+        return self.__rows[index]
+
+    @classmethod
+    def Translation(cls, vector):
+        m = cls()
+        for i, value in enumerate(vector):
+            m[i][3] = value
+        return m
+
+
+class ColorRampElement:
+    def __init__(self, position, color):
+        self.position = position
+        self.color = tuple(color)
+
+
+class ColorRamp:
+    def __init__(self, stops, interpolation='LINEAR', color_mode='RGB', hue_interpolation='NEAR'):
+        self.elements = [ColorRampElement(position, color) for position, color in stops]
+        self.interpolation = interpolation
+        self.color_mode = color_mode
+        self.hue_interpolation = hue_interpolation
+
+    def evaluate(self, position):
+        """Linear interpolation between the stops, used by the non vectorized code path"""
+        elements = self.elements
+        if position <= elements[0].position:
+            return elements[0].color
+        for left, right in zip(elements, elements[1:]):
+            if position <= right.position:
+                if right.position == left.position:
+                    return right.color
+                fac = (position - left.position) / (right.position - left.position)
+                return tuple((1.0 - fac) * l + fac * r for l, r in zip(left.color, right.color))
+        return elements[-1].color
+
+
+class Object:
+    def __init__(self, name, type='MESH'):
+        self.name = name
+        self.name_full = name
+        self.type = type
+        self.modifiers = list()
+        self.matrix_world = Matrix()
+        self.appleseed = types.SimpleNamespace(obj_name=name, use_deformation_blur=False)
+
+    @property
+    def original(self):
+        return self
+
+
+class ObjectInstance:
+    """Instance of a depsgraph, either of an object itself or generated by a particle system"""
+
+    def __init__(self, obj, persistent_id, parent=None, matrix_world=None):
+        self.is_instance = parent is not None
+        self.object = obj
+        self.instance_object = obj
+        self.parent = parent
+        self.persistent_id = (persistent_id,) + (0,) * 7
+        self.matrix_world = matrix_world if matrix_world is not None else Matrix()
+        self.show_self = True
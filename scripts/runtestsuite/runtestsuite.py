@@ -32,12 +32,21 @@ from __future__ import print_function
 import argparse
 import colorama
 import datetime
+import hashlib
+import json
+import math
+import multiprocessing
 import os
 import png
 import subprocess
 import sys
 import urllib
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 
 #--------------------------------------------------------------------------------------------------
 # Constants.
@@ -50,6 +59,25 @@ BLENDER_BASE_ARGS = ""
 VALUE_THRESHOLD = 2                 # max allowed absolute diff between two pixel components, in [0, 255]
 MAX_DIFFERING_COMPONENTS = 4 * 2    # max number of pixel components that are allowed to differ significantly
 
+# Python expression run by Blender before rendering to limit appleseed to a given number of threads.
+THREAD_CAP_EXPRESSION = "import bpy; [(setattr(s.appleseed, 'threads_auto', False), setattr(s.appleseed, 'threads', {0})) for s in bpy.data.scenes]"
+
+# Python expression run by Blender before rendering to write the translation profile next to the output.
+WRITE_PROFILE_EXPRESSION = "import bpy; [setattr(s.appleseed, 'write_profile', True) for s in bpy.data.scenes]"
+
+# Python expression run by Blender to print the versions that test results depend on.
+VERSIONS_EXPRESSION = "import bpy; print('BLENDER_VERSION=' + bpy.app.version_string); import appleseed; print('APPLESEED_VERSION=' + appleseed.get_synthetic_version_string())"
+
+# Directories of the add-on that do not affect renders, skipped when hashing its source tree.
+# The appleseed binaries are accounted for by their version instead.
+ADDON_HASH_EXCLUDED_DIRECTORIES = set(['.git', '__pycache__', 'appleseed', 'docs', 'scripts', 'tests'])
+
+# Metrics recorded in benchmark mode, along with their display names.
+BENCHMARK_METRICS = [('translation_time', "Translation"),
+                     ('render_time', "Render"),
+                     ('tile_callback_time', "Tile Callback"),
+                     ('peak_rss', "Peak Memory")]
+
 
 #--------------------------------------------------------------------------------------------------
 # Utilities.
@@ -91,20 +119,50 @@ def format_duration(duration):
     return "{0:02}:{1:02}:{2:09.6f}".format(hours, minutes, seconds)
 
 
+def format_metric(metric, value):
+    if metric == 'peak_rss':
+        return "{0:.1f} MiB".format(value / (1024 * 1024))
+    return "{0:.3f} s".format(value)
+
+
 def load_file(filepath):
     with open(filepath, "rt") as file:
         return file.read()
 
 
+def hash_file(hasher, filepath):
+    with open(filepath, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            hasher.update(chunk)
+
+
+def load_json_file(filepath, default):
+    if not os.path.exists(filepath):
+        return default
+    with open(filepath, "rt") as file:
+        return json.load(file)
+
+
+def write_json_file(filepath, data):
+    with open(filepath, "wt") as file:
+        json.dump(data, file, indent=2, sort_keys=True)
+
+
 def read_png_file(filepath):
     data = png.Reader(filename=filepath).asRGBA8()
     width = data[0]
     height = data[1]
-    rows = list(data[2])
+    if np is not None:
+        # Stack the decoded rows into a single array instead of keeping them as Python rows.
+        rows = np.vstack([np.asarray(row, dtype=np.uint8) for row in data[2]]) if height > 0 else np.zeros((0, width * 4), dtype=np.uint8)
+    else:
+        rows = list(data[2])
     return width, height, rows
 
 
 def write_rgba_png_file(filepath, rows):
+    if np is not None and isinstance(rows, np.ndarray):
+        rows = rows.astype(np.uint8).tolist()
     width = len(rows[0]) / 4
     height = len(rows)
     writer = png.Writer(width=width, height=height, alpha=True)
@@ -148,11 +206,15 @@ class Logger:
     def start_rendering(self, scene):
         self.__print_scene(scene)
 
-    def pass_rendering(self, rendering_time):
-        self.__print_result(format_duration(rendering_time), "Passed", colorama.Fore.GREEN)
+    def pass_rendering(self, rendering_time, cached=False):
+        self.__print_result(self.__format_time(rendering_time, cached), "Passed", colorama.Fore.GREEN)
 
-    def fail_rendering(self, rendering_time, message):
-        self.__print_result(format_duration(rendering_time), message, colorama.Fore.RED)
+    def fail_rendering(self, rendering_time, message, cached=False):
+        self.__print_result(self.__format_time(rendering_time, cached), message, colorama.Fore.RED)
+
+    def __format_time(self, rendering_time, cached):
+        # Renders reused from the cache are marked with an asterisk.
+        return ("*" if cached else "") + format_duration(rendering_time)
 
     def __print_scene(self, scene, color=colorama.Fore.RESET):
         scene = remove_prefix(scene, "./")
@@ -181,6 +243,8 @@ class ReportWriter:
         self.footer_template = load_file(os.path.join(template_directory, "footer_template.html"))
         self.simple_failure_template = load_file(os.path.join(template_directory, "simple_failure_template.html"))
         self.detailed_failure_template = load_file(os.path.join(template_directory, "detailed_failure_template.html"))
+        self.benchmark_template = load_file(os.path.join(template_directory, "benchmark_template.html"))
+        self.benchmark_row_template = load_file(os.path.join(template_directory, "benchmark_row_template.html"))
 
     def open(self, args, filepath):
         self.args = args
@@ -188,6 +252,7 @@ class ReportWriter:
         self.__write_header(args)
         self.failures = 0
         self.all_commands = []
+        self.benchmark_section = ""
 
     def close(self):
         self.__write_footer()
@@ -229,6 +294,48 @@ class ReportWriter:
                                        'update-command': command}))
         self.file.flush()
 
+    def report_benchmark(self, benchmark, baseline):
+        rows = ""
+
+        for scene in sorted(benchmark['scenes']):
+            metrics = benchmark['scenes'][scene]
+            regressions = benchmark['regressions'].get(scene, {})
+            baseline_metrics = baseline['scenes'].get(scene, {}) if baseline is not None else {}
+
+            variables = {'project-path': scene}
+            for metric, _ in BENCHMARK_METRICS:
+                variables[metric.replace('_', '-')] = self.__format_benchmark_metric(metric, metrics, baseline_metrics)
+
+            if metrics is None:
+                variables.update({'row-class': "failed", 'status': "Failed"})
+            elif regressions:
+                variables.update({'row-class': "regression", 'status': "Regression"})
+            else:
+                variables.update({'row-class': "", 'status': "OK" if baseline_metrics else "No Baseline"})
+
+            rows += self.__render(self.benchmark_row_template, variables)
+
+        self.benchmark_section = self.__render(self.benchmark_template,
+                                               {'runs': benchmark['runs'],
+                                                'baseline': benchmark['baseline'] or "None",
+                                                'regression-threshold': benchmark['regression_threshold'],
+                                                'significance': benchmark['significance'],
+                                                'regression-count': len(benchmark['regressions']),
+                                                'benchmark-rows': rows})
+
+    def __format_benchmark_metric(self, metric, metrics, baseline_metrics):
+        if metrics is None or metric not in metrics:
+            return ""
+
+        stats = metrics[metric]
+        text = "{0} &plusmn; {1}".format(format_metric(metric, stats['mean']), format_metric(metric, stats['stdev']))
+
+        if metric in baseline_metrics and baseline_metrics[metric]['mean'] > 0.0:
+            change = 100.0 * (stats['mean'] - baseline_metrics[metric]['mean']) / baseline_metrics[metric]['mean']
+            text += " ({0:+.1f} %)".format(change)
+
+        return text
+
     def __write_header(self, args):
         self.file.write(self.__render(self.header_template,
                                       {'test-date': datetime.datetime.now(),
@@ -238,7 +345,7 @@ class ReportWriter:
         self.file.flush()
 
     def __write_footer(self):
-        self.file.write(self.__render(self.footer_template, {}))
+        self.file.write(self.__render(self.footer_template, {'benchmark-section': self.benchmark_section}))
 
     def __render(self, template, variables):
         html = template
@@ -255,12 +362,38 @@ class ReportWriter:
 
 #--------------------------------------------------------------------------------------------------
 # Render a given project file.
+# Returns a (success, rendering_time, peak_rss) tuple where peak_rss is the peak resident set size
+# of Blender in bytes, or None if it cannot be measured on this platform.
 #--------------------------------------------------------------------------------------------------
 
-def render_project_file(args, project_filepath, output_filepath, log_filepath):
+def wait_for_process(process):
+    if not hasattr(os, 'wait4'):
+        return process.wait(), None
+
+    _, status, rusage = os.wait4(process.pid, 0)
+    process.returncode = os.WEXITSTATUS(status) if os.WIFEXITED(status) else -os.WTERMSIG(status)
+
+    # ru_maxrss is expressed in bytes on macOS and in kilobytes elsewhere.
+    peak_rss = rusage.ru_maxrss if sys.platform == 'darwin' else rusage.ru_maxrss * 1024
+
+    return process.returncode, peak_rss
+
+
+def render_project_file(args, project_filepath, output_filepath, log_filepath, write_profile=False):
     with open(log_filepath, "w", 0) as log_file:
         # Base command line.
-        command = '"{0}" -b "{1}" -o "{2}" -x 1 -f 1'.format(args.tool_path, project_filepath, output_filepath)
+        command = '"{0}" -b "{1}"'.format(args.tool_path, project_filepath)
+
+        # Cap the threads of each Blender instance when several of them run concurrently.
+        if args.threads_per_job is not None:
+            command += ' -t {0} --python-expr "{1}"'.format(args.threads_per_job,
+                                                            THREAD_CAP_EXPRESSION.format(args.threads_per_job))
+
+        # Have the add-on write its translation profile and render timings next to the output.
+        if write_profile:
+            command += ' --python-expr "{0}"'.format(WRITE_PROFILE_EXPRESSION)
+
+        command += ' -o "{0}" -x 1 -f 1'.format(output_filepath)
 
         # Additional arguments passed on runtestsuite.py's command line.
         if args.args:
@@ -270,10 +403,91 @@ def render_project_file(args, project_filepath, output_filepath, log_filepath):
 
         # Invoke Blender.
         start_time = datetime.datetime.now()
-        result = subprocess.call(command, stderr=log_file, shell=True)
+        result, peak_rss = wait_for_process(subprocess.Popen(command, stderr=log_file, shell=True))
         end_time = datetime.datetime.now()
 
-        return result == 0, end_time - start_time
+        return result == 0, end_time - start_time, peak_rss
+
+
+#--------------------------------------------------------------------------------------------------
+# Cache of render results.
+# A test scene is only rendered again if its inputs changed since its last render: the .blend file
+# and the other files of its directory, the add-on source tree, the Blender and appleseed versions,
+# and the arguments forwarded to Blender.
+#--------------------------------------------------------------------------------------------------
+
+def query_versions(args):
+    versions = {'blender': "unknown", 'appleseed': "unknown"}
+
+    command = '"{0}" -b --python-expr "{1}"'.format(args.tool_path, VERSIONS_EXPRESSION)
+    try:
+        with open(os.devnull, "w") as devnull:
+            output = subprocess.check_output(command, stderr=devnull, shell=True)
+    except (subprocess.CalledProcessError, OSError):
+        return versions
+
+    for line in output.splitlines():
+        if line.startswith("BLENDER_VERSION="):
+            versions['blender'] = line.split("=", 1)[1].strip()
+        elif line.startswith("APPLESEED_VERSION="):
+            versions['appleseed'] = line.split("=", 1)[1].strip()
+
+    return versions
+
+
+def hash_addon_tree(addon_path):
+    hasher = hashlib.sha1()
+
+    for dirpath, dirnames, filenames in os.walk(addon_path):
+        dirnames[:] = sorted(d for d in dirnames if d not in ADDON_HASH_EXCLUDED_DIRECTORIES)
+
+        for filename in sorted(filenames):
+            if os.path.splitext(filename)[1] in ('.pyc', '.pyo'):
+                continue
+
+            filepath = os.path.join(dirpath, filename)
+            hasher.update(os.path.relpath(filepath, addon_path).replace("\\", "/").encode('utf-8'))
+            hash_file(hasher, filepath)
+
+    return hasher.hexdigest()
+
+
+def compute_render_key(args, project_directory, project_filename):
+    hasher = hashlib.sha1()
+    hasher.update(args.render_inputs_key.encode('utf-8'))
+
+    hash_file(hasher, os.path.join(project_directory, project_filename))
+
+    # Textures and other assets next to the test scenes.
+    for filename in sorted(os.listdir(project_directory)):
+        filepath = os.path.join(project_directory, filename)
+        if os.path.isfile(filepath) and os.path.splitext(filename)[1] not in ('.blend', '.blend1'):
+            hasher.update(filename.encode('utf-8'))
+            hash_file(hasher, filepath)
+
+    return hasher.hexdigest()
+
+
+# Returns a (success, rendering_time) tuple if the test scene was already rendered from the same inputs.
+def load_cached_render(cache_filepath, render_key, output_filepath):
+    try:
+        record = load_json_file(cache_filepath, None)
+    except ValueError:
+        return None
+
+    if record is None or record['key'] != render_key:
+        return None
+
+    if record['success'] and not os.path.exists(output_filepath):
+        return None
+
+    return record['success'], datetime.timedelta(seconds=record['rendering_time'])
+
+
+def store_cached_render(cache_filepath, render_key, rendering_success, rendering_time):
+    write_json_file(cache_filepath, {'key': render_key,
+                                     'success': rendering_success,
+                                     'rendering_time': rendering_time.total_seconds()})
 
 
 #--------------------------------------------------------------------------------------------------
@@ -285,6 +499,9 @@ def render_project_file(args, project_filepath, output_filepath, log_filepath):
 #--------------------------------------------------------------------------------------------------
 
 def compare_images(rows1, rows2, value_threshold):
+    if np is not None:
+        return compare_images_numpy(rows1, rows2, value_threshold)
+
     num_diff = 0
     max_diff = 0
     diff_image = []
@@ -298,13 +515,26 @@ def compare_images(rows1, rows2, value_threshold):
     return num_diff, max_diff, diff_image
 
 
+def compare_images_numpy(rows1, rows2, value_threshold):
+    diff_image = np.abs(np.asarray(rows1, dtype=np.int16) - np.asarray(rows2, dtype=np.int16))
+
+    num_diff = int(np.count_nonzero(diff_image > value_threshold))
+    max_diff = int(diff_image.max()) if diff_image.size > 0 else 0
+
+    return num_diff, max_diff, diff_image
+
+
 def fit(x, min_x, max_x, min_y, max_y):
     assert min_x != max_x
     k = (x - min_x) / (max_x - min_x)
     return min_y * (1 - k) + max_y * k
 
 
+# Returns the false color version of an image, which is modified in place if it is a list of rows.
 def transform_to_false_color(rows):
+    if np is not None and isinstance(rows, np.ndarray):
+        return transform_to_false_color_numpy(rows)
+
     image_min = 255
     image_max = 0
 
@@ -348,14 +578,40 @@ def transform_to_false_color(rows):
             row[i + 2] = 255 - fm
             row[i + 3] = 255
 
+    return rows
+
+
+def transform_to_false_color_numpy(image):
+    pixels = image.reshape(image.shape[0], -1, 4)
+    m = pixels.max(axis=2)
+
+    image_min = int(m.min())
+    image_max = int(m.max())
+
+    if image_min != image_max:
+        fm = (255 * ((m - image_min) / float(image_max - image_min))).astype(np.int16)
+    else:
+        fm = m
+
+    false_color = np.empty_like(pixels)
+    false_color[..., 0] = fm
+    false_color[..., 1] = 0
+    false_color[..., 2] = 255 - fm
+    false_color[..., 3] = 255
+    false_color[m == 0] = (0, 0, 0, 255)
+
+    return false_color.reshape(image.shape)
+
 
 #--------------------------------------------------------------------------------------------------
 # Render a given test scene.
-# Return True if the test scene passed, False if it failed to render, or if the output does not
-# match the reference image.
+# Returns a dictionary describing the outcome of the test. The test scene passed if 'passed' is
+# True; otherwise it failed to render, or the output does not match the reference image.
+# This runs in worker processes when several test scenes are rendered concurrently, so it must
+# neither print nor write to the report.
 #--------------------------------------------------------------------------------------------------
 
-def render_test_scene(args, logger, report_writer, project_directory, project_filename):
+def render_test_scene(args, project_directory, project_filename):
     project_basename = os.path.splitext(project_filename)[0]
     project_filepath = os.path.join(project_directory, project_filename)
 
@@ -370,105 +626,298 @@ def render_test_scene(args, logger, report_writer, project_directory, project_fi
     log_filename = project_basename + '.txt'
     log_filepath = os.path.join(output_directory, log_filename)
 
-    safe_mkdir(output_directory)
+    cache_filepath = os.path.join(output_directory, project_basename + '.cache.json')
 
-    logger.start_rendering(project_filepath)
+    result = {'project_filepath': project_filepath,
+              'ref_filepath': ref_filepath,
+              'output_filepath': output_filepath,
+              'log_filepath': log_filepath,
+              'passed': False,
+              'status': "Passed",
+              'failure_reason': None,
+              'diff_filepath': None,
+              'cached': False}
 
-    if not args.skip_rendering:
-        safe_remove(output_filepath)
-        safe_remove(log_filepath)
-        rendering_success, rendering_time = render_project_file(args,
-                                                                project_filepath,
-                                                                output_blender_filename,
-                                                                log_filepath)
-    else:
+    safe_mkdir(output_directory)
+
+    if args.skip_rendering:
         rendering_success = True
         rendering_time = datetime.timedelta(0)
+    else:
+        render_key = compute_render_key(args, project_directory, project_filename) if args.use_cache else None
+        cached_render = load_cached_render(cache_filepath, render_key, output_filepath) if args.use_cache else None
+
+        if cached_render is not None:
+            rendering_success, rendering_time = cached_render
+            result['cached'] = True
+        else:
+            safe_remove(output_filepath)
+            safe_remove(log_filepath)
+            safe_remove(cache_filepath)
+            rendering_success, rendering_time, _ = render_project_file(args,
+                                                                       project_filepath,
+                                                                       output_blender_filename,
+                                                                       log_filepath)
+            if args.use_cache:
+                store_cached_render(cache_filepath, render_key, rendering_success, rendering_time)
+
+    result['rendering_time'] = rendering_time
 
     if not rendering_success:
-        logger.fail_rendering(rendering_time, "Failed")
-        report_writer.report_simple_failure(project_filepath, ref_filepath, output_blender_filename, log_filepath, "Rendering failed")
-        return False
+        result.update({'status': "Failed", 'failure_reason': "Rendering failed", 'output_filepath': output_blender_filename})
+        return result
 
     if not os.path.exists(output_filepath):
         if not os.path.exists(ref_filepath):
-            logger.pass_rendering(rendering_time)
-            return True
+            result['passed'] = True
         else:
-            logger.fail_rendering(rendering_time, "No Output")
-            report_writer.report_simple_failure(project_filepath, ref_filepath, output_blender_filename, log_filepath, "Output image is missing")
-            return False
+            result.update({'status': "No Output", 'failure_reason': "Output image is missing", 'output_filepath': output_blender_filename})
+        return result
     else:
         if not os.path.exists(ref_filepath):
-            logger.fail_rendering(rendering_time, "No Reference")
-            report_writer.report_simple_failure(project_filepath, ref_filepath, output_blender_filename, log_filepath, "Reference image is missing")
-            return False
+            result.update({'status': "No Reference", 'failure_reason': "Reference image is missing", 'output_filepath': output_blender_filename})
+            return result
 
     out_width, out_height, out_rows = read_png_file(output_filepath)
     ref_width, ref_height, ref_rows = read_png_file(ref_filepath)
 
     if out_width != ref_width or out_height != ref_height:
-        logger.fail_rendering(rendering_time, "Size Mismatch")
-        report_writer.report_simple_failure(project_filepath, ref_filepath, output_filepath, log_filepath,
-                                            "Output and reference images have different sizes")
-        return False
+        result.update({'status': "Size Mismatch", 'failure_reason': "Output and reference images have different sizes"})
+        return result
 
     num_diff, max_diff, diff_image = compare_images(out_rows, ref_rows, VALUE_THRESHOLD)
 
     if num_diff > MAX_DIFFERING_COMPONENTS:
         diff_filename = project_basename + '.diff.png'
         diff_filepath = os.path.join(output_directory, diff_filename)
-        transform_to_false_color(diff_image)
+        diff_image = transform_to_false_color(diff_image)
         write_rgba_png_file(diff_filepath, diff_image)
 
-        num_comps = ref_width * ref_height * 4
-        logger.fail_rendering(rendering_time, "DIFFERENCES")
-        report_writer.report_detailed_failure(project_filepath, ref_filepath, output_filepath, log_filepath,
-                                              "Output and reference images are significantly different",
-                                              num_diff, max_diff, num_comps, diff_filepath)
-        return False
+        result.update({'status': "DIFFERENCES",
+                       'failure_reason': "Output and reference images are significantly different",
+                       'num_diff': num_diff,
+                       'max_diff': max_diff,
+                       'num_comps': ref_width * ref_height * 4,
+                       'diff_filepath': diff_filepath})
+        return result
 
-    logger.pass_rendering(rendering_time)
+    result['passed'] = True
 
-    return True
+    return result
 
 
 #--------------------------------------------------------------------------------------------------
-# Render all test scenes in a given directory (possibly recursively).
-# Returns the number of rendered and passing test scenes.
+# Benchmark a given test scene.
+# Renders the test scene args.benchmark times and returns the statistics of each metric, or None
+# if one of the renders failed. Like render_test_scene(), this may run in worker processes.
 #--------------------------------------------------------------------------------------------------
 
-def render_test_scenes(script_directory, args):
-    rendered_scene_count = 0
-    passing_scene_count = 0
+def summarize_samples(samples):
+    mean = sum(samples) / len(samples)
+    stdev = math.sqrt(sum((s - mean) ** 2 for s in samples) / (len(samples) - 1)) if len(samples) > 1 else 0.0
+    return {'samples': samples, 'mean': mean, 'stdev': stdev, 'min': min(samples)}
 
-    logger = Logger()
-    logger.begin_table()
 
-    report_writer = ReportWriter(script_directory)
-    report_writer.open(args, "report.html")
+def benchmark_test_scene(args, project_directory, project_filename):
+    project_basename = os.path.splitext(project_filename)[0]
+    project_filepath = os.path.join(project_directory, project_filename)
+
+    output_directory = os.path.join(os.path.realpath(project_directory), 'renders')
+    output_blender_filename = os.path.join(output_directory, project_basename)
+    profile_filepath = output_blender_filename + "0001.profile.json"
+    log_filepath = os.path.join(output_directory, project_basename + '.benchmark.txt')
+
+    samples = dict((metric, []) for metric, _ in BENCHMARK_METRICS)
+
+    for run in range(args.benchmark):
+        safe_remove(profile_filepath)
+        rendering_success, _, peak_rss = render_project_file(args,
+                                                             project_filepath,
+                                                             output_blender_filename,
+                                                             log_filepath,
+                                                             write_profile=True)
+        if not rendering_success or not os.path.exists(profile_filepath):
+            return None
+
+        profile = load_json_file(profile_filepath, None)
+        samples['translation_time'].append(profile['time'])
+        samples['render_time'].append(sum(render['time'] for render in profile['render']))
+        samples['tile_callback_time'].append(sum(render['tile_callback_time'] for render in profile['render']))
+        if peak_rss is not None:
+            samples['peak_rss'].append(peak_rss)
+
+    return dict((metric, summarize_samples(values)) for metric, values in samples.items() if values)
+
+
+def render_test_scene_job(job):
+    args, project_directory, project_filename = job
+    result = render_test_scene(args, project_directory, project_filename)
+
+    if args.benchmark > 0 and not args.skip_rendering and result['status'] != "Failed":
+        result['benchmark'] = benchmark_test_scene(args, project_directory, project_filename)
+
+    return result
+
+
+#--------------------------------------------------------------------------------------------------
+# Compare benchmark results against a baseline.
+# A metric regressed if its mean grew by more than args.regression_threshold percent and, when both
+# sides have several samples, if Welch's t statistic of the difference exceeds args.significance.
+#--------------------------------------------------------------------------------------------------
+
+def find_regression(args, current, baseline):
+    if baseline['mean'] <= 0.0:
+        return None
+
+    increase = (current['mean'] - baseline['mean']) / baseline['mean']
+    if 100.0 * increase <= args.regression_threshold:
+        return None
+
+    current_count = len(current['samples'])
+    baseline_count = len(baseline['samples'])
+    if current_count > 1 and baseline_count > 1:
+        error = math.sqrt(current['stdev'] ** 2 / current_count + baseline['stdev'] ** 2 / baseline_count)
+        if error > 0.0 and (current['mean'] - baseline['mean']) / error < args.significance:
+            return None
+
+    return increase
+
+
+def record_benchmark(args, benchmarks):
+    baseline = load_json_file(args.baseline, None)
+
+    record = {'date': str(datetime.datetime.now()),
+              'tool_path': args.tool_path,
+              'runs': args.benchmark,
+              'baseline': args.baseline if baseline is not None else None,
+              'regression_threshold': args.regression_threshold,
+              'significance': args.significance,
+              'scenes': benchmarks,
+              'regressions': {}}
+
+    if baseline is not None:
+        for scene, metrics in benchmarks.items():
+            baseline_metrics = baseline['scenes'].get(scene)
+            if metrics is None or baseline_metrics is None:
+                continue
+
+            for metric, stats in metrics.items():
+                if metric in baseline_metrics:
+                    increase = find_regression(args, stats, baseline_metrics[metric])
+                    if increase is not None:
+                        record['regressions'].setdefault(scene, {})[metric] = increase
+
+    write_json_file(args.benchmark_output, record)
+
+    history = load_json_file(args.history, [])
+    history.append(record)
+    write_json_file(args.history, history)
+
+    if args.update_baseline:
+        write_json_file(args.baseline, record)
+
+    return record, baseline
+
+
+#--------------------------------------------------------------------------------------------------
+# Log the outcome of a test scene and add it to the report.
+# Returns True if the test scene passed.
+#--------------------------------------------------------------------------------------------------
+
+def report_test_scene(logger, report_writer, result):
+    logger.start_rendering(result['project_filepath'])
+
+    if result['passed']:
+        logger.pass_rendering(result['rendering_time'], result['cached'])
+        return True
+
+    logger.fail_rendering(result['rendering_time'], result['status'], result['cached'])
+
+    if result['diff_filepath'] is not None:
+        report_writer.report_detailed_failure(result['project_filepath'], result['ref_filepath'], result['output_filepath'], result['log_filepath'],
+                                              result['failure_reason'],
+                                              result['num_diff'], result['max_diff'], result['num_comps'], result['diff_filepath'])
+    else:
+        report_writer.report_simple_failure(result['project_filepath'], result['ref_filepath'], result['output_filepath'], result['log_filepath'],
+                                            result['failure_reason'])
+
+    return False
+
+
+#--------------------------------------------------------------------------------------------------
+# Render all test scenes in a given directory (possibly recursively).
+# Returns the number of rendered, passing and cached test scenes, and the benchmark record if benchmarking.
+#--------------------------------------------------------------------------------------------------
+
+def collect_test_scenes(logger, args):
+    test_scenes = []
 
     for dirpath, dirnames, filenames in walk(args.directory, args.recursive):
         if should_skip(os.path.basename(dirpath)):
             logger.skip_rendering(dirpath)
             continue
 
-        for filename in filenames:
+        for filename in sorted(filenames):
             if os.path.splitext(filename)[1] == '.blend':
                 if should_skip(filename):
                     logger.skip_rendering(os.path.join(dirpath, filename))
                     continue
 
-                rendered_scene_count += 1
+                test_scenes.append((dirpath, filename))
+
+    return test_scenes
 
-                if render_test_scene(args, logger, report_writer, dirpath, filename):
-                    passing_scene_count += 1
+
+def render_test_scenes(script_directory, args):
+    rendered_scene_count = 0
+    passing_scene_count = 0
+    cached_scene_count = 0
+
+    logger = Logger()
+    logger.begin_table()
+
+    # Only the main process writes to the report.
+    report_writer = ReportWriter(script_directory)
+    report_writer.open(args, "report.html")
+
+    test_scenes = collect_test_scenes(logger, args)
+
+    if args.jobs > 1:
+        # Results arrive as jobs complete but are reported in submission order.
+        pool = multiprocessing.Pool(args.jobs)
+        results = pool.imap(render_test_scene_job, [(args, dirpath, filename) for dirpath, filename in test_scenes])
+    else:
+        pool = None
+        results = (render_test_scene_job((args, dirpath, filename)) for dirpath, filename in test_scenes)
+
+    benchmarks = {}
+
+    for result in results:
+        rendered_scene_count += 1
+
+        if report_test_scene(logger, report_writer, result):
+            passing_scene_count += 1
+
+        if result['cached']:
+            cached_scene_count += 1
+
+        if 'benchmark' in result:
+            benchmarks[result['project_filepath']] = result['benchmark']
+
+    if pool is not None:
+        pool.close()
+        pool.join()
+
+    benchmark = None
+    if args.benchmark > 0 and not args.skip_rendering:
+        benchmark, baseline = record_benchmark(args, benchmarks)
+        report_writer.report_benchmark(benchmark, baseline)
 
     report_writer.close()
 
     logger.end_table()
 
-    return rendered_scene_count, passing_scene_count
+    return rendered_scene_count, passing_scene_count, cached_scene_count, benchmark
 
 
 #--------------------------------------------------------------------------------------------------
@@ -487,6 +936,28 @@ def main():
                         help="skip actual rendering, only generate the HTML report")
     parser.add_argument("-p", "--parameter", dest="args", metavar="ARG", nargs="*",
                         help="forward additional arguments to Blender")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="number of test scenes to render concurrently")
+    parser.add_argument("--threads-per-job", type=int, dest="threads_per_job",
+                        help="number of rendering threads of each Blender instance (defaults to the number of cores divided by the number of jobs when rendering concurrently)")
+    parser.add_argument("--no-cache", action='store_false', dest="use_cache",
+                        help="render all test scenes, even those whose inputs did not change since their last render")
+    parser.add_argument("--addon-path", dest="addon_path",
+                        help="set the path to the add-on source tree whose changes invalidate cached renders (defaults to the repository containing this script)")
+    parser.add_argument("-b", "--benchmark", type=int, default=0, metavar="RUNS",
+                        help="render each test scene RUNS more times and record translation time, render time, tile callback time and peak memory (timings are most reliable with --jobs 1)")
+    parser.add_argument("--benchmark-output", dest="benchmark_output", default="benchmark.json",
+                        help="file the benchmark results are written to (default: benchmark.json)")
+    parser.add_argument("--history", default="benchmark_history.json",
+                        help="file the benchmark results are appended to (default: benchmark_history.json)")
+    parser.add_argument("--baseline", default="benchmark_baseline.json",
+                        help="benchmark results to compare against (default: benchmark_baseline.json)")
+    parser.add_argument("--update-baseline", action='store_true', dest="update_baseline",
+                        help="store the benchmark results as the new baseline")
+    parser.add_argument("--regression-threshold", type=float, default=10.0, dest="regression_threshold", metavar="PERCENT",
+                        help="minimum increase over the baseline mean for a metric to regress (default: 10)")
+    parser.add_argument("--significance", type=float, default=2.0,
+                        help="minimum Welch's t statistic for an increase to be significant (default: 2)")
     parser.add_argument("directory", nargs='?', default=".", help="directory to scan")
     args = parser.parse_args()
 
@@ -495,6 +966,22 @@ def main():
     if args.tool_path is None:
         args.tool_path = os.path.join(script_directory, DEFAULT_TOOL_FILEPATH)
 
+    args.jobs = max(1, args.jobs)
+    if args.threads_per_job is None and args.jobs > 1:
+        args.threads_per_job = max(1, multiprocessing.cpu_count() // args.jobs)
+
+    if args.addon_path is None:
+        args.addon_path = os.path.realpath(os.path.join(script_directory, "..", ".."))
+
+    args.render_inputs_key = ""
+    if args.use_cache and not args.skip_rendering:
+        versions = query_versions(args)
+        args.render_inputs_key = "|".join([hash_addon_tree(args.addon_path),
+                                           versions['blender'],
+                                           versions['appleseed'],
+                                           " ".join(args.args or []),
+                                           str(args.threads_per_job)])
+
     blender_args = BLENDER_BASE_ARGS
     if args.args:
         blender_args += " {0}".format(" ".join(args.args))
@@ -502,10 +989,19 @@ def main():
     print("Configuration:")
     print("  Binary        : {0}".format(args.tool_path))
     print("  Arguments     : {0}".format(blender_args))
+    print("  Jobs          : {0}".format(args.jobs))
+    if args.threads_per_job is not None:
+        print("  Threads/Job   : {0}".format(args.threads_per_job))
+    if args.benchmark > 0:
+        print("  Benchmark     : {0} run(s) per test scene".format(args.benchmark))
+    if args.use_cache and not args.skip_rendering:
+        print("  Blender       : {0}".format(versions['blender']))
+        print("  appleseed     : {0}".format(versions['appleseed']))
+        print("  Add-on Path   : {0}".format(args.addon_path))
     print()
 
     start_time = datetime.datetime.now()
-    rendered_scene_count, passing_scene_count = render_test_scenes(script_directory, args)
+    rendered_scene_count, passing_scene_count, cached_scene_count, benchmark = render_test_scenes(script_directory, args)
     end_time = datetime.datetime.now()
 
     success = 100.0 * passing_scene_count / rendered_scene_count if rendered_scene_count > 0 else 0.0
@@ -522,6 +1018,18 @@ def main():
                   rendered_scene_count,
                   colorama.Fore.RESET))
     print("  Total Time    : {0}".format(format_duration(end_time - start_time)))
+    if cached_scene_count > 0:
+        print("  Cached        : {0} test scene(s) reused from previous runs (marked with *)".format(cached_scene_count))
+
+    if benchmark is not None:
+        regressions = benchmark['regressions']
+        print("  Regressions   : {0}{1} test scene(s){2}"
+              .format(colorama.Fore.RED if regressions else colorama.Fore.GREEN,
+                      len(regressions),
+                      colorama.Fore.RESET))
+        for scene in sorted(regressions):
+            for metric, increase in sorted(regressions[scene].items()):
+                print("    {0}: {1} +{2:.1f} %".format(remove_prefix(scene, "./"), metric, 100.0 * increase))
 
 if __name__ == '__main__':
     main()
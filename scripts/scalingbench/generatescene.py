@@ -0,0 +1,327 @@
+#!/usr/bin/python
+
+#
+# This source file is part of appleseed.
+# Visit https://appleseedhq.net/ for additional information and resources.
+#
+# This software is released under the MIT license.
+#
+# Copyright (c) 2019 The appleseedhq Organization
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+
+
+#
+# Builds a parameterized synthetic scene for scaling benchmarks of the blenderseed translators.
+#
+# Run inside Blender, for instance:
+#
+#   blender -b --factory-startup --python generatescene.py -- --meshes 100 --instances 1000 --output scene.blend
+#
+# The scene functions are also used by scalingbench.py.
+#
+
+import argparse
+import importlib
+import math
+import os
+import random
+import sys
+
+import addon_utils
+import bpy
+from mathutils import Vector
+
+
+#--------------------------------------------------------------------------------------------------
+# Constants.
+#--------------------------------------------------------------------------------------------------
+
+DEFAULT_ADDON_NAME = "blenderseed"
+
+# Node of the appleseed standard surface shader, used by all generated materials.
+SURFACE_NODE_IDNAME = "AppleseedasStandardSurfaceNode"
+
+# Side length of the square area the generated objects are scattered over, per object.
+SPACING = 2.0
+
+
+#--------------------------------------------------------------------------------------------------
+# Utilities.
+#--------------------------------------------------------------------------------------------------
+
+def enable_addon(addon_name):
+    if addon_name not in bpy.context.preferences.addons:
+        addon_utils.enable(addon_name, default_set=True)
+
+    return importlib.import_module(addon_name)
+
+
+def clear_scene():
+    for collection in (bpy.data.objects,
+                       bpy.data.meshes,
+                       bpy.data.lights,
+                       bpy.data.cameras,
+                       bpy.data.materials,
+                       bpy.data.particles,
+                       bpy.data.worlds,
+                       bpy.data.images):
+        for block in list(collection):
+            collection.remove(block)
+
+
+def scatter_position(rng, index, count):
+    """Returns a position on a jittered grid covering count objects"""
+    side = max(1, int(math.ceil(math.sqrt(count))))
+    x = (index % side - side / 2) * SPACING
+    y = (index // side - side / 2) * SPACING
+    return Vector((x + rng.uniform(-0.25, 0.25), y + rng.uniform(-0.25, 0.25), rng.uniform(0.0, 0.5)))
+
+
+def link_object(scene, name, data):
+    obj = bpy.data.objects.new(name, data)
+    scene.collection.objects.link(obj)
+    return obj
+
+
+def find_socket(sockets, osl_id):
+    for socket in sockets:
+        if getattr(socket, 'socket_osl_id', None) == osl_id:
+            return socket
+    return sockets[0]
+
+
+#--------------------------------------------------------------------------------------------------
+# Scene elements.
+#--------------------------------------------------------------------------------------------------
+
+def make_grid_mesh(name, resolution, rng):
+    """Creates a displaced grid of resolution x resolution quads"""
+    vertices = [((x / resolution) - 0.5, (y / resolution) - 0.5, rng.uniform(0.0, 0.05))
+                for y in range(resolution + 1)
+                for x in range(resolution + 1)]
+    faces = [(y * (resolution + 1) + x,
+              y * (resolution + 1) + x + 1,
+              (y + 1) * (resolution + 1) + x + 1,
+              (y + 1) * (resolution + 1) + x)
+             for y in range(resolution)
+             for x in range(resolution)]
+
+    mesh = bpy.data.meshes.new(name)
+    mesh.from_pydata(vertices, [], faces)
+    mesh.uv_layers.new(name="UVMap")
+    mesh.update()
+
+    return mesh
+
+
+def make_ramp_material(name, rng, addon):
+    """Creates a standard surface material whose base color comes from a color ramp"""
+    addon.properties.nodes.register_osl_node(SURFACE_NODE_IDNAME)
+
+    mat = bpy.data.materials.new(name)
+    mat.use_nodes = True
+
+    nodes = mat.node_tree.nodes
+    links = mat.node_tree.links
+    for node in list(nodes):
+        if node.bl_idname != 'ShaderNodeOutputMaterial':
+            nodes.remove(node)
+    output = nodes['Material Output']
+
+    ramp = nodes.new('ShaderNodeValToRGB')
+    ramp.inputs[0].default_value = rng.random()
+    ramp.color_ramp.interpolation = rng.choice(('LINEAR', 'EASE', 'CONSTANT'))
+    ramp.color_ramp.elements[0].color = (rng.random(), rng.random(), rng.random(), 1.0)
+    ramp.color_ramp.elements[1].color = (rng.random(), rng.random(), rng.random(), 1.0)
+    element = ramp.color_ramp.elements.new(rng.uniform(0.2, 0.8))
+    element.color = (rng.random(), rng.random(), rng.random(), 1.0)
+
+    surface = nodes.new(SURFACE_NODE_IDNAME)
+
+    links.new(ramp.outputs['Color'], find_socket(surface.inputs, 'in_color'))
+    links.new(surface.outputs[0], output.inputs['Surface'])
+
+    return mat
+
+
+def make_environment_image(name, directory, width, height):
+    """Creates a procedural sky texture and saves it next to the scene"""
+    image = bpy.data.images.new(name, width, height, float_buffer=True)
+
+    pixels = []
+    for y in range(height):
+        t = y / max(1, height - 1)
+        for x in range(width):
+            glow = 0.5 + 0.5 * math.cos(2.0 * math.pi * x / width)
+            pixels.extend((0.2 + 0.6 * t, 0.3 + 0.5 * t, 0.6 + 0.4 * t * glow, 1.0))
+    image.pixels = pixels
+
+    image.filepath_raw = os.path.join(directory, f"{name}.exr")
+    image.file_format = 'OPEN_EXR'
+    image.save()
+
+    return image
+
+
+def add_camera(scene, extent):
+    camera = link_object(scene, "Camera", bpy.data.cameras.new("Camera"))
+    camera.location = Vector((0.0, -1.5 * extent, 0.75 * extent))
+    camera.rotation_euler = (-camera.location).to_track_quat('-Z', 'Y').to_euler()
+    scene.camera = camera
+
+
+def add_particle_instances(scene, count, mesh, materials, rng):
+    """Scatters count instances of a small object over an emitter with a hair particle system"""
+    instance = link_object(scene, "ParticleInstance", make_grid_mesh("ParticleInstanceMesh", 2, rng))
+    if materials:
+        instance.data.materials.append(rng.choice(materials))
+    instance.location = Vector((0.0, 0.0, -100.0))
+
+    emitter = link_object(scene, "ParticleEmitter", mesh)
+    emitter.scale = Vector((max(1.0, math.sqrt(count)) * SPACING,) * 3)
+    if materials:
+        emitter.data.materials.append(materials[0])
+
+    modifier = emitter.modifiers.new("Instances", type='PARTICLE_SYSTEM')
+    settings = modifier.particle_system.settings
+    settings.type = 'HAIR'
+    settings.count = count
+    settings.hair_length = 1.0
+    settings.render_type = 'OBJECT'
+    settings.instance_object = instance
+    settings.particle_size = 0.2
+    modifier.particle_system.seed = rng.randrange(1 << 16)
+
+
+def generate_scene(meshes=10,
+                   instances=0,
+                   lights=1,
+                   materials=1,
+                   mesh_resolution=16,
+                   textured_world=True,
+                   resolution=(64, 64),
+                   samples=4,
+                   output_directory=None,
+                   addon_name=DEFAULT_ADDON_NAME,
+                   seed=0):
+    """
+    Replaces the contents of the current file by a synthetic scene rendered with appleseed.
+    """
+
+    addon = enable_addon(addon_name)
+    rng = random.Random(seed)
+
+    clear_scene()
+
+    scene = bpy.context.scene
+    scene.render.engine = 'APPLESEED_RENDER'
+    scene.render.resolution_x, scene.render.resolution_y = resolution
+    scene.render.resolution_percentage = 100
+    scene.appleseed.samples = samples
+    scene.appleseed.tile_size = 16
+    scene.frame_set(1)
+
+    output_directory = output_directory or bpy.app.tempdir
+
+    # Materials.
+    ramp_materials = [make_ramp_material(f"RampMaterial{i:05}", rng, addon) for i in range(materials)]
+
+    # Meshes, sharing a few grid resolutions so that mesh data is partly instanced.
+    for i in range(meshes):
+        mesh = make_grid_mesh(f"Mesh{i:05}", mesh_resolution + i % 4, rng)
+        if ramp_materials:
+            mesh.materials.append(ramp_materials[i % len(ramp_materials)])
+        obj = link_object(scene, f"Mesh{i:05}", mesh)
+        obj.location = scatter_position(rng, i, meshes)
+        obj.rotation_euler = (rng.uniform(-0.3, 0.3), rng.uniform(-0.3, 0.3), rng.uniform(0.0, math.pi))
+
+    # Particle instances.
+    if instances > 0:
+        add_particle_instances(scene, instances, make_grid_mesh("ParticleEmitterMesh", 8, rng), ramp_materials, rng)
+
+    # Lights.
+    extent = max(1.0, math.sqrt(max(meshes, instances, lights)) * SPACING)
+    for i in range(lights):
+        light = bpy.data.lights.new(f"Light{i:05}", type='POINT')
+        light.energy = 1000.0 / max(1, lights)
+        obj = link_object(scene, f"Light{i:05}", light)
+        obj.location = scatter_position(rng, i, lights) + Vector((0.0, 0.0, 4.0))
+
+    # World.
+    world = bpy.data.worlds.new("World")
+    scene.world = world
+    if textured_world:
+        world.appleseed_sky.env_type = 'latlong_map'
+        world.appleseed_sky.env_tex = make_environment_image("SyntheticSky", output_directory, 256, 128)
+    else:
+        world.appleseed_sky.env_type = 'gradient'
+
+    add_camera(scene, extent)
+
+    bpy.context.view_layer.update()
+
+    return scene
+
+
+#--------------------------------------------------------------------------------------------------
+# Entry point.
+#--------------------------------------------------------------------------------------------------
+
+def main():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+
+    parser = argparse.ArgumentParser(prog="generatescene.py", description="build a synthetic appleseed scene.")
+    parser.add_argument("--meshes", type=int, default=10, help="number of mesh objects")
+    parser.add_argument("--instances", type=int, default=0, help="number of particle instances")
+    parser.add_argument("--lights", type=int, default=1, help="number of point lights")
+    parser.add_argument("--materials", type=int, default=1, help="number of color ramp materials")
+    parser.add_argument("--mesh-resolution", type=int, default=16, dest="mesh_resolution",
+                        help="number of quads along each side of the generated meshes")
+    parser.add_argument("--no-world-texture", action='store_false', dest="textured_world",
+                        help="use a gradient sky instead of a textured environment")
+    parser.add_argument("--resolution", type=int, nargs=2, default=[64, 64], metavar=("WIDTH", "HEIGHT"),
+                        help="render resolution")
+    parser.add_argument("--samples", type=int, default=4, help="samples per pixel")
+    parser.add_argument("--addon", default=DEFAULT_ADDON_NAME, help="module name of the blenderseed add-on")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    parser.add_argument("--output", required=True, help="path of the .blend file to write")
+    args = parser.parse_args(argv)
+
+    output = os.path.abspath(args.output)
+
+    generate_scene(meshes=args.meshes,
+                   instances=args.instances,
+                   lights=args.lights,
+                   materials=args.materials,
+                   mesh_resolution=args.mesh_resolution,
+                   textured_world=args.textured_world,
+                   resolution=tuple(args.resolution),
+                   samples=args.samples,
+                   output_directory=os.path.dirname(output),
+                   addon_name=args.addon,
+                   seed=args.seed)
+
+    bpy.ops.wm.save_as_mainfile(filepath=output)
+
+    print(f"Wrote {output}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,323 @@
+#!/usr/bin/python
+
+#
+# This source file is part of appleseed.
+# Visit https://appleseedhq.net/ for additional information and resources.
+#
+# This software is released under the MIT license.
+#
+# Copyright (c) 2019 The appleseedhq Organization
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+#
+
+
+#
+# Measures how the blenderseed translators scale with the size of synthetic scenes.
+#
+# Run inside Blender, for instance:
+#
+#   blender -b --factory-startup --python scalingbench.py -- --dimension meshes --sizes 10 100 1000
+#
+# For each size, a scene is generated with generatescene.py, then the following are timed:
+#   - SceneTranslator.translate_scene() of a final render translator,
+#   - SceneTranslator.update_scene() after moving an object, editing a material and deleting an object,
+#   - a final render, whose render and tile callback times come from the translation profile.
+#
+# The results are written as JSON and as CSV scaling curves. The growth exponent between successive
+# sizes (1 for linear, 2 for quadratic behavior) is printed to spot superlinear code paths.
+#
+
+import argparse
+import csv
+import importlib
+import json
+import math
+import os
+import sys
+import time
+
+import bpy
+
+sys.path.insert(0, os.path.dirname(os.path.realpath(__file__)))
+import generatescene
+
+
+#--------------------------------------------------------------------------------------------------
+# Constants.
+#--------------------------------------------------------------------------------------------------
+
+DIMENSIONS = ('meshes', 'instances', 'lights', 'materials')
+
+UPDATE_SCENARIOS = ('transform', 'material', 'deletion')
+
+# Measurements reported in the scaling curves, along with their display names.
+MEASUREMENTS = [('translate_time', "Translate"),
+                ('update_transform_time', "Update (transform)"),
+                ('update_material_time', "Update (material)"),
+                ('update_deletion_time', "Update (deletion)"),
+                ('render_time', "Render"),
+                ('tile_callback_time', "Tile Callback")]
+
+# Growth exponents above this value are flagged as superlinear.
+SUPERLINEAR_EXPONENT = 1.5
+
+
+#--------------------------------------------------------------------------------------------------
+# Render engine stand-in.
+#--------------------------------------------------------------------------------------------------
+
+class BenchmarkEngine:
+    """
+    Provides the render engine methods the translators call, since Blender only creates
+    render engines while rendering.
+    """
+
+    def __init__(self, scene):
+        self.__scene = scene
+        self.errors = []
+
+    def update_stats(self, stats, info):
+        pass
+
+    def update_progress(self, progress):
+        pass
+
+    def report(self, type, message):
+        print(f"{', '.join(type)}: {message}")
+
+    def error_set(self, message):
+        self.errors.append(message)
+
+    def test_break(self):
+        return False
+
+    def frame_set(self, frame, subframe=0.0):
+        self.__scene.frame_set(frame, subframe=subframe)
+
+    def camera_model_matrix(self, camera, use_spherical_stereo=False):
+        return camera.matrix_world.normalized()
+
+    def camera_shift_x(self, camera, use_spherical_stereo=False):
+        return 0.0
+
+
+#--------------------------------------------------------------------------------------------------
+# Measurements.
+#--------------------------------------------------------------------------------------------------
+
+def time_translation(scene_module, engine):
+    depsgraph = bpy.context.evaluated_depsgraph_get()
+    translator = scene_module.SceneTranslator.create_final_render_translator(depsgraph)
+
+    start_time = time.perf_counter()
+    translator.translate_scene(engine, depsgraph)
+    end_time = time.perf_counter()
+
+    return translator, end_time - start_time
+
+
+def edit_scene(scene, scenario):
+    meshes = sorted((obj for obj in scene.objects if obj.name.startswith("Mesh")), key=lambda obj: obj.name)
+    materials = sorted((mat for mat in bpy.data.materials if mat.use_nodes), key=lambda mat: mat.name)
+
+    if scenario == 'transform' and meshes:
+        meshes[0].location.x += 0.1
+    elif scenario == 'material' and materials:
+        ramp = next(node for node in materials[0].node_tree.nodes if node.bl_idname == 'ShaderNodeValToRGB')
+        ramp.color_ramp.elements[0].color = (1.0, 0.5, 0.25, 1.0)
+    elif scenario == 'deletion' and meshes:
+        bpy.data.objects.remove(meshes[-1])
+    else:
+        return False
+
+    return True
+
+
+def time_updates(scene, translator, engine):
+    """Times update_scene() for each update scenario, from the depsgraph update handler"""
+    timings = dict()
+    current_scenario = [None]
+
+    def on_depsgraph_update(bl_scene, depsgraph=None):
+        if current_scenario[0] is None or depsgraph is None:
+            return
+        start_time = time.perf_counter()
+        translator.update_scene(depsgraph, engine)
+        timings[current_scenario[0]] = time.perf_counter() - start_time
+
+    bpy.app.handlers.depsgraph_update_post.append(on_depsgraph_update)
+
+    try:
+        for scenario in UPDATE_SCENARIOS:
+            current_scenario[0] = scenario
+            if edit_scene(scene, scenario):
+                bpy.context.view_layer.update()
+    finally:
+        bpy.app.handlers.depsgraph_update_post.remove(on_depsgraph_update)
+
+    return timings
+
+
+def time_render(scene, output_directory):
+    scene.appleseed.write_profile = True
+    scene.render.filepath = os.path.join(output_directory, "scalingbench_")
+
+    bpy.ops.render.render()
+
+    profile_path = f"{os.path.splitext(bpy.path.abspath(scene.render.frame_path()))[0]}.profile.json"
+    with open(profile_path) as profile_file:
+        profile = json.load(profile_file)
+
+    return {'render_time': sum(render['time'] for render in profile['render']),
+            'tile_callback_time': sum(render['tile_callback_time'] for render in profile['render']),
+            'tile_count': sum(render['tile_count'] for render in profile['render'])}
+
+
+def measure(args, scene_module, size):
+    params = {dimension: getattr(args, f"base_{dimension}") for dimension in DIMENSIONS}
+    params[args.dimension] = size
+
+    # Generating a scene is not measured, but it can take a while.
+    scene = generatescene.generate_scene(mesh_resolution=args.mesh_resolution,
+                                         textured_world=args.textured_world,
+                                         resolution=tuple(args.resolution),
+                                         output_directory=args.output_directory,
+                                         addon_name=args.addon,
+                                         **params)
+
+    result = dict(params)
+    result['size'] = size
+
+    engine = BenchmarkEngine(scene)
+    translator, result['translate_time'] = time_translation(scene_module, engine)
+
+    if args.render:
+        result.update(time_render(scene, args.output_directory))
+
+    # Updates go last since they edit the scene.
+    for scenario, timing in time_updates(scene, translator, engine).items():
+        result[f"update_{scenario}_time"] = timing
+
+    if engine.errors:
+        result['errors'] = engine.errors
+
+    return result
+
+
+#--------------------------------------------------------------------------------------------------
+# Reporting.
+#--------------------------------------------------------------------------------------------------
+
+def growth_exponent(size1, time1, size2, time2):
+    if None in (time1, time2) or time1 <= 0.0 or time2 <= 0.0 or size1 <= 0 or size1 == size2:
+        return None
+    return math.log(time2 / time1) / math.log(size2 / size1)
+
+
+def print_results(args, results):
+    print()
+    print(f"Scaling along '{args.dimension}':")
+    print("  {0:>8}  {1}".format("Size", "  ".join(f"{label:>20}" for _, label in MEASUREMENTS)))
+
+    previous = None
+    for result in results:
+        cells = list()
+        for key, _ in MEASUREMENTS:
+            value = result.get(key)
+            if value is None:
+                cells.append(f"{'-':>20}")
+                continue
+
+            cell = f"{value:.4f}s"
+            if previous is not None:
+                exponent = growth_exponent(previous['size'], previous.get(key), result['size'], value)
+                if exponent is not None:
+                    cell += f" (^{exponent:.2f}{'!' if exponent > SUPERLINEAR_EXPONENT else ''})"
+            cells.append(f"{cell:>20}")
+
+        print("  {0:>8}  {1}".format(result['size'], "  ".join(cells)))
+        previous = result
+
+    print()
+    print(f"  (^x) is the growth exponent from the previous size, '!' marks exponents above {SUPERLINEAR_EXPONENT}.")
+
+
+def write_results(args, results):
+    with open(args.output, 'w') as output_file:
+        json.dump({'dimension': args.dimension,
+                   'sizes': args.sizes,
+                   'base': {dimension: getattr(args, f"base_{dimension}") for dimension in DIMENSIONS},
+                   'blender_version': bpy.app.version_string,
+                   'results': results},
+                  output_file,
+                  indent=2)
+
+    csv_path = f"{os.path.splitext(args.output)[0]}.csv"
+    with open(csv_path, 'w', newline='') as csv_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(['size'] + [key for key, _ in MEASUREMENTS])
+        for result in results:
+            writer.writerow([result['size']] + [result.get(key, "") for key, _ in MEASUREMENTS])
+
+    print(f"Wrote {args.output} and {csv_path}")
+
+
+#--------------------------------------------------------------------------------------------------
+# Entry point.
+#--------------------------------------------------------------------------------------------------
+
+def main():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+
+    parser = argparse.ArgumentParser(prog="scalingbench.py", description="measure how the translators scale with scene size.")
+    parser.add_argument("--dimension", choices=DIMENSIONS, default='meshes', help="scene dimension to grow")
+    parser.add_argument("--sizes", type=int, nargs='+', default=[10, 100, 1000], help="sizes of the grown dimension")
+    parser.add_argument("--base-meshes", type=int, default=10, dest="base_meshes", help="number of meshes when not grown")
+    parser.add_argument("--base-instances", type=int, default=0, dest="base_instances", help="number of particle instances when not grown")
+    parser.add_argument("--base-lights", type=int, default=1, dest="base_lights", help="number of lights when not grown")
+    parser.add_argument("--base-materials", type=int, default=1, dest="base_materials", help="number of materials when not grown")
+    parser.add_argument("--mesh-resolution", type=int, default=16, dest="mesh_resolution",
+                        help="number of quads along each side of the generated meshes")
+    parser.add_argument("--no-world-texture", action='store_false', dest="textured_world",
+                        help="use a gradient sky instead of a textured environment")
+    parser.add_argument("--resolution", type=int, nargs=2, default=[64, 64], metavar=("WIDTH", "HEIGHT"),
+                        help="render resolution")
+    parser.add_argument("--no-render", action='store_false', dest="render", help="skip the final renders")
+    parser.add_argument("--addon", default=generatescene.DEFAULT_ADDON_NAME, help="module name of the blenderseed add-on")
+    parser.add_argument("--output", default="scaling.json", help="path of the JSON results, the CSV curves are written next to it")
+    args = parser.parse_args(argv)
+
+    args.output = os.path.abspath(args.output)
+    args.output_directory = os.path.dirname(args.output)
+    args.sizes = sorted(args.sizes)
+
+    generatescene.enable_addon(args.addon)
+    scene_module = importlib.import_module(f"{args.addon}.translators.scene")
+
+    results = list()
+    for size in args.sizes:
+        print(f"Measuring {args.dimension} = {size}...")
+        results.append(measure(args, scene_module, size))
+
+    print_results(args, results)
+    write_results(args, results)
+
+if __name__ == '__main__':
+    main()
@@ -51,6 +51,9 @@ class AssetHandler(object):
         self._cycles_osl_path = get_cycles_shader_path()
         self._depsgraph = depsgraph
 
+        # Translated shader parameters, shared by all node trees of the session.
+        self._node_params_cache = dict()
+
         self._searchpaths.append(self._cycles_osl_path)
         self._searchpaths.extend(x.name for x in bpy.context.preferences.addons['blenderseed'].preferences.search_paths)
 
@@ -62,8 +65,13 @@ class AssetHandler(object):
     def cycles_osl_path(self):
         return self._cycles_osl_path
 
+    @property
+    def node_params_cache(self):
+        return self._node_params_cache
+
     def set_searchpath(self, path):
-        self._searchpaths.append(path)
+        if path not in self._searchpaths:
+            self._searchpaths.append(path)
 
     def process_path(self, filename, asset_type, sub_texture=False):
         archive_asset = bpy.path.abspath(filename)
@@ -73,7 +81,7 @@ class AssetHandler(object):
 
         if asset_type == AssetType.SHADER_ASSET:
             dir_name, file_name = os.path.split(archive_asset)
-            self._searchpaths.append(dir_name)
+            self.set_searchpath(dir_name)
             archive_asset = os.path.splitext(file_name)[0]
 
         if asset_type == AssetType.TEXTURE_ASSET and sub_texture:
@@ -82,7 +90,7 @@ class AssetHandler(object):
 
         if asset_type == AssetType.ARCHIVE_ASSET:
             archive_dir, archive = os.path.split(archive_asset)
-            self._searchpaths.append(archive_dir)
+            self.set_searchpath(archive_dir)
             archive_asset = archive
 
         return archive_asset
@@ -142,5 +150,5 @@ class CopyAssetsAssetHandler(AssetHandler):
             return f"_textures/{filename}"
 
         else:
-            self._searchpaths.append(original_dir)
+            self.set_searchpath(original_dir)
             return os.path.splitext(filename)[0]
@@ -42,6 +42,11 @@ cycles_parameter_mapping = {"ShaderNodeSeparateRGB": {"inputs": ["Image"],
                             "ShaderNodeRGBCurve": {"inputs": ["Fac", "ColorIn"],
                                                    "outputs": ["ColorOut"]}}
 
+# Baked ramp and curve parameter strings, keyed by a fingerprint of the control points and
+# interpolation settings they were baked from.
+__baked_cache = dict()
+__max_baked_cache_size = 256
+
 
 def parse_cycles_shader(shader):
 
@@ -61,8 +66,7 @@ def parse_ShaderNodeRGBCurve(shader):
     # Curve mapping.
     mapping = shader.mapping
     mapping.update()
-    rgb_array = mapping_to_array(mapping)
-    rgb_string = " ".join(map(str, rgb_array))
+    rgb_string = bake_mapping(mapping)
     params['ramp'] = f"color[] {rgb_string}"
 
     # Additional params.
@@ -79,12 +83,9 @@ def parse_ShaderNodeValToRGB(shader):
     # Interpret color ramp.
     ramp = shader.color_ramp
     ramp_interpolate = ramp.interpolation != 'CONSTANT'
-    rgb_array, alpha_array = ramp_to_array(ramp)
+    rgb_string, alpha_string = bake_ramp(ramp)
 
-    rgb_string = " ".join(map(str, rgb_array))
     params['ramp_color'] = f"color[] {rgb_string}"
-
-    alpha_string = " ".join(map(str, alpha_array))
     params['ramp_alpha'] = f"float[] {alpha_string}"
 
     # Additional params.
@@ -99,6 +100,68 @@ def parse_ShaderNodeSeparateRGB():
 def parse_ShaderNodeCombineRGB():
     return dict()
 
+def bake_mapping(mapping):
+    """
+    Returns the baked colors of a curve mapping as a parameter string
+    """
+
+    curve_resolution = bpy.context.preferences.addons['blenderseed'].preferences.curve_resolution
+
+    curves = tuple(tuple((tuple(point.location), point.handle_type) for point in curve.points)
+                   for curve in mapping.curves)
+    fingerprint = ('mapping',
+                   curve_resolution,
+                   curves,
+                   tuple(mapping.black_level),
+                   tuple(mapping.white_level),
+                   mapping.use_clip,
+                   getattr(mapping, 'extend', None),
+                   (mapping.clip_min_x, mapping.clip_min_y, mapping.clip_max_x, mapping.clip_max_y))
+
+    baked = __baked_cache.get(fingerprint)
+    if baked is None:
+        baked = format_float_array(mapping_to_array(mapping))
+        __store_baked(fingerprint, baked)
+
+    return baked
+
+
+def bake_ramp(ramp):
+    """
+    Returns the baked colors and alphas of a color ramp as parameter strings
+    """
+
+    curve_resolution = bpy.context.preferences.addons['blenderseed'].preferences.curve_resolution
+
+    elements = tuple((element.position, tuple(element.color)) for element in ramp.elements)
+    fingerprint = ('ramp',
+                   curve_resolution,
+                   elements,
+                   ramp.interpolation,
+                   ramp.color_mode,
+                   ramp.hue_interpolation)
+
+    baked = __baked_cache.get(fingerprint)
+    if baked is None:
+        rgb_array, alpha_array = ramp_to_array(ramp, elements)
+        baked = (format_float_array(rgb_array), format_float_array(alpha_array))
+        __store_baked(fingerprint, baked)
+
+    return baked
+
+
+def format_float_array(array):
+    # Python floats convert to strings much faster than numpy scalars.
+    return " ".join(map(str, array.tolist()))
+
+
+def __store_baked(fingerprint, baked):
+    if len(__baked_cache) >= __max_baked_cache_size:
+        __baked_cache.clear()
+
+    __baked_cache[fingerprint] = baked
+
+
 def mapping_to_array(mapping):
     curve_resolution = bpy.context.preferences.addons['blenderseed'].preferences.curve_resolution
     rgb_floats = np.empty(curve_resolution * 3, dtype=float)
@@ -110,16 +173,45 @@ def mapping_to_array(mapping):
 
     for i in range(curve_resolution):
         start_index = i * 3
-        t = i / (curve_resolution - 1)
-        rgb_floats[start_index] = mapping.evaluate(map_r, mapping.evaluate(map_i, t))
-        rgb_floats[start_index + 1] = mapping.evaluate(map_g, mapping.evaluate(map_i, t))
-        rgb_floats[start_index + 2] = mapping.evaluate(map_b, mapping.evaluate(map_i, t))
+        t = mapping.evaluate(map_i, i / (curve_resolution - 1))
+        rgb_floats[start_index] = mapping.evaluate(map_r, t)
+        rgb_floats[start_index + 1] = mapping.evaluate(map_g, t)
+        rgb_floats[start_index + 2] = mapping.evaluate(map_b, t)
 
     return rgb_floats
 
 
-def ramp_to_array(ramp):
+def ramp_to_array(ramp, elements=None):
     curve_resolution = bpy.context.preferences.addons['blenderseed'].preferences.curve_resolution
+
+    if elements is None:
+        elements = tuple((element.position, tuple(element.color)) for element in ramp.elements)
+
+    positions = np.array([element[0] for element in elements], dtype=float)
+
+    # Blender's linear, constant and ease interpolation in RGB space can be reproduced from the
+    # stops directly.  Other modes and coincident stops are evaluated through Blender.
+    if ramp.color_mode == 'RGB' and ramp.interpolation in ('LINEAR', 'CONSTANT', 'EASE') and np.all(np.diff(positions) > 0.0):
+        colors = np.array([element[1] for element in elements], dtype=float)
+        t = np.linspace(0.0, 1.0, curve_resolution)
+
+        if ramp.interpolation == 'CONSTANT':
+            indices = np.clip(np.searchsorted(positions, t, side='right') - 1, 0, len(positions) - 1)
+            rgba = colors[indices]
+        elif len(positions) == 1:
+            rgba = np.repeat(colors, curve_resolution, axis=0)
+        else:
+            indices = np.clip(np.searchsorted(positions, t, side='right'), 1, len(positions) - 1)
+            left = positions[indices - 1]
+            right = positions[indices]
+            fac = np.clip((t - left) / (right - left), 0.0, 1.0)
+            if ramp.interpolation == 'EASE':
+                fac = fac * fac * (3.0 - 2.0 * fac)
+            fac = fac[:, np.newaxis]
+            rgba = (1.0 - fac) * colors[indices - 1] + fac * colors[indices]
+
+        return rgba[:, :3].flatten(), rgba[:, 3].copy()
+
     rgb_array = np.empty(curve_resolution * 3, dtype=float)
     alpha_array = np.empty(curve_resolution, dtype=float)
 
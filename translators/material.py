@@ -48,6 +48,9 @@ class MaterialTranslator(Translator):
 
         self.__as_nodetree = None
 
+        # Identical material exported in place of this one.
+        self.__mat_owner = None
+
         self._bl_obj.appleseed.obj_name = self._bl_obj.name_full
 
     @property
@@ -62,6 +65,34 @@ class MaterialTranslator(Translator):
     def bl_node_tree(self):
         return self._bl_obj.node_tree
 
+    @property
+    def tree_key(self):
+        return self.__as_nodetree.tree_key if self.__as_nodetree is not None else None
+
+    @property
+    def mat_key(self):
+        """Hash of everything the material exports, None if it has no translated node tree"""
+        tree_key = self.tree_key
+        if tree_key is None:
+            return None
+
+        return tree_key, tuple(sorted(self.__as_shader_params.items()))
+
+    @property
+    def is_alias(self):
+        return self.__mat_owner is not None
+
+    def share_material(self, source):
+        """Replaces this material by an identical one, nothing is exported for it"""
+        self.__mat_owner = source
+
+    def share_shader_group(self, source):
+        """Makes the material use the identical shader group of another material"""
+        self.__as_nodetree.share_shader_group(source.__as_nodetree)
+
+        self.__as_mat_params = self.__get_mat_params()
+        self.__as_mat.set_parameters(self.__as_mat_params)
+
     def create_entities(self, depsgraph, engine):
         logger.debug(f"appleseed: Creating material entity for {self.orig_name}")
 
@@ -82,6 +113,9 @@ class MaterialTranslator(Translator):
         self.__as_shader.set_parameters(self.__as_shader_params)
 
     def flush_entities(self, as_scene, as_assembly, as_project):
+        if self.__mat_owner is not None:
+            return
+
         logger.debug(f"appleseed: Flushing material entity for {self.orig_name} to project")
 
         if self.__as_nodetree is not None:
@@ -100,6 +134,9 @@ class MaterialTranslator(Translator):
         self.__as_nodetree.update_nodetree(bl_scene, engine)
 
     def delete_material(self, as_main_assembly):
+        if self.__mat_owner is not None:
+            return
+
         logger.debug(f"appleseed: Deleting material entity for {self.orig_name}")
         if self.__as_nodetree is not None:
             self.__as_nodetree.delete_nodetree(as_main_assembly)
@@ -120,7 +157,7 @@ class MaterialTranslator(Translator):
     def __get_mat_params(self):
         mat_params = {'surface_shader': f"{self.orig_name}_surface"}
 
-        if self.bl_node_tree is not None:
-            mat_params['osl_surface'] = f"{self.orig_name}_tree"
+        if self.__as_nodetree is not None:
+            mat_params['osl_surface'] = self.__as_nodetree.shader_group_name
 
         return mat_params
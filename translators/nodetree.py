@@ -25,17 +25,16 @@
 # THE SOFTWARE.
 #
 
+import hashlib
 import os
 
-import bpy
-
 import appleseed as asr
-from .assethandlers import AssetType
+from .assethandlers import AssetType, CopyAssetsAssetHandler
 from .cycles_shaders import cycles_nodes, cycles_parameter_mapping, parse_cycles_shader
 from .translator import Translator
-from ..properties.nodes import AppleseedOSLNode
+from ..properties.nodes import AppleseedOSLNode, find_undefined_osl_nodes
 from ..logger import get_logger
-from ..utils.util import filter_params
+from ..utils.osl_utils import get_cached_bytecode_path, get_script_source
 
 logger = get_logger()
 
@@ -51,10 +50,31 @@ class NodeTreeTranslator(Translator):
 
         self.__as_shader_group = None
 
+        self.__shader_list = None
+        self.__tree_key = None
+        self.__shared_tree = None
+
     @property
     def bl_nodes(self):
         return self._bl_obj.nodes
 
+    @property
+    def shader_group_name(self):
+        if self.__shared_tree is not None:
+            return self.__shared_tree.shader_group_name
+
+        return f"{self.__mat_name}_tree"
+
+    @property
+    def tree_key(self):
+        """Hash of the translated shaders, parameters and connections, None if the tree has no surface shader"""
+        return self.__tree_key
+
+    def share_shader_group(self, source):
+        """Uses the identical shader group of another node tree instead of exporting this one"""
+        self.__shared_tree = source
+        self.__as_shader_group = None
+
     def create_entities(self, depsgraph, engine=None):
         logger.debug(f"appleseed: Creating node tree entitiy for {self.__mat_name} node tree")
 
@@ -65,6 +85,9 @@ class NodeTreeTranslator(Translator):
         self.__create_shadergroup(depsgraph.scene_eval, engine)
 
     def flush_entities(self, as_scene, as_assembly, as_project):
+        if self.__as_shader_group is None:
+            return
+
         logger.debug(f"appleseed: Flushing node tree entity {self.__mat_name} to project")
         shader_groupname = self.__as_shader_group.get_name()
         as_assembly.shader_groups().insert(self.__as_shader_group)
@@ -76,17 +99,22 @@ class NodeTreeTranslator(Translator):
 
     def delete_nodetree(self, as_main_assembly):
         logger.debug(f"appleseed: Deleting node tree entity for {self.__mat_name}")
-        as_main_assembly.shader_groups().remove(self.__as_shader_group)
+        if self.__as_shader_group is not None:
+            as_main_assembly.shader_groups().remove(self.__as_shader_group)
         self.__as_shader_group = None
 
     def __create_shadergroup(self, bl_scene, engine):
+        # OSL node classes are registered on demand on the main thread, see register_undefined_osl_nodes.
+        if find_undefined_osl_nodes(self._bl_obj):
+            logger.warning(f"appleseed: Node tree of {self.__mat_name} uses OSL nodes that are not registered yet")
+
         surface_shader = None
         for node in self.bl_nodes:
             if isinstance(node, AppleseedOSLNode):
                 if node.node_type == 'osl_surface':
                     logger.debug(f"appleseed: Found surface shader for {self.__mat_name} node tree")
                     surface_shader = node
-                    self.__shader_list = filter_params(self.__traverse_tree(surface_shader, list(), engine))
+                    self.__shader_list = self.__traverse_tree(surface_shader, engine)
                     break
                 
         # Replaces a Cycles material node behind the scenes
@@ -99,118 +127,202 @@ class NodeTreeTranslator(Translator):
                         self._bl_obj.links.new(node_connection.from_socket, replacement_node.inputs[0])
                         self._bl_obj.links.remove(node_connection)
                         surface_shader = replacement_node
-                        self.__shader_list = filter_params(self.__traverse_tree(surface_shader, list(), engine))
+                        self.__shader_list = self.__traverse_tree(surface_shader, engine)
                         break
 
         if surface_shader is None:
             logger.debug(f"appleseed: No surface shader for {self.__mat_name} node tree")
+            self.__tree_key = None
             return
 
-        self.__as_shader_group.clear()
+        # Shader group operations, recorded first so identical trees can be recognized.
+        shader_ops = list()
+        shader_nodes = set(self.__shader_list)
 
         for node in self.__shader_list:
             if isinstance(node, AppleseedOSLNode):  # appleseed nodes
-                parameters = dict()
-                parameter_types = node.parameter_types
-
-                node_items = node.keys()
-
-                for key in node_items:
-                    if key in parameter_types:
-                        parameter_value = getattr(node, key)
-                        parameter_type = parameter_types[key]
-
-                        if key in node.filepaths:
-                            sub_texture = bl_scene.appleseed.sub_textures
-                            parameter_value = self._asset_handler.process_path(
-                                parameter_value.filepath,
-                                AssetType.TEXTURE_ASSET, sub_texture)
-
-                        if parameter_type == "int checkbox":
-                            parameter_type = "int"
-                            parameter_value = int(parameter_value)
-                        elif parameter_type in ('color', 'vector', 'normal', 'point', 'float[2]'):
-                            parameter_value = " ".join(map(str, parameter_value))
-                            if parameter_type == 'float[2]':
-                                parameter_type = 'float[]'
-
-                        parameters[key] = parameter_type + " " + str(parameter_value)
-                
+                parameters = self.__get_osl_node_params(node, bl_scene)
+
                 if node.node_type == 'osl':
                     shader_file_name = self._asset_handler.process_path(node.file_name, AssetType.SHADER_ASSET)
                     logger.debug(f"appleseed: Adding {node.name} shader to {self.__mat_name} node tree")
-                    self.__as_shader_group.add_shader("shader", shader_file_name, node.name, parameters)
+                    shader_ops.append(('shader', "shader", shader_file_name, node.name, parameters))
                 elif node.node_type == 'osl_script':
-                    script = node.script
-                    osl_path = bpy.path.abspath(script.filepath, library=script.library)
-                    if script.is_in_memory or script.is_dirty or script.is_modified or not os.path.exists(osl_path):
-                        source_code = script.as_string()
+                    source_code = get_script_source(node.script)
+                    # Exported projects keep the source so they do not depend on the local bytecode cache.
+                    bytecode_path = None
+                    if not isinstance(self._asset_handler, CopyAssetsAssetHandler):
+                        bytecode_path = get_cached_bytecode_path(source_code)
+                    if bytecode_path is not None:
+                        shader_file_name = self._asset_handler.process_path(bytecode_path, AssetType.SHADER_ASSET)
+                        logger.debug(f"appleseed: Adding {node.name} compiled script shader to {self.__mat_name} node tree")
+                        shader_ops.append(('shader', "shader", shader_file_name, node.name, parameters))
                     else:
-                        code = open(osl_path, 'r')
-                        source_code = code.read()
-                        code.close()
-                    logger.debug(f"appleseed: Adding {node.name} source shader to {self.__mat_name} node tree")
-                    self.__as_shader_group.add_source_shader("shader", node.bl_idname, node.name, source_code, parameters)
+                        logger.debug(f"appleseed: Adding {node.name} source shader to {self.__mat_name} node tree")
+                        shader_ops.append(('source', "shader", node.bl_idname, node.name, source_code, parameters))
                 
                 for output in node.outputs:
                     if output.is_linked:
                         for link in output.links:
-                            if link.to_node in self.__shader_list:
+                            if link.to_node in shader_nodes:
                                 if isinstance(link.to_node, AppleseedOSLNode):  # appleseed to appleseed
-                                    self.__as_shader_group.add_connection(node.name,
-                                                                          output.socket_osl_id,
-                                                                          link.to_node.name,
-                                                                          link.to_socket.socket_osl_id)
+                                    shader_ops.append(('connection',
+                                                       node.name,
+                                                       output.socket_osl_id,
+                                                       link.to_node.name,
+                                                       link.to_socket.socket_osl_id))
                                 else:  # appleseed to Cycles
                                     for s_index, socket in enumerate(link.to_node.inputs):
                                         if socket.name == link.to_socket.name:
                                             to_socket_name = cycles_parameter_mapping[link.to_node.bl_idname]['inputs'][s_index]
-                                    self.__as_shader_group.add_connection(node.name,
-                                                                          output.socket_osl_id,
-                                                                          link.to_node.name,
-                                                                          to_socket_name)
+                                    shader_ops.append(('connection',
+                                                       node.name,
+                                                       output.socket_osl_id,
+                                                       link.to_node.name,
+                                                       to_socket_name))
             else:  # Cycles nodes
                 parameters = parse_cycles_shader(node)
                 shader_path = os.path.join(self._asset_handler.cycles_osl_path, cycles_nodes[node.bl_idname])
                 shader_file_name = self._asset_handler.process_path(shader_path, AssetType.SHADER_ASSET)
                 logger.debug(f"appleseed: Adding {node.name} Cycles shader to {self.__mat_name} node tree")
-                self.__as_shader_group.add_shader("shader", shader_file_name, node.name, parameters)
+                shader_ops.append(('shader', "shader", shader_file_name, node.name, parameters))
 
                 for index, output in enumerate(node.outputs):
                     if output.is_linked:
                         for link in output.links:
-                            if link.to_node in self.__shader_list:
+                            if link.to_node in shader_nodes:
                                 # Cycles to appleseed
                                 if isinstance(link.to_node, AppleseedOSLNode):
-                                    self.__as_shader_group.add_connection(node.name,
-                                                                          cycles_parameter_mapping[node.bl_idname]['outputs'][index],
-                                                                          link.to_node.name,
-                                                                          link.to_socket.socket_osl_id)
+                                    shader_ops.append(('connection',
+                                                       node.name,
+                                                       cycles_parameter_mapping[node.bl_idname]['outputs'][index],
+                                                       link.to_node.name,
+                                                       link.to_socket.socket_osl_id))
                                 else:  # Cycles to Cycles
                                     for s_index, socket in enumerate(link.to_node.inputs):
                                         if socket.name == link.to_socket.name:
                                             to_socket_name = cycles_parameter_mapping[
                                                 link.to_node.bl_idname]['inputs'][s_index]
-                                    self.__as_shader_group.add_connection(node.name,
-                                                                          cycles_parameter_mapping[node.bl_idname]['outputs'][index],
-                                                                          link.to_node.name,
-                                                                          to_socket_name)
+                                    shader_ops.append(('connection',
+                                                       node.name,
+                                                       cycles_parameter_mapping[node.bl_idname]['outputs'][index],
+                                                       link.to_node.name,
+                                                       to_socket_name))
 
         surface_shader_file = self._asset_handler.process_path(
             surface_shader.file_name, AssetType.SHADER_ASSET)
 
-        self.__as_shader_group.add_shader("surface", surface_shader_file, surface_shader.name, {})
+        shader_ops.append(('shader', "surface", surface_shader_file, surface_shader.name, {}))
 
-    def __traverse_tree(self, node, tree_list, engine):
-        for socket in node.inputs:
-            if socket.is_linked:
-                linked_node = socket.links[0].from_node
-                if linked_node.bl_idname in cycles_nodes.keys() or isinstance(linked_node, AppleseedOSLNode):
-                    self.__traverse_tree(linked_node, tree_list, engine)
-                else:
-                    logger.error(f"Node {linked_node.name} is not a node compatible with appleseed, stopping traversal")
-                    engine.report({'ERROR'}, f"Node {linked_node.name} is not a node compatible with appleseed, stopping traversal")
+        self.__tree_key = self.__get_tree_key(shader_ops)
+
+        self.__as_shader_group.clear()
+
+        for op in shader_ops:
+            if op[0] == 'shader':
+                self.__as_shader_group.add_shader(*op[1:])
+            elif op[0] == 'source':
+                self.__as_shader_group.add_source_shader(*op[1:])
+            else:
+                self.__as_shader_group.add_connection(*op[1:])
+
+    def __get_osl_node_params(self, node, bl_scene):
+        """
+        Returns the shader parameters of an appleseed node.  Nodes of the same type with the same
+        values share their translated parameters for the whole session.
+        """
+
+        parameter_types = node.parameter_types
+        sub_texture = bl_scene.appleseed.sub_textures
+
+        # Paths with frame number patterns are expanded for the current frame.
+        frame = None
+
+        values = list()
+        for key in node.keys():
+            if key in parameter_types:
+                parameter_value = getattr(node, key)
+                if key in node.filepaths:
+                    parameter_value = parameter_value.filepath
+                    if '%' in parameter_value:
+                        frame = bl_scene.frame_current
+                elif hasattr(parameter_value, '__len__') and not isinstance(parameter_value, str):
+                    parameter_value = tuple(parameter_value)
+                values.append((key, parameter_value))
+
+        cache_key = (node.bl_idname, sub_texture, frame, tuple(values))
+
+        parameters = self._asset_handler.node_params_cache.get(cache_key)
+        if parameters is not None:
+            return parameters
+
+        parameters = dict()
+
+        for key, parameter_value in values:
+            parameter_type = parameter_types[key]
+
+            if key in node.filepaths:
+                parameter_value = self._asset_handler.process_path(
+                    parameter_value,
+                    AssetType.TEXTURE_ASSET, sub_texture)
+
+            if parameter_type == "int checkbox":
+                parameter_type = "int"
+                parameter_value = int(parameter_value)
+            elif parameter_type in ('color', 'vector', 'normal', 'point', 'float[2]'):
+                parameter_value = " ".join(map(str, parameter_value))
+                if parameter_type == 'float[2]':
+                    parameter_type = 'float[]'
+
+            parameters[key] = parameter_type + " " + str(parameter_value)
+
+        self._asset_handler.node_params_cache[cache_key] = parameters
+
+        return parameters
+
+    @staticmethod
+    def __get_tree_key(shader_ops):
+        # Layer names are replaced by their position so trees only differing in node names match.
+        layers = dict()
+        for op in shader_ops:
+            if op[0] != 'connection':
+                layers[op[3]] = len(layers)
+
+        canonical_ops = list()
+        for op in shader_ops:
+            if op[0] == 'connection':
+                canonical_ops.append((op[0], layers[op[1]], op[2], layers[op[3]], op[4]))
+            else:
+                canonical_ops.append(op[:3] + op[4:-1] + (sorted(op[-1].items()),))
+
+        return hashlib.sha1(repr(canonical_ops).encode('utf-8')).hexdigest()
+
+    def __traverse_tree(self, node, engine):
+        """
+        Returns the nodes the given node depends on, in dependency order and each node once,
+        followed by the node itself.
+        """
+
+        tree_list = list()
+        visited = {node}
+        stack = [(node, iter(node.inputs))]
+
+        while stack:
+            current_node, sockets = stack[-1]
+            for socket in sockets:
+                if socket.is_linked:
+                    linked_node = socket.links[0].from_node
+                    if linked_node in visited:
+                        continue
+                    if linked_node.bl_idname in cycles_nodes.keys() or isinstance(linked_node, AppleseedOSLNode):
+                        visited.add(linked_node)
+                        stack.append((linked_node, iter(linked_node.inputs)))
+                        break
+                    else:
+                        logger.error(f"Node {linked_node.name} is not a node compatible with appleseed, stopping traversal")
+                        engine.report({'ERROR'}, f"Node {linked_node.name} is not a node compatible with appleseed, stopping traversal")
+            else:
+                stack.pop()
+                tree_list.append(current_node)
 
-        tree_list.append(node)
-        
         return tree_list
@@ -41,6 +41,10 @@ from ...utils.path_util import get_osl_search_paths
 
 logger = get_logger()
 
+# Directory holding the bundled area light shaders.  Search path changes only take effect after
+# restarting Blender, so it is resolved once and reused by every lamp.
+_area_shader_dir = None
+
 
 class LampTranslator(Translator):
     def __init__(self, bl_lamp, export_mode, asset_handler):
@@ -55,7 +59,14 @@ class LampTranslator(Translator):
         self.__as_lamp_params = None
         self.__as_lamp_radiance = None
         self.__radiance = None
-        
+        self.__radiance_name = None
+
+        # Batching of identical lights.  Lamps in a batch instance the assembly of the batch owner
+        # instead of creating their own light entity.
+        self.__batch_owner = None
+        self.__batch_size = 1
+        self.__ass_instances_flushed = False
+
         self.__instance_lib = asr.BlTransformLibrary()
         self.__as_area_lamp_inst_name = None
         self.__instance_params = None
@@ -65,10 +76,15 @@ class LampTranslator(Translator):
         self.__ass_name = None
 
         self.__as_area_lamp_mesh = None
+        self.__area_shape_params = None
+        self.__mesh_name = None
+        self.__mesh_users = 1
         self.__as_area_lamp_inst = None
         self.__as_mesh_inst = None
         self.__as_area_lamp_material = None
         self.__as_area_lamp_shadergroup = None
+        self.__area_shader_paths = None
+        self.__area_shader_params = None
         self.__node_tree = None
 
     @property
@@ -83,6 +99,87 @@ class LampTranslator(Translator):
     def instances_size(self):
         return len(self.__instance_lib)
 
+    @property
+    def ass_name(self):
+        return f"{self.orig_name}_ass"
+
+    @property
+    def radiance(self):
+        return self.__radiance
+
+    @property
+    def radiance_name(self):
+        return self.__radiance_name
+
+    @property
+    def is_batchable(self):
+        return self.__lamp_model in ('point_light', 'spot_light', 'directional_light')
+
+    @property
+    def batch_key(self):
+        """
+        Key identifying lamps that can share a single light entity.  References to the radiance
+        color of the lamp are keyed by the color itself, so batching does not depend on radiance sharing.
+        """
+
+        params = {key: ('radiance', tuple(self.__radiance)) if value == self.__radiance_name else value
+                  for key, value in self.__as_lamp_params.items()}
+
+        return self.__lamp_model, tuple(sorted(params.items()))
+
+    def share_radiance(self, source):
+        """
+        Drops the radiance color of this lamp in favor of the identical color of another lamp.
+        """
+
+        self.__as_lamp_radiance = None
+        self.__radiance_name = source.radiance_name
+
+        self.__as_lamp_params = self.__get_lamp_params()
+        self.__as_lamp.set_parameters(self.__as_lamp_params)
+
+    def join_batch(self, owner):
+        """
+        Drops the light entity of this lamp.  Its instances will reference the assembly of the batch owner.
+        """
+
+        self.__as_lamp = None
+        self.__as_lamp_radiance = None
+        self.__batch_owner = owner
+        owner.add_batch_member()
+
+    def add_batch_member(self):
+        self.__batch_size += 1
+
+    @property
+    def mesh_name(self):
+        return self.__mesh_name
+
+    @property
+    def mesh_key(self):
+        """
+        Key identifying area lamps that can share the same primitive mesh.
+        """
+
+        shape_params = self.__area_shape_params
+
+        return (shape_params.get('primitive'),
+                shape_params.get('width'),
+                shape_params.get('height'),
+                shape_params.get('radius'))
+
+    def share_mesh(self, owner):
+        """
+        Drops the primitive mesh of this area lamp.  Its object instance will reference the mesh of the owner.
+        """
+
+        self.__as_area_lamp_mesh = None
+        self.__mesh_name = owner.mesh_name
+        owner.add_mesh_user()
+
+    def add_mesh_user(self):
+        self.__mesh_users += 1
+
     def create_entities(self, depsgraph, deforms_length):
         logger.debug(f"appleseed: Creating lamp entity for {self.orig_name}")
         as_lamp_data = self.bl_lamp.data.appleseed
@@ -91,28 +188,21 @@ class LampTranslator(Translator):
 
         if self.bl_lamp.data.type != 'AREA':
             self.__radiance = self._convert_color(as_lamp_data.radiance)
-            lamp_radiance_name = f"{self.orig_name}_radiance"
+            self.__radiance_name = f"{self.orig_name}_radiance"
 
-            self.__as_lamp_radiance = asr.ColorEntity(lamp_radiance_name,
+            self.__as_lamp_radiance = asr.ColorEntity(self.__radiance_name,
                                                       {'color_space': 'linear_rgb'},
                                                       self.__radiance)
 
-            if self.__lamp_model == 'point_light':
-                self.__as_lamp_params = self.__get_point_lamp_params()
-            if self.__lamp_model == 'spot_light':
-                self.__as_lamp_params = self.__get_spot_lamp_params()
-            if self.__lamp_model == 'directional_light':
-                self.__as_lamp_params = self.__get_directional_lamp_params()
-            if self.__lamp_model == 'sun_light':
-                self.__as_lamp_params = self.__get_sun_lamp_params()
+            self.__as_lamp_params = self.__get_lamp_params()
 
             self.__as_lamp = asr.Light(self.__lamp_model, self.orig_name, self.__as_lamp_params)
 
         else:
-            shape_params = self._get_area_mesh_params()
-            mesh_name = f"{self.orig_name}_mesh"
+            self.__area_shape_params = self._get_area_mesh_params()
+            self.__mesh_name = f"{self.orig_name}_mesh"
 
-            self.__as_area_lamp_mesh = asr.create_primitive_mesh(mesh_name, shape_params)
+            self.__as_area_lamp_mesh = asr.create_primitive_mesh(self.__mesh_name, self.__area_shape_params)
 
             mat_name = f"{self.orig_name}_mat"
 
@@ -124,6 +214,7 @@ class LampTranslator(Translator):
                 shader_name = f"{self.orig_name}_tree"
 
                 self.__as_area_lamp_shadergroup = asr.ShaderGroup(shader_name)
+                self.__area_shader_params = None
                 self._set_shadergroup()
             else:
                 self.__node_tree = NodeTreeTranslator(self.bl_lamp.data.node_tree, self._asset_handler, self.orig_name)
@@ -140,16 +231,23 @@ class LampTranslator(Translator):
     def flush_entities(self, as_scene, as_main_assembly, as_project):
         logger.debug(f"appleseed: Flushing lamp entity for {self.orig_name} to project")
         self.__instance_lib.optimize_xforms()
-        
-        needs_assembly = self.__export_mode == ProjectExportMode.INTERACTIVE_RENDER or self.__instance_lib.needs_assembly()
 
         if self.__lamp_model != 'area_lamp':
-            radiance_name = self.__as_lamp_radiance.get_name()
-            as_main_assembly.colors().insert(self.__as_lamp_radiance)
-            self.__as_lamp_radiance = as_main_assembly.colors().get_by_name(radiance_name)
+            if self.__batch_owner is not None:
+                # The light entity lives in the assembly of the batch owner.
+                self.__ass_name = self.__batch_owner.ass_name
+                self.__instance_lib.flush_instances(as_main_assembly, self.__ass_name)
+                self.__ass_instances_flushed = True
+                return
+
+            if self.__as_lamp_radiance is not None:
+                as_main_assembly.colors().insert(self.__as_lamp_radiance)
+                self.__as_lamp_radiance = as_main_assembly.colors().get_by_name(self.__radiance_name)
 
-            if needs_assembly:
-                self.__ass_name = f"{self.orig_name}_ass"
+            # Lamps sitting directly in the main assembly are also used in interactive mode
+            # so that scenes with many lights do not end up with one assembly per light.
+            if self.__instance_lib.needs_assembly() or self.__batch_size > 1:
+                self.__ass_name = self.ass_name
                 self.__ass = asr.Assembly(self.__ass_name)
 
                 self.__ass.lights().insert(self.__as_lamp)
@@ -162,15 +260,23 @@ class LampTranslator(Translator):
             else:
                 self.__as_lamp.set_transform(self.__instance_lib.get_single_transform())
                 as_main_assembly.lights().insert(self.__as_lamp)
-                self.__as_lamp = as_main_assembly.lights().get_by_name(self.obj_name)
-        
+                self.__as_lamp = as_main_assembly.lights().get_by_name(self.orig_name)
+
         else:
+            needs_assembly = self.__export_mode == ProjectExportMode.INTERACTIVE_RENDER or self.__instance_lib.needs_assembly()
+
             mat_name = f"{self.orig_name}_mat"
 
-            mesh_name = f"{self.orig_name}_mesh"
+            mesh_name = self.__mesh_name
 
             self.__as_area_lamp_inst_name = f"{self.orig_name}_inst"
 
+            # Meshes shared by several area lamps live in the main assembly, where the
+            # object instances of all lamps can find them.
+            if self.__as_area_lamp_mesh is not None and self.__mesh_users > 1:
+                as_main_assembly.objects().insert(self.__as_area_lamp_mesh)
+                self.__as_area_lamp_mesh = as_main_assembly.objects().get_by_name(mesh_name)
+
             as_main_assembly.materials().insert(self.__as_area_lamp_material)
             self.__as_area_lamp_material = as_main_assembly.materials().get_by_name(mat_name)
 
@@ -193,8 +299,9 @@ class LampTranslator(Translator):
 
                 self.__ass = asr.Assembly(self.__ass_name)
 
-                self.__ass.objects().insert(self.__as_area_lamp_mesh)
-                self.__as_area_lamp_mesh = self.__ass.objects().get_by_name(mesh_name)
+                if self.__as_area_lamp_mesh is not None and self.__mesh_users == 1:
+                    self.__ass.objects().insert(self.__as_area_lamp_mesh)
+                    self.__as_area_lamp_mesh = self.__ass.objects().get_by_name(mesh_name)
 
                 self.__ass.object_instances().insert(self.__as_area_lamp_inst)
                 self.__as_area_lamp_inst = self.__ass.object_instances().get_by_name(self.__as_area_lamp_inst_name)
@@ -212,8 +319,9 @@ class LampTranslator(Translator):
                                                               {"default": mat_name},
                                                               {"default": "__null_material"})
 
-                as_main_assembly.objects().insert(self.__as_area_lamp_mesh)
-                self.__as_area_lamp_mesh = as_main_assembly.objects().get_by_name(mesh_name)
+                if self.__as_area_lamp_mesh is not None and self.__mesh_users == 1:
+                    as_main_assembly.objects().insert(self.__as_area_lamp_mesh)
+                    self.__as_area_lamp_mesh = as_main_assembly.objects().get_by_name(mesh_name)
 
                 as_main_assembly.object_instances().insert(self.__as_area_lamp_inst)
                 self.__as_mesh_inst = as_main_assembly.object_instances().get_by_name(self.__as_area_lamp_inst_name)
@@ -235,52 +343,46 @@ class LampTranslator(Translator):
                 if current_radiance != self.__radiance:
                     as_main_assembly.colors().remove(self.__as_lamp_radiance)
 
-                    lamp_radiance_name = f"{self.orig_name}_radiance"
-
                     self.__as_lamp_radiance = asr.ColorEntity(
-                        lamp_radiance_name,
+                        self.__radiance_name,
                         {'color_space': 'linear_rgb'},
                         self.__radiance)
 
                     as_main_assembly.colors().insert(self.__as_lamp_radiance)
-                    self.__as_lamp_radiance = as_main_assembly.colors().get_by_name(lamp_radiance_name)
+                    self.__as_lamp_radiance = as_main_assembly.colors().get_by_name(self.__radiance_name)
 
                 # Update lamp parameters.
-                if self.__lamp_model == 'point_light':
-                    self.__as_lamp_params = self.__get_point_lamp_params()
-                if self.__lamp_model == 'spot_light':
-                    self.__as_lamp_params = self.__get_spot_lamp_params()
-                if self.__lamp_model == 'directional_light':
-                    self.__as_lamp_params = self.__get_directional_lamp_params()
-                if self.__lamp_model == 'sun_light':
-                    self.__as_lamp_params = self.__get_sun_lamp_params()
+                self.__as_lamp_params = self.__get_lamp_params()
 
                 self.__as_lamp.set_parameters(self.__as_lamp_params)
             else:
-                self.__ass.object_instances().remove(self.__as_area_lamp_inst)
-                self.__ass.objects().remove(self.__as_area_lamp_mesh)
-
-                shape_params = self._get_area_mesh_params()
-                mesh_name = f"{self.orig_name}_mesh"
                 mat_name = f"{self.orig_name}_mat"
 
-                self.__as_area_lamp_mesh = asr.create_primitive_mesh(mesh_name, shape_params)
-
-                self.__instance_params = self._get_area_mesh_instance_params()
-
-                self.__as_area_lamp_inst = asr.ObjectInstance(self.__as_area_lamp_inst_name,
-                                                              self.__instance_params,
-                                                              mesh_name,
-                                                              asr.Transformd(
-                                                                  asr.Matrix4d().identity()),
-                                                              {"default": mat_name},
-                                                              {"default": "__null_material"})
-
-                self.__ass.objects().insert(self.__as_area_lamp_mesh)
-                self.__as_area_lamp_mesh = self.__ass.objects().get_by_name(mesh_name)
-
-                self.__ass.object_instances().insert(self.__as_area_lamp_inst)
-                self.__as_area_lamp_inst = self.__ass.object_instances().get_by_name(self.__as_area_lamp_inst_name)
+                # Only rebuild the mesh and object instance when the shape or visibility changed.
+                shape_params = self._get_area_mesh_params()
+                if shape_params != self.__area_shape_params:
+                    logger.debug(f"appleseed: Rebuilding area lamp mesh for {self.orig_name}")
+                    self.__area_shape_params = shape_params
+
+                    self.__ass.objects().remove(self.__as_area_lamp_mesh)
+                    self.__as_area_lamp_mesh = asr.create_primitive_mesh(self.__mesh_name, self.__area_shape_params)
+                    self.__ass.objects().insert(self.__as_area_lamp_mesh)
+                    self.__as_area_lamp_mesh = self.__ass.objects().get_by_name(self.__mesh_name)
+
+                instance_params = self._get_area_mesh_instance_params()
+                if instance_params != self.__instance_params:
+                    self.__instance_params = instance_params
+
+                    self.__ass.object_instances().remove(self.__as_area_lamp_inst)
+                    self.__as_area_lamp_inst = asr.ObjectInstance(self.__as_area_lamp_inst_name,
+                                                                  self.__instance_params,
+                                                                  self.__mesh_name,
+                                                                  asr.Transformd(
+                                                                      asr.Matrix4d().identity()),
+                                                                  {"default": mat_name},
+                                                                  {"default": "__null_material"})
+                    self.__ass.object_instances().insert(self.__as_area_lamp_inst)
+                    self.__as_area_lamp_inst = self.__ass.object_instances().get_by_name(self.__as_area_lamp_inst_name)
 
                 if self.bl_lamp.data.use_nodes:
                     if self.__as_area_lamp_shadergroup is not None:
@@ -298,6 +400,7 @@ class LampTranslator(Translator):
                         shader_name = f"{self.orig_name}_tree"
 
                         self.__as_area_lamp_shadergroup = asr.ShaderGroup(shader_name)
+                        self.__area_shader_params = None
                         self._set_shadergroup()
                     else:
                         self._set_shadergroup()
@@ -305,7 +408,7 @@ class LampTranslator(Translator):
         else:
             # Delete current light.
             if current_model != 'area_lamp':
-                self.__ass.lights().remove(self.__as_lamp)
+                self.__lamp_container(as_main_assembly).lights().remove(self.__as_lamp)
 
                 as_main_assembly.colors().remove(self.__as_lamp_radiance)
             else:
@@ -323,16 +426,20 @@ class LampTranslator(Translator):
             self.create_entities(depsgraph, 0)
 
             if self.__lamp_model != 'area_lamp':
-                radiance_name = self.__as_lamp_radiance.get_name()
                 as_main_assembly.colors().insert(self.__as_lamp_radiance)
-                self.__as_lamp_radiance = as_main_assembly.colors().get_by_name(radiance_name)
+                self.__as_lamp_radiance = as_main_assembly.colors().get_by_name(self.__radiance_name)
 
-                self.__ass.lights().insert(self.__as_lamp)
-                self.__as_lamp = self.__ass.lights().get_by_name(self.orig_name)
+                container = self.__lamp_container(as_main_assembly)
+                container.lights().insert(self.__as_lamp)
+                self.__as_lamp = container.lights().get_by_name(self.orig_name)
             else:
+                # Area lamps always live in their own assembly during interactive rendering.
+                if self.__ass is None:
+                    self.__create_assembly(as_main_assembly)
+
                 mat_name = f"{self.orig_name}_mat"
 
-                mesh_name = f"{self.orig_name}_mesh"
+                mesh_name = self.__mesh_name
 
                 self.__as_area_lamp_inst_name = f"{self.orig_name}_inst"
 
@@ -361,17 +468,35 @@ class LampTranslator(Translator):
                 self.__as_area_lamp_inst = self.__ass.object_instances().get_by_name(self.__as_area_lamp_inst_name)
 
     def clear_instances(self, as_main_assembly):
-        self.__instance_lib.clear_instances(as_main_assembly)
+        if self.__ass_instances_flushed:
+            self.__instance_lib.clear_instances(as_main_assembly)
+            self.__ass_instances_flushed = False
+        else:
+            self.__instance_lib = asr.BlTransformLibrary()
 
     def flush_instances(self, as_main_assembly):
+        if self.__ass is None:
+            # The light sits directly in the main assembly.
+            self.__instance_lib.optimize_xforms()
+            if not self.__instance_lib.needs_assembly():
+                self.__as_lamp.set_transform(self.__instance_lib.get_single_transform())
+                return
+
+            as_main_assembly.lights().remove(self.__as_lamp)
+            self.__as_lamp.set_transform(asr.Transformd(asr.Matrix4d().identity()))
+            self.__create_assembly(as_main_assembly)
+            self.__ass.lights().insert(self.__as_lamp)
+            self.__as_lamp = self.__ass.lights().get_by_name(self.orig_name)
+
         self.__instance_lib.flush_instances(as_main_assembly, self.__ass_name)
+        self.__ass_instances_flushed = True
 
     def delete_object(self, as_main_assembly):
         logger.debug(f"appleseed: Deleting lamp entity for {self.orig_name}")
         self.clear_instances(as_main_assembly)
 
         if self.__lamp_model != 'area_lamp':
-            self.__ass.lights().remove(self.__as_lamp)
+            self.__lamp_container(as_main_assembly).lights().remove(self.__as_lamp)
             self.__as_lamp = None
 
             as_main_assembly.colors().remove(self.__as_lamp_radiance)
@@ -390,13 +515,32 @@ class LampTranslator(Translator):
                 self.__node_tree = None
 
             as_main_assembly.materials().remove(self.__as_area_lamp_material)
-        
-        as_main_assembly.assemblies().remove(self.__ass)
-        self.__ass = None    
+
+        if self.__ass is not None:
+            as_main_assembly.assemblies().remove(self.__ass)
+            self.__ass = None
+
+    def __lamp_container(self, as_main_assembly):
+        return self.__ass if self.__ass is not None else as_main_assembly
+
+    def __create_assembly(self, as_main_assembly):
+        self.__ass_name = self.ass_name
+        as_main_assembly.assemblies().insert(asr.Assembly(self.__ass_name))
+        self.__ass = as_main_assembly.assemblies().get_by_name(self.__ass_name)
+
+    def __get_lamp_params(self):
+        if self.__lamp_model == 'point_light':
+            return self.__get_point_lamp_params()
+        if self.__lamp_model == 'spot_light':
+            return self.__get_spot_lamp_params()
+        if self.__lamp_model == 'directional_light':
+            return self.__get_directional_lamp_params()
+        if self.__lamp_model == 'sun_light':
+            return self.__get_sun_lamp_params()
 
     def __get_point_lamp_params(self):
         as_lamp_data = self.bl_lamp.data.appleseed
-        light_params = {'intensity': f"{self.obj_name}_radiance",
+        light_params = {'intensity': self.__radiance_name,
                         'intensity_multiplier': as_lamp_data.radiance_multiplier,
                         'exposure': as_lamp_data.exposure,
                         'cast_indirect_light': as_lamp_data.cast_indirect,
@@ -409,7 +553,7 @@ class LampTranslator(Translator):
         outer_angle = math.degrees(self.bl_lamp.data.spot_size)
         inner_angle = (1.0 - self.bl_lamp.data.spot_blend) * outer_angle
 
-        intensity = f"{self.orig_name}_radiance"
+        intensity = self.__radiance_name
         intensity_multiplier = as_lamp_data.radiance_multiplier
 
         if as_lamp_data.radiance_use_tex and as_lamp_data.radiance_tex is not None:
@@ -432,7 +576,7 @@ class LampTranslator(Translator):
 
     def __get_directional_lamp_params(self):
         as_lamp_data = self.bl_lamp.data.appleseed
-        light_params = {'irradiance': f"{self.obj_name}_radiance",
+        light_params = {'irradiance': self.__radiance_name,
                         'irradiance_multiplier': as_lamp_data.radiance_multiplier,
                         'exposure': as_lamp_data.exposure,
                         'cast_indirect_light': as_lamp_data.cast_indirect,
@@ -510,17 +654,6 @@ class LampTranslator(Translator):
     def _set_shadergroup(self):
         as_lamp_data = self.bl_lamp.data.appleseed
 
-        self.__as_area_lamp_shadergroup.clear()
-
-        shader_dir_path = self.__find_shader_dir()
-        shader_path = self._asset_handler.process_path(
-            os.path.join(shader_dir_path, "as_blender_areaLight.oso"),
-            AssetType.SHADER_ASSET)
-
-        surface_path = self._asset_handler.process_path(
-            os.path.join(shader_dir_path, "as_closure2surface.oso"),
-            AssetType.SHADER_ASSET)
-
         lamp_color = " ".join(map(str, as_lamp_data.area_color))
 
         lamp_params = {'in_color': f"color {lamp_color}",
@@ -529,6 +662,29 @@ class LampTranslator(Translator):
                        'in_exposure': f"float {as_lamp_data.area_exposure}",
                        'in_normalize': f"int {as_lamp_data.area_normalize}"}
 
+        # Lamp updates that do not touch the area light parameters leave the shader group alone.
+        # The bindings cannot edit the parameters of a shader in a group, so any change rebuilds it.
+        if lamp_params == self.__area_shader_params:
+            return
+
+        self.__area_shader_params = lamp_params
+
+        # The shader paths are resolved once per lamp.
+        if self.__area_shader_paths is None:
+            shader_dir_path = self.__find_shader_dir()
+            shader_path = self._asset_handler.process_path(
+                os.path.join(shader_dir_path, "as_blender_areaLight.oso"),
+                AssetType.SHADER_ASSET)
+
+            surface_path = self._asset_handler.process_path(
+                os.path.join(shader_dir_path, "as_closure2surface.oso"),
+                AssetType.SHADER_ASSET)
+
+            self.__area_shader_paths = (shader_path, surface_path)
+
+        shader_path, surface_path = self.__area_shader_paths
+
+        self.__as_area_lamp_shadergroup.clear()
         self.__as_area_lamp_shadergroup.add_shader("shader", shader_path, "asAreaLight", lamp_params)
         self.__as_area_lamp_shadergroup.add_shader("surface", surface_path, "asClosure2Surface", {})
         self.__as_area_lamp_shadergroup.add_connection("asAreaLight", "out_output", "asClosure2Surface", "in_input")
@@ -545,7 +701,13 @@ class LampTranslator(Translator):
 
     @staticmethod
     def __find_shader_dir():
-        for directory in get_osl_search_paths():
-            if os.path.basename(directory) in ('shaders', 'blenderseed'):
-                return directory
+        global _area_shader_dir
+
+        if _area_shader_dir is None:
+            for directory in get_osl_search_paths():
+                if os.path.basename(directory) in ('shaders', 'blenderseed'):
+                    _area_shader_dir = directory
+                    break
+
+        return _area_shader_dir
 
@@ -52,6 +52,7 @@ class MeshTranslator(Translator):
         self.__as_mesh_inst_params = dict()
         self.__front_materials = dict()
         self.__back_materials = dict()
+        self.__material_redirects = dict()
 
         self.__obj_inst_name = None
         self.__ass_name = str()
@@ -102,6 +103,14 @@ class MeshTranslator(Translator):
         if self.__is_deforming:
             self.__as_mesh.set_motion_segment_count(num_def_times - 1)
 
+    def set_material_redirects(self, material_redirects):
+        """
+        Maps material names to the names of the identical materials that are exported in their place.
+        """
+
+        self.__material_redirects = material_redirects
+        self.__front_materials, self.__back_materials = self.__get_material_mappings()
+
     def add_instance_step(self, time, instance_id, bl_matrix):
         self.__instance_lib.add_xform_step(time, instance_id, self._convert_matrix(bl_matrix))
 
@@ -272,6 +281,10 @@ class MeshTranslator(Translator):
 
         double_sided_materials = False if self._bl_obj.appleseed.double_sided is False else True
 
+        if self.__material_redirects:
+            for slot, mat_key in front_mats.items():
+                front_mats[slot] = self.__material_redirects.get(mat_key, mat_key)
+
         if double_sided_materials:
             rear_mats = front_mats
 
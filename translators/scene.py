@@ -39,7 +39,7 @@ from .textures import TextureTranslator
 from .utilites import ProjectExportMode
 from .world import WorldTranslator
 from ..logger import get_logger
-from ..utils.util import Timer, calc_film_aspect_ratio, clamp_value, realpath
+from ..utils.util import Profiler, calc_film_aspect_ratio, clamp_value, realpath
 
 logger = get_logger()
 
@@ -139,6 +139,8 @@ class SceneTranslator(object):
         self.__project = None
         self.__frame = None
 
+        self.__profiler = Profiler()
+
     @property
     def as_project(self):
         return self.__project
@@ -154,33 +156,35 @@ class SceneTranslator(object):
     def translate_scene(self, engine, depsgraph, context=None):
         logger.debug("appleseed: Translating scene %s", depsgraph.scene_eval.name)
 
-        prof_timer = Timer()
-        prof_timer.start()
+        self.__profiler = Profiler()
+        profiler = self.__profiler
 
-        self.__create_project(depsgraph)
+        with profiler.span("project"):
+            self.__create_project(depsgraph)
 
-        if self.__export_mode != ProjectExportMode.INTERACTIVE_RENDER:
-            self.__calc_shutter_times(depsgraph)
+        with profiler.span("render settings"):
+            if self.__export_mode != ProjectExportMode.INTERACTIVE_RENDER:
+                self.__calc_shutter_times(depsgraph)
 
-        self.__translate_render_settings(depsgraph)
+            self.__translate_render_settings(depsgraph)
 
-        self.__calc_viewport_resolution(depsgraph, context)
+            self.__calc_viewport_resolution(depsgraph, context)
 
-        aovs = self.__set_aovs(depsgraph)
-        frame_params = self.__translate_frame(depsgraph)
+            aovs = self.__set_aovs(depsgraph)
+            frame_params = self.__translate_frame(depsgraph)
 
-        self.__frame = asr.Frame("beauty", frame_params, aovs)
+            self.__frame = asr.Frame("beauty", frame_params, aovs)
 
-        self.__calc_crop_window(depsgraph, context)
+            self.__calc_crop_window(depsgraph, context)
 
-        if self.__crop_window is not None:
-            self.__frame.set_crop_window(self.__crop_window)
+            if self.__crop_window is not None:
+                self.__frame.set_crop_window(self.__crop_window)
 
-        if len(depsgraph.scene_eval.appleseed.post_processing_stages) > 0 and self.__export_mode != ProjectExportMode.INTERACTIVE_RENDER:
-            self.__set_post_process(depsgraph)
+            if len(depsgraph.scene_eval.appleseed.post_processing_stages) > 0 and self.__export_mode != ProjectExportMode.INTERACTIVE_RENDER:
+                self.__set_post_process(depsgraph)
 
-        self.__project.set_frame(self.__frame)
-        self.__frame = self.__project.get_frame()
+            self.__project.set_frame(self.__frame)
+            self.__frame = self.__project.get_frame()
 
         # Create camera
         if depsgraph.scene_eval.camera is not None:
@@ -198,61 +202,96 @@ class SceneTranslator(object):
 
         # Blender scene processing
         objects_to_add = dict()
-        materials_to_add = dict()
-        textures_to_add = dict()
 
-        for obj in bpy.data.objects:
-            if obj.type == 'LIGHT':
-                objects_to_add[obj] = LampTranslator(obj, self.__export_mode, self.__asset_handler)
-            elif obj.type == 'MESH' and len(obj.data.loops) > 0:
-                objects_to_add[obj] = MeshTranslator(obj, self.__export_mode, self.__asset_handler)
-            elif obj.type == 'EMPTY' and obj.appleseed.object_export == "archive_assembly":
-                objects_to_add[obj] = ArchiveAssemblyTranslator(obj, self.__asset_handler)
+        with profiler.span("scene processing"):
+            for obj in bpy.data.objects:
+                if obj.type == 'LIGHT':
+                    objects_to_add[obj] = LampTranslator(obj, self.__export_mode, self.__asset_handler)
+                elif obj.type == 'MESH' and len(obj.data.loops) > 0:
+                    objects_to_add[obj] = MeshTranslator(obj, self.__export_mode, self.__asset_handler)
+                elif obj.type == 'EMPTY' and obj.appleseed.object_export == "archive_assembly":
+                    objects_to_add[obj] = ArchiveAssemblyTranslator(obj, self.__asset_handler)
 
-        for mat in bpy.data.materials:
-            materials_to_add[mat] = MaterialTranslator(mat, self.__asset_handler)
-
-        for tex in bpy.data.images:
-            if tex.users > 0 and tex.name not in ("Render Result", "Viewer Node"):
-                textures_to_add[tex] = TextureTranslator(tex, self.__asset_handler)
-
-        # Create camera, world, material and texture entities
-        self.__as_camera_translator.create_entities(depsgraph, context, engine)
+        # Create camera and world entities
+        with profiler.span("camera"), profiler.span("create"):
+            self.__as_camera_translator.create_entities(depsgraph, context, engine)
 
         if self.__as_world_translator is not None:
-            self.__as_world_translator.create_entities(depsgraph)
-
-        for obj, trans in materials_to_add.items():
-            trans.create_entities(depsgraph, engine)
-        for obj, trans in textures_to_add.items():
-            trans.create_entities(depsgraph)
-
-        # Set initial position of all objects and lamps
-        self.__calc_initial_positions(depsgraph, engine, objects_to_add)
-
-        # Remove unused translators
-        for translator in list(objects_to_add.keys()):
-            if objects_to_add[translator].instances_size == 0:
-                del objects_to_add[translator]
+            with profiler.span("world"), profiler.span("create"):
+                self.__as_world_translator.create_entities(depsgraph)
+
+        with profiler.span("scene processing"):
+            # Set initial position of all objects and lamps
+            self.__calc_initial_positions(depsgraph, engine, objects_to_add)
+
+            # Remove unused translators
+            for translator in list(objects_to_add.keys()):
+                if objects_to_add[translator].instances_size == 0:
+                    del objects_to_add[translator]
+
+        # Create material entities for the materials used by the exported meshes
+        with profiler.span("materials"):
+            used_materials = self.__collect_used_materials(objects_to_add.keys())
+            materials_to_add = self.__create_material_translators(used_materials)
+
+            with profiler.span("create"):
+                for obj, trans in materials_to_add.items():
+                    with profiler.span(trans.orig_name):
+                        trans.create_entities(depsgraph, engine)
+
+            # Materials stay individually editable during interactive rendering
+            material_redirects = dict()
+            if self.__export_mode != ProjectExportMode.INTERACTIVE_RENDER:
+                with profiler.span("deduplicate"):
+                    material_redirects = self.__collapse_materials(materials_to_add)
+                    self.__share_shader_groups(materials_to_add)
+
+        # Create texture entities for the images referenced by the exported entities
+        with profiler.span("textures"):
+            texture_refs = self.__collect_texture_references(depsgraph, objects_to_add.keys())
+            textures_to_add = self.__create_texture_translators(depsgraph, texture_refs)
 
         # Create 3D entities
-        for obj, trans in objects_to_add.items():
-            trans.create_entities(depsgraph, len(self.__deform_times))
+        with profiler.span("objects"):
+            with profiler.span("create"):
+                for obj, trans in objects_to_add.items():
+                    with profiler.span(f"{obj.type.lower()} {obj.name_full}"):
+                        trans.create_entities(depsgraph, len(self.__deform_times))
+
+            if material_redirects:
+                for trans in objects_to_add.values():
+                    if isinstance(trans, MeshTranslator):
+                        trans.set_material_redirects(material_redirects)
+
+            # Lamps stay individually editable during interactive rendering
+            if self.__export_mode != ProjectExportMode.INTERACTIVE_RENDER:
+                with profiler.span("lamp batching"):
+                    self.__batch_lamps(objects_to_add)
+                    self.__share_area_lamp_meshes(objects_to_add)
 
         # Calculate additional steps for motion blur
         if self.__export_mode != ProjectExportMode.INTERACTIVE_RENDER:
-            self.__calc_motion_steps(depsgraph, engine, objects_to_add)
+            with profiler.span("motion steps"):
+                self.__calc_motion_steps(depsgraph, engine, objects_to_add)
 
-        self.__as_camera_translator.flush_entities(self.as_scene, self.as_main_assembly, self.as_project)
+        with profiler.span("camera"), profiler.span("flush"):
+            self.__as_camera_translator.flush_entities(self.as_scene, self.as_main_assembly, self.as_project)
         if self.__as_world_translator is not None:
-            self.__as_world_translator.flush_entities(self.as_scene, self.as_main_assembly, self.as_project)
-
-        for obj, trans in objects_to_add.items():
-            trans.flush_entities(self.as_scene, self.as_main_assembly, self.as_project)
-        for obj, trans in materials_to_add.items():
-            trans.flush_entities(self.as_scene, self.as_main_assembly, self.as_project)
-        for obj, trans in textures_to_add.items():
-            trans.flush_entities(self.as_scene, self.as_main_assembly, self.as_project)
+            with profiler.span("world"), profiler.span("flush"):
+                self.__as_world_translator.flush_entities(self.as_scene, self.as_main_assembly, self.as_project)
+
+        with profiler.span("objects"), profiler.span("flush"):
+            for obj, trans in objects_to_add.items():
+                with profiler.span(f"{obj.type.lower()} {obj.name_full}"):
+                    trans.flush_entities(self.as_scene, self.as_main_assembly, self.as_project)
+        with profiler.span("materials"), profiler.span("flush"):
+            for obj, trans in materials_to_add.items():
+                with profiler.span(trans.orig_name):
+                    trans.flush_entities(self.as_scene, self.as_main_assembly, self.as_project)
+        with profiler.span("textures"), profiler.span("flush"):
+            for obj, trans in textures_to_add.items():
+                with profiler.span(obj.name_full, 0 if trans.is_alias else trans.file_size):
+                    trans.flush_entities(self.as_scene, self.as_main_assembly, self.as_project)
 
         # Transfer temp translators to main list
         for bl_obj, translator in objects_to_add.items():
@@ -262,10 +301,23 @@ class SceneTranslator(object):
         for bl_obj, translator in textures_to_add.items():
             self.__as_texture_translators[bl_obj] = translator
 
-        self.__load_searchpaths()
+        with profiler.span("search paths"):
+            self.__load_searchpaths()
+
+        logger.debug("appleseed: %s", profiler.summary())
+
+    @property
+    def profiler(self):
+        return self.__profiler
+
+    def write_profile(self, filepath, render_timings=None):
+        """
+        Writes the timing report of the last scene translation to a JSON file, along with the timings
+        of the renders made from it.
+        """
 
-        prof_timer.stop()
-        logger.debug("Scene translated in %f seconds.", prof_timer.elapsed())
+        logger.debug("appleseed: Writing translation profile to %s", filepath)
+        self.__profiler.write_json(filepath, render=render_timings or [])
 
     def update_multiview_camera(self, engine, depsgraph):
         current_frame = depsgraph.scene_eval.frame_current
@@ -283,9 +335,12 @@ class SceneTranslator(object):
 
     def update_scene(self, depsgraph, engine):
         objects_to_add = dict()
-        materials_to_add = dict()
 
         object_updates = list()
+        material_updates = list()
+
+        # Mesh instances whose material mappings are resolved once new materials are created.
+        instances_to_update = list()
 
         check_for_deletions = False
 
@@ -298,14 +353,14 @@ class SceneTranslator(object):
                 if update.id.original in self.__as_material_translators.keys():
                     self.__as_material_translators[update.id.original].update_material(depsgraph, engine)
                 else:
-                    materials_to_add[update.id.original] = MaterialTranslator(update.id.original,
-                                                                              self.__asset_handler)
+                    # Only translated once an exported mesh uses it.
+                    material_updates.append(update.id.original)
             # Now comes agony and mental anguish.
             elif isinstance(update.id, bpy.types.Object):
                 if update.id.type == 'MESH':
                     if update.id.original in self.__as_object_translators.keys():
                         if update.is_updated_geometry:
-                            self.__as_object_translators[update.id.original].update_obj_instance()
+                            instances_to_update.append(update.id.original)
                             object_updates.append(update.id.original)
                         if update.is_updated_transform:
                             recreate_instances.append(update.id.original)
@@ -354,6 +409,18 @@ class SceneTranslator(object):
             elif isinstance(update.id, bpy.types.Collection):
                 check_for_deletions = True
 
+        # Check if any objects were deleted, before the remaining objects are inspected below.
+        if check_for_deletions:
+            obj_list = list(self.__as_object_translators.keys())
+
+            for obj in obj_list:
+                try:
+                    if obj.name_full in bpy.data.objects or obj.name_full in bpy.data.lights:
+                        continue
+                except:
+                    self.__as_object_translators[obj].delete_object(self.as_main_assembly)
+                    del self.__as_object_translators[obj]
+
         # Now we figure out which objects have particle systems that need to have their instances recreated.
         for obj in object_updates:
             if len(obj.particle_systems) > 0:
@@ -376,14 +443,32 @@ class SceneTranslator(object):
                 elif obj in objects_to_add.keys():
                     objects_to_add[obj].add_instance_step(0.0, inst_id, inst.matrix_world)
 
-        # Create new materials.
+        # Create materials that exported meshes use for the first time.
+        used_materials = self.__collect_used_materials(list(objects_to_add.keys()) + object_updates)
+        if material_updates:
+            # Untranslated materials that were edited may already be assigned to an unchanged mesh.
+            used_materials.extend(self.__collect_used_materials(self.__as_object_translators.keys(),
+                                                                set(material_updates)))
+        materials_to_add = self.__create_material_translators(used_materials)
+
         for mat in materials_to_add.values():
             mat.create_entities(depsgraph, engine)
 
+        for obj in instances_to_update:
+            self.__as_object_translators[obj].update_obj_instance()
+
         # Create new objects.
         for trans in objects_to_add.values():
             trans.create_entities(depsgraph, 0)
 
+        # Create textures that are referenced for the first time.
+        texture_refs = self.__collect_texture_references(depsgraph, list(objects_to_add.keys()) + object_updates)
+        textures_to_add = self.__create_texture_translators(depsgraph, texture_refs)
+
+        for bl_tex, trans in textures_to_add.items():
+            trans.flush_entities(self.as_scene, self.as_main_assembly, self.as_project)
+            self.__as_texture_translators[bl_tex] = trans
+
         for obj in recreate_instances:
             self.__as_object_translators[obj].flush_instances(self.as_main_assembly)
 
@@ -395,18 +480,6 @@ class SceneTranslator(object):
             trans.flush_entities(self.as_scene, self.as_main_assembly, self.as_project)
             self.__as_object_translators[bl_obj] = trans
 
-        # Check if any objects were deleted.
-        if check_for_deletions:
-            obj_list = list(self.__as_object_translators.keys())
-
-            for obj in obj_list:
-                try:
-                    if obj.name_full in bpy.data.objects or obj.name_full in bpy.data.lights:
-                        continue
-                except:
-                    self.__as_object_translators[obj].delete_object(self.as_main_assembly)
-                    del self.__as_object_translators[obj]
-
     def check_view_window(self, depsgraph, context):
         # Check if any camera parameters have changed (location, model, etc...)
         updates = self.__as_camera_translator.check_for_updates(context, depsgraph.scene_eval)
@@ -806,6 +879,208 @@ class SceneTranslator(object):
 
             self.__frame.post_processing_stages().insert(post_process)
 
+    @staticmethod
+    def __collect_texture_references(depsgraph, objects):
+        """
+        Gathers the images referenced as texture entities by the given objects, the scene camera and the world.
+        OSL nodes are not included as they pass image file paths straight to the shaders.
+        """
+
+        images = set()
+
+        for obj in objects:
+            if obj.type == 'MESH':
+                if obj.appleseed.object_alpha_texture is not None:
+                    images.add(obj.appleseed.object_alpha_texture.original)
+            elif obj.type == 'LIGHT':
+                lamp_data = obj.data
+                as_lamp_data = lamp_data.appleseed
+                if lamp_data.type == 'SPOT':
+                    if as_lamp_data.radiance_use_tex and as_lamp_data.radiance_tex is not None:
+                        images.add(as_lamp_data.radiance_tex.original)
+                    if as_lamp_data.radiance_multiplier_use_tex and as_lamp_data.radiance_multiplier_tex is not None:
+                        images.add(as_lamp_data.radiance_multiplier_tex.original)
+
+        camera = depsgraph.scene_eval.camera
+        if camera is not None and camera.type == 'CAMERA' and camera.data.appleseed.diaphragm_map is not None:
+            images.add(camera.data.appleseed.diaphragm_map.original)
+
+        world = depsgraph.scene_eval.world
+        if world is not None:
+            as_world = world.appleseed_sky
+            if as_world.env_type in ('latlong_map', 'mirrorball_map') and as_world.env_tex is not None:
+                images.add(as_world.env_tex.original)
+
+        return images
+
+    def __create_texture_translators(self, depsgraph, images):
+        textures_to_add = dict()
+
+        for tex in sorted(images, key=lambda image: image.name_full):
+            if tex not in self.__as_texture_translators and tex.name not in ("Render Result", "Viewer Node"):
+                textures_to_add[tex] = TextureTranslator(tex, self.__asset_handler)
+
+        with self.__profiler.span("create"):
+            for tex, trans in textures_to_add.items():
+                with self.__profiler.span(tex.name_full):
+                    trans.create_entities(depsgraph)
+
+        with self.__profiler.span("deduplicate"):
+            self.__deduplicate_textures(textures_to_add)
+
+        logger.debug("appleseed: Translating %s of %s images", len(textures_to_add), len(bpy.data.images))
+
+        return textures_to_add
+
+    def __deduplicate_textures(self, textures_to_add):
+        """
+        Collapses textures that point at the same file with the same settings into a single texture entity.
+        The texture instances of the duplicates are kept under their own names but reference the shared texture.
+        """
+
+        unique_textures = {trans.tex_key: trans for trans in self.__as_texture_translators.values() if not trans.is_alias}
+        duplicate_count = 0
+        saved_bytes = 0
+
+        for trans in textures_to_add.values():
+            tex_key = trans.tex_key
+            if tex_key in unique_textures:
+                trans.alias_to(unique_textures[tex_key])
+                duplicate_count += 1
+                saved_bytes += trans.file_size
+            else:
+                unique_textures[tex_key] = trans
+
+        if duplicate_count > 0:
+            logger.debug("appleseed: Merged %s duplicate textures into %s texture entities, approx. %.2f MB saved",
+                         duplicate_count,
+                         len(unique_textures),
+                         saved_bytes / (1024 * 1024))
+
+    @staticmethod
+    def __batch_lamps(objects_to_add):
+        """
+        Collapses lamps with identical parameters into a single light entity that is instanced once
+        per lamp, and identical radiance colors of the remaining light entities into shared color entities.
+        """
+
+        lamps = [trans for trans in objects_to_add.values() if isinstance(trans, LampTranslator) and trans.is_batchable]
+
+        batch_owners = dict()
+        for trans in lamps:
+            batch_key = trans.batch_key
+            if batch_key in batch_owners:
+                trans.join_batch(batch_owners[batch_key])
+            else:
+                batch_owners[batch_key] = trans
+
+        # Batch members have no light entity and no radiance color, so only batch owners can
+        # provide a radiance color to other lamps.
+        radiance_sources = dict()
+        for trans in batch_owners.values():
+            radiance_key = tuple(trans.radiance)
+            if radiance_key in radiance_sources:
+                trans.share_radiance(radiance_sources[radiance_key])
+            else:
+                radiance_sources[radiance_key] = trans
+
+        logger.debug("appleseed: Batched %s lamps into %s light entities using %s radiance colors",
+                     len(lamps),
+                     len(batch_owners),
+                     len(radiance_sources))
+
+    @staticmethod
+    def __share_area_lamp_meshes(objects_to_add):
+        """
+        Lets area lamps with identical shapes share a single primitive mesh.
+        """
+
+        area_lamps = [trans for trans in objects_to_add.values() if isinstance(trans, LampTranslator) and trans.mesh_name is not None]
+
+        mesh_owners = dict()
+        for trans in area_lamps:
+            mesh_key = trans.mesh_key
+            if mesh_key in mesh_owners:
+                trans.share_mesh(mesh_owners[mesh_key])
+            else:
+                mesh_owners[mesh_key] = trans
+
+        logger.debug("appleseed: %s area lamps share %s primitive meshes", len(area_lamps), len(mesh_owners))
+
+    @staticmethod
+    def __collect_used_materials(objects, candidates=None):
+        """
+        Collects the node based materials assigned to the given mesh objects, restricted to candidates if given.
+        :return: List of original materials sorted by name
+        """
+
+        used_materials = set()
+        for obj in objects:
+            if obj.type == 'MESH':
+                for slot in obj.material_slots:
+                    material = slot.material
+                    if material is not None and material.use_nodes:
+                        material = material.original
+                        if candidates is None or material in candidates:
+                            used_materials.add(material)
+
+        return sorted(used_materials, key=lambda mat: mat.name_full)
+
+    def __create_material_translators(self, materials):
+        materials_to_add = dict()
+        for mat in materials:
+            if mat not in self.__as_material_translators and mat not in materials_to_add:
+                materials_to_add[mat] = MaterialTranslator(mat, self.__asset_handler)
+
+        logger.debug("appleseed: Translating %s of %s materials", len(materials_to_add), len(bpy.data.materials))
+
+        return materials_to_add
+
+    @staticmethod
+    def __collapse_materials(materials_to_add):
+        """
+        Replaces materials identical to another one, shader group and surface shader included, by that material.
+        :return: Dictionary mapping the names of the replaced materials to the names of their replacements
+        """
+
+        mat_owners = dict()
+        material_redirects = dict()
+        for trans in materials_to_add.values():
+            mat_key = trans.mat_key
+            if mat_key is None:
+                continue
+            if mat_key in mat_owners:
+                trans.share_material(mat_owners[mat_key])
+                material_redirects[trans.orig_name] = mat_owners[mat_key].orig_name
+            else:
+                mat_owners[mat_key] = trans
+
+        logger.debug("appleseed: %s identical materials collapsed into %s", len(material_redirects), len(mat_owners))
+
+        return material_redirects
+
+    @staticmethod
+    def __share_shader_groups(materials_to_add):
+        """
+        Lets materials with identical node trees share a single shader group.
+        """
+
+        tree_owners = dict()
+        num_shared = 0
+        for trans in materials_to_add.values():
+            if trans.is_alias:
+                continue
+            tree_key = trans.tree_key
+            if tree_key is None:
+                continue
+            if tree_key in tree_owners:
+                trans.share_shader_group(tree_owners[tree_key])
+                num_shared += 1
+            else:
+                tree_owners[tree_key] = trans
+
+        logger.debug("appleseed: %s materials share %s shader groups", len(tree_owners) + num_shared, len(tree_owners))
+
     def __calc_initial_positions(self, depsgraph, engine, objects_to_add):
         logger.debug("appleseed: Setting intial object positions for frame %s", depsgraph.scene_eval.frame_current)
 
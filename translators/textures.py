@@ -25,6 +25,8 @@
 # THE SOFTWARE.
 #
 
+import os
+
 import appleseed as asr
 
 from .assethandlers import AssetType
@@ -50,6 +52,10 @@ class TextureTranslator(Translator):
         self.__as_tex_params = None
         self.__as_tex_inst_params = None
 
+        # Name of the texture entity the instance points at.  This is the texture translated by this
+        # translator unless the texture has been aliased to an identical one.
+        self.__as_tex_name = None
+
         self._bl_obj.appleseed.obj_name = self._bl_obj.name_full
 
     @property
@@ -60,29 +66,71 @@ class TextureTranslator(Translator):
     def orig_name(self):
         return self._bl_obj.appleseed.obj_name
 
+    @property
+    def tex_name(self):
+        return self.__as_tex_name
+
+    @property
+    def is_alias(self):
+        return self.__as_tex is None
+
+    @property
+    def tex_key(self):
+        """
+        Key identifying textures that would produce identical appleseed entities.
+        """
+
+        return (os.path.realpath(self.__as_tex_params['filename']),
+                self.__as_tex_params['color_space'],
+                self.__as_tex_inst_params['addressing_mode'],
+                self.__as_tex_inst_params['alpha_mode'])
+
+    @property
+    def file_size(self):
+        filepath = os.path.realpath(self.__as_tex_params['filename'])
+
+        return os.path.getsize(filepath) if os.path.isfile(filepath) else 0
+
     def create_entities(self, depsgraph):
         logger.debug(f"appleseed: Creating texture entity for {self.orig_name}")
         self.__as_tex_params = self.__get_tex_params()
         self.__as_tex = asr.Texture('disk_texture_2d', self.orig_name, self.__as_tex_params, [])
+        self.__as_tex_name = self.orig_name
 
         self.__as_tex_inst_params = self.__get_tex_inst_params()
 
-        self.__as_tex_inst = asr.TextureInstance(f"{self.orig_name}_inst",
-                                                 self.__as_tex_inst_params,
-                                                 self.obj_name,
-                                                 asr.Transformf(asr.Matrix4f.identity()))
+        self.__create_tex_inst()
+
+    def alias_to(self, source):
+        """
+        Drops the texture entity of this translator and points its texture instance at the texture
+        of another translator.  The instance keeps its own name so existing references stay valid.
+        """
+
+        logger.debug(f"appleseed: Aliasing texture {self.orig_name} to {source.tex_name}")
+        self.__as_tex = None
+        self.__as_tex_name = source.tex_name
+
+        self.__create_tex_inst()
 
     def flush_entities(self, as_scene, as_main_assembly, as_project):
         logger.debug(f"appleseed: Flushing texture entity for {self.orig_name} to project")
         scene = as_project.get_scene()
-        tex_name = self.__as_tex.get_name()
-        scene.textures().insert(self.__as_tex)
-        self.__as_tex = scene.textures().get_by_name(tex_name)
+        if self.__as_tex is not None:
+            tex_name = self.__as_tex.get_name()
+            scene.textures().insert(self.__as_tex)
+            self.__as_tex = scene.textures().get_by_name(tex_name)
 
         tex_inst_name = self.__as_tex_inst.get_name()
         scene.texture_instances().insert(self.__as_tex_inst)
         self.__as_tex_inst = scene.texture_instances().get_by_name(tex_inst_name)
 
+    def __create_tex_inst(self):
+        self.__as_tex_inst = asr.TextureInstance(f"{self.orig_name}_inst",
+                                                 self.__as_tex_inst_params,
+                                                 self.__as_tex_name,
+                                                 asr.Transformf(asr.Matrix4f.identity()))
+
     def __get_tex_params(self):
         as_tex_params = self.bl_tex.appleseed
         filepath = self._asset_handler.process_path(self.bl_tex.filepath, AssetType.TEXTURE_ASSET)
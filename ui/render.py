@@ -83,6 +83,8 @@ class ASRENDER_PT_settings(bpy.types.Panel, ASRENDER_PT_base):
         layout.separator()
 
         layout.prop(asr_scene_props, "log_level", text="Render Log")
+        layout.prop(asr_scene_props, "write_profile", text="Write Translation Profile")
+        layout.prop(asr_scene_props, "checkpoint_tiles", text="Checkpoint Tiles")
 
         layout.separator()
 
@@ -24,17 +24,45 @@
 # OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
 # THE SOFTWARE.
 #
+import hashlib
+import json
 import os
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
 
 import appleseed as asr
 import bpy
 
-from . import path_util, util
+from . import oso_query, path_util, util
+from .oso_query import parse_shader
 from ..logger import get_logger
 from ..properties.nodes import AppleseedOSLSocket
 
 logger = get_logger()
 
+# Bump whenever the layout of the dictionaries returned by parse_shader changes.
+__shader_index_version = 1
+
+# Hash of the stdosl.h header script bytecode is compiled against, part of the bytecode cache key.
+__stdosl_version = None
+
+# Below this many stale shaders per worker process it is faster to query them in-process.
+__min_shaders_per_job = 16
+
+
+def get_node_idname(node):
+    return "Appleseed{0}Node".format(node['name'])
+
+
+def get_socket_idnames(node):
+    """
+    Returns the bl_idnames of all sockets generate_node can create for a node
+    """
+
+    sockets = node['outputs'] + node['inputs']
+    return set("Appleseed{0}{1}".format(node['name'], socket['name'].capitalize()) for socket in sockets)
+
 
 def generate_node(node, node_class):
     """
@@ -187,7 +215,7 @@ def generate_node(node, node_class):
         socket_input_names.append({'socket_name': socket_name, 'socket_label': socket_label, 'hide_ui': hide_ui})
 
     # create node class
-    node_name = "Appleseed{0}Node".format(name)
+    node_name = get_node_idname(node)
     node_label = "{0}".format(name)
     ntype = type(node_name, (node_class,), {})
     ntype.bl_idname = node_name
@@ -392,92 +420,180 @@ def read_osl_shaders():
     into the Python bindings for appleseed.  These parameters are used to create a dictionary
     of the shader parameters that is then added to a list.  This shader list is passed
     on to the oslnode.generate_node function.
+
+    Parsed shaders are kept in a persistent index keyed by path, modification time and size,
+    so only new or changed shaders are queried again.
     :return: List of parsed nodes
     """
 
-    nodes = list()
+    timer = util.Timer()
+
+    index = __load_shader_index()
+    cached_shaders = index.get('shaders', dict())
+
+    timer.stop()
+    index_load_time = timer.elapsed()
 
-    shader_directories = path_util.get_osl_search_paths()
+    timer.start()
 
-    q = asr.ShaderQuery()
+    shader_files = list()
+    stale_files = list()
 
     logger.debug("[appleseed] Parsing OSL shaders...")
 
-    for shader_dir in shader_directories:
+    for shader_dir in path_util.get_osl_search_paths():
         if os.path.isdir(shader_dir):
             logger.debug("[appleseed] Searching {0} for OSO files...".format(shader_dir))
-            for file in os.listdir(shader_dir):
+            for file in sorted(os.listdir(shader_dir)):
                 if file.endswith(".oso") and os.path.basename(file) != "as_texture2surface.oso":
-                    logger.debug("[appleseed] Reading {0}...".format(file))
                     filename = os.path.join(shader_dir, file)
-                    q.open(filename)
-                    nodes.append(parse_shader(q, filename=filename))
+                    stat = os.stat(filename)
+                    shader_files.append((filename, stat.st_mtime, stat.st_size))
+
+                    entry = cached_shaders.get(filename)
+                    if entry is None or entry['mtime'] != stat.st_mtime or entry['size'] != stat.st_size:
+                        stale_files.append(filename)
+
+    parsed_nodes = __query_shaders(stale_files)
+
+    nodes = list()
+    shaders = dict()
+
+    for filename, mtime, size in shader_files:
+        if filename in parsed_nodes:
+            node = parsed_nodes[filename]
+        elif filename in cached_shaders and filename not in stale_files:
+            node = cached_shaders[filename]['node']
+        else:
+            continue
 
-    logger.debug("[appleseed] OSL parsing complete.")
+        shaders[filename] = {'mtime': mtime, 'size': size, 'node': node}
+        nodes.append(node)
+
+    timer.stop()
+
+    scan_time = index.get('scan_time')
+    if not cached_shaders or scan_time is None:
+        scan_time = timer.elapsed()
+
+    if shaders != cached_shaders:
+        __save_shader_index({'version': __shader_index_version,
+                             'scan_time': scan_time,
+                             'shaders': shaders})
+
+    logger.debug("[appleseed] OSL parsing complete: {0} shaders, {1} queried, index loaded in {2:.3f} seconds, "
+                 "lookup took {3:.3f} seconds (full scan: {4:.3f} seconds)".format(len(nodes),
+                                                                                   len(parsed_nodes),
+                                                                                   index_load_time,
+                                                                                   timer.elapsed(),
+                                                                                   scan_time))
 
     return nodes
 
 
-def parse_shader(q, filename=None):
-    d = {'inputs': list(),
-         'outputs': list()}
-    shader_meta = q.get_metadata()
-    if 'as_node_name' in shader_meta:
-        d['name'] = shader_meta['as_node_name']['value']
-    else:
-        d['name'] = q.get_shader_name()
-    d['filename'] = filename
-    if 'URL' in shader_meta:
-        d['url'] = shader_meta['URL']['value']
-    else:
-        d['url'] = ''
-    if 'as_category' in shader_meta:
-        d['category'] = shader_meta['as_category']['value']
+def __query_shaders(filenames):
+    """
+    Queries the given .oso files, spreading the work over worker processes with their own
+    ShaderQuery when there are enough of them.  Shaders that fail to parse are reported and skipped.
+    :return: Dictionary of parsed nodes keyed by filename
+    """
+
+    parsed_nodes = dict()
+
+    if not filenames:
+        return parsed_nodes
+
+    num_jobs = min(os.cpu_count() or 1, len(filenames) // __min_shaders_per_job)
+
+    if num_jobs < 2:
+        logger.debug("[appleseed] Reading {0} OSO files...".format(len(filenames)))
+        results = oso_query.query_shaders(asr.ShaderQuery(), filenames)
     else:
-        d['category'] = 'other'
-    num_of_params = q.get_num_params()
-    for x in range(0, num_of_params):
-        metadata = dict()
-        param = q.get_param_info(x)
-        if 'metadata' in param:
-            metadata = param['metadata']
-        param_data = {'name': param['name'], 'type': param['type'], 'connectable': True, 'hide_ui': param['validdefault'] is False}
-        if 'default' in param:
-            param_data['default'] = param['default']
-        if 'label' in metadata:
-            param_data['label'] = metadata['label']['value']
-        if 'widget' in metadata:
-            param_data['widget'] = metadata['widget']['value']
-            if param_data['widget'] == 'null':
-                param_data['hide_ui'] = True
-        param_data['section'] = metadata['page']['value'] if 'page' in metadata else None
-        if 'min' in metadata:
-            param_data['min'] = metadata['min']['value']
-        if 'max' in metadata:
-            param_data['max'] = metadata['max']['value']
-        if 'softmin' in metadata:
-            param_data['softmin'] = metadata['softmin']['value']
-        if 'softmax' in metadata:
-            param_data['softmax'] = metadata['softmax']['value']
-        if 'help' in metadata:
-            param_data['help'] = metadata['help']['value']
-        if 'options' in metadata:
-            param_data['options'] = metadata['options']['value'].split(" = ")[-1].replace("\"", "").split("|")
-        if 'as_blender_input_socket' in metadata:
-            param_data['connectable'] = False if metadata['as_blender_input_socket']['value'] == 0.0 else True
-        if 'as_deprecated' in metadata:
-            param_data['hide_ui'] = True
-            param_data['connectable'] = False
-
-        if param['isoutput'] is True:
-            d['outputs'].append(param_data)
+        logger.debug("[appleseed] Reading {0} OSO files in {1} processes...".format(len(filenames), num_jobs))
+
+        python_path = getattr(bpy.app, 'binary_path_python', None) or sys.executable
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.pathsep.join(path for path in sys.path if path)
+
+        chunks = [filenames[job::num_jobs] for job in range(num_jobs)]
+
+        with ThreadPoolExecutor(max_workers=num_jobs) as executor:
+            chunk_results = list(executor.map(lambda chunk: __run_query_process(python_path, env, chunk), chunks))
+
+        results = list()
+        for chunk, chunk_result in zip(chunks, chunk_results):
+            if chunk_result is None:
+                # The worker process itself failed, fall back to querying its shaders here.
+                chunk_result = oso_query.query_shaders(asr.ShaderQuery(), chunk)
+            results.extend(chunk_result)
+
+    for result in results:
+        if 'error' in result:
+            logger.error("[appleseed] ERROR: Failed to read OSL shader {0}: {1}".format(result['filename'], result['error']))
         else:
-            d['inputs'].append(param_data)
+            parsed_nodes[result['filename']] = result['node']
 
-    return d
+    return parsed_nodes
 
 
-def compile_osl_bytecode(compiler, script_block):
+def __run_query_process(python_path, env, filenames):
+    try:
+        process = subprocess.run([python_path, oso_query.__file__],
+                                 input=json.dumps(filenames),
+                                 stdout=subprocess.PIPE,
+                                 stderr=subprocess.PIPE,
+                                 universal_newlines=True,
+                                 env=env)
+    except OSError:
+        return None
+
+    if process.returncode != 0:
+        return None
+
+    try:
+        return json.loads(process.stdout)
+    except ValueError:
+        return None
+
+
+def __get_shader_index_path():
+    config_dir = bpy.utils.user_resource('CONFIG', "blenderseed", create=True)
+
+    return os.path.join(config_dir, "osl_shader_index.json")
+
+
+def __load_shader_index():
+    index_path = __get_shader_index_path()
+
+    if not os.path.exists(index_path):
+        return dict()
+
+    try:
+        with open(index_path, 'r') as index_file:
+            index = json.load(index_file)
+    except (OSError, ValueError) as e:
+        logger.debug("[appleseed] Discarding unreadable OSL shader index {0}: {1}".format(index_path, e))
+        return dict()
+
+    if index.get('version') != __shader_index_version:
+        return dict()
+
+    return index
+
+
+def __save_shader_index(index):
+    index_path = __get_shader_index_path()
+    temp_path = index_path + ".tmp"
+
+    try:
+        with open(temp_path, 'w') as index_file:
+            json.dump(index, index_file)
+        os.replace(temp_path, index_path)
+    except (OSError, TypeError, ValueError) as e:
+        logger.debug("[appleseed] Could not write OSL shader index {0}: {1}".format(index_path, e))
+
+
+def get_script_source(script_block):
     osl_path = bpy.path.abspath(script_block.filepath, library=script_block.library)
     if script_block.is_in_memory or script_block.is_dirty or script_block.is_modified or not os.path.exists(osl_path):
         source_code = script_block.as_string()
@@ -486,4 +602,73 @@ def compile_osl_bytecode(compiler, script_block):
         source_code = code.read()
         code.close()
 
-    return compiler.compile_buffer(source_code)
+    return source_code
+
+
+def get_bytecode_cache_path(source_code):
+    global __stdosl_version
+
+    if __stdosl_version is None:
+        stdosl_path = path_util.get_stdosl_paths()
+        try:
+            with open(stdosl_path, 'rb') as stdosl_file:
+                __stdosl_version = hashlib.sha1(stdosl_file.read()).hexdigest()
+        except OSError:
+            __stdosl_version = ""
+
+    cache_dir = bpy.utils.user_resource('CONFIG', os.path.join("blenderseed", "osl_bytecode"), create=True)
+    source_hash = hashlib.sha1((__stdosl_version + source_code).encode('utf-8')).hexdigest()
+
+    return os.path.join(cache_dir, f"script_{source_hash}.oso")
+
+
+def get_cached_bytecode_path(source_code):
+    """
+    Returns the path of the cached bytecode of an OSL script, or None if it has not been compiled yet
+    """
+
+    cache_path = get_bytecode_cache_path(source_code)
+
+    return cache_path if os.path.exists(cache_path) else None
+
+
+def get_cached_bytecode(source_code):
+    cache_path = get_cached_bytecode_path(source_code)
+    if cache_path is None:
+        return None
+
+    with open(cache_path, 'r') as cache_file:
+        return cache_file.read()
+
+
+def store_cached_bytecode(source_code, osl_bytecode):
+    cache_path = get_bytecode_cache_path(source_code)
+
+    try:
+        with open(cache_path, 'w') as cache_file:
+            cache_file.write(osl_bytecode)
+    except OSError as e:
+        logger.debug("[appleseed] Could not cache OSL bytecode in {0}: {1}".format(cache_path, e))
+
+
+def compile_osl_bytecode(compiler, script_block):
+    """
+    Compiles an OSL script text block, reusing the cached bytecode of previous compiles of the same source.
+    The compiler is only created when the script actually needs compiling if None is passed.
+    """
+
+    source_code = get_script_source(script_block)
+
+    osl_bytecode = get_cached_bytecode(source_code)
+    if osl_bytecode is not None:
+        return osl_bytecode
+
+    if compiler is None:
+        compiler = asr.ShaderCompiler(path_util.get_stdosl_paths())
+
+    osl_bytecode = compiler.compile_buffer(source_code)
+
+    if osl_bytecode is not None:
+        store_cached_bytecode(source_code, osl_bytecode)
+
+    return osl_bytecode
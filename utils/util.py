@@ -26,7 +26,9 @@
 #
 
 import datetime
+import json
 import os
+from contextlib import contextmanager
 
 import bpy
 import bpy_extras
@@ -68,12 +70,9 @@ def clamp_value(n, smallest, largest):
 
 
 def filter_params(params):
-    filter_list = list()
-    for p in params:
-        if p not in filter_list:
-            filter_list.append(p)
-    
-    return filter_list
+    """Removes duplicates from a list, keeping the first occurrence of each item"""
+
+    return list(dict.fromkeys(params))
 
 
 def realpath(path):
@@ -96,6 +95,16 @@ def appleseed_popup_info(message="", title="appleseed Info", icon='INFO'):
 
     bpy.context.window_manager.popup_menu(draw, title=title, icon=icon)
 
+def get_node_trees():
+    """Returns the node trees of all materials, lights, worlds and node groups in the file"""
+
+    node_trees = list(bpy.data.node_groups)
+    for datablocks in (bpy.data.materials, bpy.data.lights, bpy.data.worlds):
+        node_trees.extend(x.node_tree for x in datablocks if x.node_tree is not None)
+
+    return node_trees
+
+
 @persistent
 def update_project(_):
     """
@@ -104,12 +113,20 @@ def update_project(_):
     :return:
     """
 
+    # Find the texts used by OSL Script nodes.  Their node classes do not exist yet when the
+    # file is loaded, so the script is read from the stored node properties.
+    scripts = list()
+    for node_tree in get_node_trees():
+        for node in node_tree.nodes:
+            if node.bl_idname == 'NodeUndefined' or isinstance(node, AppleseedOSLScriptNode):
+                script = node.get('script')
+                if isinstance(script, bpy.types.Text) and script not in scripts:
+                    scripts.append(script)
+
     # Compile all OSL Script nodes
-    stdosl_path = path_util.get_stdosl_paths()
-    compiler = asr.ShaderCompiler(stdosl_path)
     q = asr.ShaderQuery()
-    for script in bpy.data.texts:
-        osl_bytecode = osl_utils.compile_osl_bytecode(compiler,
+    for script in scripts:
+        osl_bytecode = osl_utils.compile_osl_bytecode(None,
                                                       script)
         if osl_bytecode is not None:
             q.open_bytecode(osl_bytecode)
@@ -248,6 +265,77 @@ class Timer(object):
         return delta.total_seconds()
 
 
+class Profiler(object):
+    """
+    Hierarchical profiler.  Records wall time, call count and bytes processed for nested named spans.
+    """
+
+    def __init__(self):
+        self.__root = self.__new_span("total")
+        self.__stack = [self.__root]
+        self.__timer = Timer()
+
+    @contextmanager
+    def span(self, name, num_bytes=0):
+        parent = self.__stack[-1]
+        if name not in parent['children']:
+            parent['children'][name] = self.__new_span(name)
+        span = parent['children'][name]
+
+        self.__stack.append(span)
+        timer = Timer()
+        try:
+            yield span
+        finally:
+            timer.stop()
+            span['time'] += timer.elapsed()
+            span['count'] += 1
+            span['bytes'] += num_bytes
+            self.__stack.pop()
+
+    def add_bytes(self, num_bytes):
+        """Adds processed bytes to the innermost open span"""
+        self.__stack[-1]['bytes'] += num_bytes
+
+    def report(self):
+        # The total time is taken when the first report is made, which is right after the translation.
+        if self.__root['count'] == 0:
+            self.__timer.stop()
+            self.__root['time'] = self.__timer.elapsed()
+            self.__root['count'] = 1
+
+        return self.__span_report(self.__root)
+
+    def summary(self, max_spans=3):
+        """Returns the total time and the slowest top level spans as a single line"""
+        report = self.report()
+        slowest = ", ".join(f"{span['name']} {span['time']:.2f}s" for span in report['children'][:max_spans])
+
+        return f"Translated in {report['time']:.2f}s ({slowest})"
+
+    def write_json(self, filepath, **sections):
+        """Writes the report, extended with the given additional top level sections"""
+        report = self.report()
+        report.update(sections)
+
+        with open(filepath, 'w') as report_file:
+            json.dump(report, report_file, indent=2)
+
+    @staticmethod
+    def __new_span(name):
+        return {'name': name, 'time': 0.0, 'count': 0, 'bytes': 0, 'children': dict()}
+
+    @classmethod
+    def __span_report(cls, span):
+        children = sorted(span['children'].values(), key=lambda child: child['time'], reverse=True)
+
+        return {'name': span['name'],
+                'time': span['time'],
+                'count': span['count'],
+                'bytes': span['bytes'],
+                'children': [cls.__span_report(child) for child in children]}
+
+
 # ------------------------------------
 # Blender addon.
 # ------------------------------------